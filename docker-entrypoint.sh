@@ -4,15 +4,20 @@ set -e
 source /opt/setup/.venv/bin/activate
 
 usage() {
-    echo "Usage: $0 [api|event-consumer]"
+    echo "Usage: $0 [api|event-consumer|async-event-consumer]"
     echo "  - api: start the fastapi server and eventbus"
     echo "  - event-consumer: run db migrations, start redis event consumer (pub/sub)"
+    echo "  - async-event-consumer: run db migrations, start the asyncio redis event consumer"
 }
 
 if [[ "$1" == "event-consumer" ]]; then
     python db_ready.py
     alembic upgrade head
     watchmedo auto-restart --directory=/home/app/slowking --pattern="*.py" -- python -m slowking.entrypoints.event_consumer
+elif [[ "$1" == "async-event-consumer" ]]; then
+    python db_ready.py
+    alembic upgrade head
+    watchmedo auto-restart --directory=/home/app/slowking --pattern="*.py" -- python -m slowking.entrypoints.async_event_consumer
 elif [[ "$1" == "api" ]]; then
     uvicorn slowking.router:app --host 0.0.0.0 --reload --port 8091
 else
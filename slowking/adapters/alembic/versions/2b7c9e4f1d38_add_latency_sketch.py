@@ -0,0 +1,30 @@
+"""
+Add latency sketch buckets
+
+Revision ID: 2b7c9e4f1d38
+Revises: 9d4e6b1a7c25
+Create Date: 2026-10-18 14:02:47.518203
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "2b7c9e4f1d38"
+down_revision = "9d4e6b1a7c25"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "latency_sketch",
+        sa.Column(
+            "project_id", sa.Integer, sa.ForeignKey("project.id"), primary_key=True
+        ),
+        sa.Column("bucket", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("count", sa.BigInteger(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("latency_sketch")
@@ -0,0 +1,57 @@
+"""
+Add project progress counters
+
+Revision ID: 5f1a8c3d6e90
+Revises: 2b7c9e4f1d38
+Create Date: 2026-10-18 15:21:09.734116
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5f1a8c3d6e90"
+down_revision = "2b7c9e4f1d38"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        table_name="project",
+        column=sa.Column(
+            "documents_started", sa.Integer(), nullable=False, server_default="0"
+        ),
+    )
+    op.add_column(
+        table_name="project",
+        column=sa.Column("first_upload_time_start", sa.DateTime(), nullable=True),
+    )
+    op.add_column(
+        table_name="project",
+        column=sa.Column("last_upload_time_end", sa.DateTime(), nullable=True),
+    )
+    # backfill the progress for benchmarks created before this migration
+    op.execute(
+        """
+        UPDATE project SET
+            documents_started = (
+                SELECT count(*) FROM document
+                WHERE document.project_id = project.id
+                AND document.upload_time_start IS NOT NULL
+            ),
+            first_upload_time_start = (
+                SELECT min(document.upload_time_start) FROM document
+                WHERE document.project_id = project.id
+            ),
+            last_upload_time_end = (
+                SELECT max(document.upload_time_end) FROM document
+                WHERE document.project_id = project.id
+            )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column(table_name="project", column_name="last_upload_time_end")
+    op.drop_column(table_name="project", column_name="first_upload_time_start")
+    op.drop_column(table_name="project", column_name="documents_started")
@@ -0,0 +1,27 @@
+"""
+Add document project_id and name index
+
+Revision ID: 7a1f3c9e2b64
+Revises: 3bd51d191df3
+Create Date: 2026-10-18 09:12:41.305127
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "7a1f3c9e2b64"
+down_revision = "3bd51d191df3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        index_name="ix_document_project_id_name",
+        table_name="document",
+        columns=["project_id", "name"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(index_name="ix_document_project_id_name", table_name="document")
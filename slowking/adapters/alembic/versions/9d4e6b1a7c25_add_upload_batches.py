@@ -0,0 +1,56 @@
+"""
+Add upload batch settings and timings
+
+Revision ID: 9d4e6b1a7c25
+Revises: e5b7390d4c18
+Create Date: 2026-10-18 12:31:06.402871
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "9d4e6b1a7c25"
+down_revision = "e5b7390d4c18"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        table_name="benchmark",
+        column=sa.Column("upload_batch_size", sa.Integer(), nullable=True),
+    )
+    op.add_column(
+        table_name="benchmark",
+        column=sa.Column(
+            "upload_concurrency", sa.Integer(), nullable=False, server_default="1"
+        ),
+    )
+    op.create_table(
+        "upload_batch",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("benchmark_id", sa.Integer, sa.ForeignKey("benchmark.id")),
+        sa.Column("batch_number", sa.Integer(), nullable=False),
+        sa.Column("document_count", sa.Integer(), nullable=False),
+        sa.Column("size_bytes", sa.BigInteger(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("upload_time_start", sa.DateTime(), nullable=False),
+        sa.Column("upload_time_end", sa.DateTime(), nullable=False),
+        sa.Column("error", sa.Text(), nullable=True),
+    )
+    op.create_index(
+        index_name="ix_upload_batch_benchmark_id_batch_number",
+        table_name="upload_batch",
+        columns=["benchmark_id", "batch_number"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        index_name="ix_upload_batch_benchmark_id_batch_number",
+        table_name="upload_batch",
+    )
+    op.drop_table("upload_batch")
+    op.drop_column(table_name="benchmark", column_name="upload_concurrency")
+    op.drop_column(table_name="benchmark", column_name="upload_batch_size")
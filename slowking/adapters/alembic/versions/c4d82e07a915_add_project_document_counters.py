@@ -0,0 +1,50 @@
+"""
+Add project document counters
+
+Revision ID: c4d82e07a915
+Revises: 7a1f3c9e2b64
+Create Date: 2026-10-18 10:02:17.884310
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c4d82e07a915"
+down_revision = "7a1f3c9e2b64"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        table_name="project",
+        column=sa.Column(
+            "documents_expected", sa.Integer(), nullable=False, server_default="0"
+        ),
+    )
+    op.add_column(
+        table_name="project",
+        column=sa.Column(
+            "documents_completed", sa.Integer(), nullable=False, server_default="0"
+        ),
+    )
+    # backfill the counters for benchmarks created before this migration
+    op.execute(
+        """
+        UPDATE project SET
+            documents_expected = (
+                SELECT count(*) FROM document WHERE document.project_id = project.id
+            ),
+            documents_completed = (
+                SELECT count(*) FROM document
+                WHERE document.project_id = project.id
+                AND document.upload_time_start IS NOT NULL
+                AND document.upload_time_end IS NOT NULL
+            )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column(table_name="project", column_name="documents_completed")
+    op.drop_column(table_name="project", column_name="documents_expected")
@@ -0,0 +1,46 @@
+"""
+Add benchmark and project indexes
+
+Revision ID: e5b7390d4c18
+Revises: c4d82e07a915
+Create Date: 2026-10-18 10:41:53.120954
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e5b7390d4c18"
+down_revision = "c4d82e07a915"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        index_name="ix_benchmark_name",
+        table_name="benchmark",
+        columns=["name"],
+    )
+    op.create_index(
+        index_name="ix_benchmark_target_url",
+        table_name="benchmark",
+        columns=["target_url"],
+    )
+    # a benchmark has exactly one project
+    op.create_index(
+        index_name="ix_project_benchmark_id",
+        table_name="project",
+        columns=["benchmark_id"],
+        unique=True,
+    )
+    op.create_index(
+        index_name="ix_project_eigen_project_id",
+        table_name="project",
+        columns=["eigen_project_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(index_name="ix_project_eigen_project_id", table_name="project")
+    op.drop_index(index_name="ix_project_benchmark_id", table_name="project")
+    op.drop_index(index_name="ix_benchmark_target_url", table_name="benchmark")
+    op.drop_index(index_name="ix_benchmark_name", table_name="benchmark")
@@ -0,0 +1,172 @@
+"""
+Artifact catalog, the documents a benchmark uploads to its target.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from slowking.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ArtifactEntry:
+    name: str
+    size: int
+    sha256: str
+    mtime_ns: int
+
+
+@dataclass
+class Manifest:
+    corpus: str
+    # mtime of the corpus directory when the manifest was built, it changes when
+    # a file is added, removed or renamed
+    dir_mtime_ns: int = 0
+    entries: list[ArtifactEntry] = field(default_factory=list)
+
+    def paths(self) -> list[Path]:
+        return [Path(self.corpus) / entry.name for entry in self.entries]
+
+
+class ArtifactCatalog:
+    """
+    Keeps a manifest of each corpus directory: the name, size, sha256 and mtime of
+    every artifact. The manifest is persisted as JSON in the manifest directory,
+    kept apart from the corpus so writing it does not change the corpus, and held
+    in memory once loaded.
+
+    Reading a manifest costs one stat of the corpus directory. When the directory
+    has changed the manifest is rebuilt incrementally: the directory is listed,
+    and only files whose size or mtime changed are hashed again. A file rewritten
+    in place does not change the directory mtime, `refresh` picks it up.
+    """
+
+    def __init__(
+        self,
+        artifacts_dir: str = settings.ARTIFACTS_DIR,
+        pattern: str = settings.ARTIFACTS_GLOB,
+        manifest_dir: str = settings.ARTIFACTS_MANIFEST_DIR,
+    ):
+        self.artifacts_dir = Path(artifacts_dir)
+        self.pattern = pattern
+        self.manifest_dir = Path(manifest_dir)
+        self._manifests: dict[Path, Manifest] = {}
+        self._lock = threading.Lock()
+
+    def manifest(self, corpus: str | None = None) -> Manifest:
+        """
+        Returns the manifest of a corpus, a subdirectory of the artifacts dir, or
+        of the artifacts dir itself when no corpus is given
+        """
+        corpus_dir = self._corpus_dir(corpus)
+        with self._lock:
+            current = self._manifests.get(corpus_dir)
+            if current is None:
+                current = self._load(corpus_dir)
+            if current.dir_mtime_ns != _mtime_ns(corpus_dir):
+                current = self._rebuild(corpus_dir, current)
+            self._manifests[corpus_dir] = current
+            return current
+
+    def refresh(self, corpus: str | None = None) -> Manifest:
+        """
+        Rebuilds a manifest, checking every file for changes
+        """
+        corpus_dir = self._corpus_dir(corpus)
+        with self._lock:
+            current = self._manifests.get(corpus_dir) or self._load(corpus_dir)
+            self._manifests[corpus_dir] = self._rebuild(corpus_dir, current)
+            return self._manifests[corpus_dir]
+
+    def _corpus_dir(self, corpus: str | None) -> Path:
+        return self.artifacts_dir / corpus if corpus else self.artifacts_dir
+
+    def _manifest_path(self, corpus_dir: Path) -> Path:
+        relative = corpus_dir.relative_to(self.artifacts_dir).as_posix()
+        name = "default" if relative == "." else relative.replace("/", "__")
+        return self.manifest_dir / f"{name}.json"
+
+    def _load(self, corpus_dir: Path) -> Manifest:
+        try:
+            data = json.loads(self._manifest_path(corpus_dir).read_text())
+        except (OSError, ValueError):
+            return Manifest(corpus=str(corpus_dir), dir_mtime_ns=-1)
+        return Manifest(
+            corpus=str(corpus_dir),
+            dir_mtime_ns=data["dir_mtime_ns"],
+            entries=[ArtifactEntry(**entry) for entry in data["entries"]],
+        )
+
+    def _rebuild(self, corpus_dir: Path, previous: Manifest) -> Manifest:
+        dir_mtime_ns = _mtime_ns(corpus_dir)
+        if dir_mtime_ns == -1:
+            logger.warning(f"Artifact corpus {corpus_dir} does not exist")
+            return Manifest(corpus=str(corpus_dir), dir_mtime_ns=-1)
+
+        known = {entry.name: entry for entry in previous.entries}
+        entries = []
+        hashed = 0
+        for path in sorted(corpus_dir.glob(self.pattern)):
+            if not path.is_file():
+                continue
+            stat = path.stat()
+            entry = known.get(path.name)
+            if (
+                entry is None
+                or entry.size != stat.st_size
+                or entry.mtime_ns != stat.st_mtime_ns
+            ):
+                entry = ArtifactEntry(
+                    name=path.name,
+                    size=stat.st_size,
+                    sha256=_sha256(path),
+                    mtime_ns=stat.st_mtime_ns,
+                )
+                hashed += 1
+            entries.append(entry)
+
+        manifest = Manifest(
+            corpus=str(corpus_dir), dir_mtime_ns=dir_mtime_ns, entries=entries
+        )
+        logger.info(
+            f"Artifact manifest for {corpus_dir} rebuilt: {len(entries)} files, "
+            f"{hashed} hashed"
+        )
+        self._save(corpus_dir, manifest)
+        return manifest
+
+    def _save(self, corpus_dir: Path, manifest: Manifest) -> None:
+        path = self._manifest_path(corpus_dir)
+        data = {
+            "dir_mtime_ns": manifest.dir_mtime_ns,
+            "entries": [asdict(entry) for entry in manifest.entries],
+        }
+        tmp = path.with_name(f"{path.name}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(data))
+            os.replace(tmp, path)
+        except OSError:
+            # the catalog still works, the manifest is rebuilt once per process
+            logger.warning(f"Could not save artifact manifest {path}", exc_info=True)
+
+
+def _mtime_ns(path: Path) -> int:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return -1
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        while chunk := f.read(settings.UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,269 @@
+"""
+Async HTTP client adapter to communicate with the benchmark target instance.
+"""
+from __future__ import annotations
+
+import logging.config
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+import httpx
+from tenacity import retry, stop_after_attempt, wait_fixed, wait_random
+
+from slowking.adapters import metrics
+from slowking.adapters.http import (
+    RETRIES,
+    WAIT_FIXED,
+    WAIT_MAX,
+    WAIT_MIN,
+    AuthRetriesExceededException,
+    ProjectStruct,
+    with_scheme,
+)
+from slowking.adapters.multipart import MultipartEncoder
+from slowking.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncEigenClient:
+    """Async counterpart of `EigenClient` for the asyncio event consumer.
+
+    Connections are pooled per target: every client for the same base url and
+    transport settings shares one transport, so keep-alive connections, and HTTP/2
+    streams when an https target negotiates it, are reused across benchmarks. A
+    base url without a scheme is requested over plain http, which is HTTP/1.1.
+    Each client keeps its own cookies, so clients authenticated as different users
+    never share a token.
+
+    Create a client with `await AsyncEigenClient.create(...)`, which authenticates
+    before returning it.
+    """
+
+    EXPIRED_TOKEN_DETAIL = "Token has expired."
+
+    _transports: dict[tuple, httpx.AsyncBaseTransport] = {}
+
+    def __init__(
+        self,
+        base_url: str,
+        username: str,
+        password: str,
+        base_auth_url: str = "",
+        conn_id: str = "",
+        verify: bool = False,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        """Initialize the client, see `EigenClient` for the arguments.
+
+        Args:
+            transport: an optional transport to send requests with. Defaults to the
+                pooled transport of the target.
+        """
+        self.username = username
+        self.password = password
+        self.conn_id = conn_id or base_url
+
+        if not base_url.endswith("/"):
+            base_url += "/"
+
+        if not base_auth_url:
+            base_auth_url = base_url
+
+        if not base_auth_url.endswith("/"):
+            base_auth_url += "/"
+
+        self.auth_url = f"{base_auth_url}auth/v1/token/"
+        self.base_url_v1 = f"{base_url}api/v1/"
+        self.base_url_v2 = f"{base_url}api/v2/"
+        self.base_url_project_management_v2 = f"{base_url}api/project_management/v2/"
+        self._csrf_token: str | None = None
+
+        self.client = httpx.AsyncClient(
+            transport=transport or self.transport_for(base_url, verify),
+            timeout=httpx.Timeout(
+                settings.EIGEN_TIMEOUT,
+                connect=settings.EIGEN_CONNECT_TIMEOUT,
+                pool=settings.EIGEN_POOL_TIMEOUT,
+            ),
+        )
+
+    @classmethod
+    async def create(cls, *args, **kwargs) -> AsyncEigenClient:
+        client = cls(*args, **kwargs)
+        await client._get_auth_token()
+        return client
+
+    @classmethod
+    def transport_for(cls, base_url: str, verify: bool) -> httpx.AsyncBaseTransport:
+        """Return the pooled transport of a target, creating it on first use."""
+        limits = httpx.Limits(
+            max_connections=settings.EIGEN_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.EIGEN_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.EIGEN_KEEPALIVE_EXPIRY,
+        )
+        # keyed by every transport setting, so a client never reuses connections
+        # made with another verify or protocol setting
+        key = (
+            with_scheme(base_url),
+            verify,
+            settings.EIGEN_HTTP2,
+            limits.max_connections,
+            limits.max_keepalive_connections,
+            limits.keepalive_expiry,
+        )
+        if key not in cls._transports:
+            cls._transports[key] = httpx.AsyncHTTPTransport(
+                http2=settings.EIGEN_HTTP2, verify=verify, limits=limits
+            )
+        return cls._transports[key]
+
+    @classmethod
+    async def close_transports(cls) -> None:
+        """Close the pooled connections of every target."""
+        transports, cls._transports = cls._transports, {}
+        for transport in transports.values():
+            await transport.aclose()
+
+    @staticmethod
+    def _raise_for_status(
+        response: httpx.Response, expected_code: Optional[int] = None, info: Any = None
+    ) -> None:
+        """Raise an `httpx.HTTPStatusError` with the response text, as
+        `EigenClient._raise_for_status` does.
+        """
+        error_type = ""
+        if 400 <= response.status_code < 500:
+            error_type = "Client Error"
+        elif 500 <= response.status_code < 600:
+            error_type = "Server Error"
+        elif expected_code and response.status_code != expected_code:
+            error_type = "Unexpected Status"
+
+        if error_type:
+            http_error_msg = (
+                f"{response.status_code} {error_type}: "
+                f"{response.reason_phrase} for url: {response.url}\n\n"
+                f"Response Text: {response.text}"
+            )
+
+            if info:
+                http_error_msg += f"\n\nAdditional Information: {info}"
+            raise httpx.HTTPStatusError(
+                http_error_msg, request=response.request, response=response
+            )
+
+    @retry(
+        wait=wait_fixed(WAIT_FIXED) + wait_random(WAIT_MIN, WAIT_MAX),
+        stop=stop_after_attempt(RETRIES),
+        before_sleep=metrics.count_retries("eigen_request"),
+    )
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request, retried, re-authenticating once when the token has
+        expired."""
+        return await self._request(method, url, **kwargs)
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """A single attempt of `request`, for callers retrying at their own layer.
+
+        Raises:
+            AuthRetriesExceededException: when the retry limit has been reached for
+                re-authentication
+            HTTPStatusError: when an error status is returned and token is valid
+        """
+        url = with_scheme(url)
+        logger.info(f"=== ASYNC HTTP CLIENT Requesting {method} {url}")
+        try:
+            start = time.perf_counter()
+            try:
+                response = await self.client.request(method, url, **kwargs)
+            except Exception:
+                metrics.observe_request("async", method, start, "error")
+                raise
+            metrics.observe_request("async", method, start, response.status_code)
+            self._raise_for_status(response)
+
+            if response.headers.get("Deprecation"):
+                logger.warning("The url '%s' is deprecated", url)
+
+            return response
+        except httpx.HTTPStatusError as exc:
+            if self._is_token_expiry(exc) is False:
+                raise exc
+            logger.info("Token expired, attempting to reauthenticate")
+
+            await self._get_auth_token()
+
+            logger.info("New authentication token created - reattempting request")
+
+        raise AuthRetriesExceededException(
+            f"Auth token has expired and retries exceeded for url: {url}"
+        )
+
+    async def _get_auth_token(self) -> None:
+        """Retrieve an Eigen auth token, stored in the client's cookies."""
+        response = await self.client.post(
+            url=with_scheme(self.auth_url),
+            json={"password": self.password, "username": self.username},
+        )
+        self._raise_for_status(response)
+
+        # Reset the csrf_token so it will be reinitialised if used
+        self._csrf_token = None
+
+    def _is_token_expiry(self, error: httpx.HTTPStatusError) -> bool:
+        if error.response.status_code != 401:
+            return False
+
+        try:
+            error_detail = error.response.json()["error"]["detail"]
+        except KeyError:
+            return False
+
+        return error_detail == self.EXPIRED_TOKEN_DETAIL
+
+    async def csrf_token(self) -> str | None:
+        """Return the csrf_token, fetching it on first use."""
+        if self._csrf_token is None:
+            res = await self.request("GET", f"{self.base_url_v2}api-csrf-token/")
+            self._csrf_token = res.json()["csrf_token"]
+
+        return self._csrf_token
+
+    async def create_project(self, name: str, description: str) -> ProjectStruct:
+        url = f"{self.base_url_project_management_v2}projects/"
+        res = await self.request(
+            "POST", url, json={"name": name, "description": description}
+        )
+        logger.info(f"=== Async Client :: Create project response {res}")
+        return ProjectStruct(**res.json())
+
+    async def upload_files(
+        self, project_id: int, files: list[Path]
+    ) -> list[dict[str, Any]]:
+        """Upload files.
+
+        Args:
+            project_id: the id of the project to upload files to
+            files: a list of files to upload
+
+        Returns:
+            the response from Eigen
+        """
+        url = f"{self.base_url_v1}document_uploader/"
+        body = MultipartEncoder(
+            fields={"document_type_id": str(project_id)},
+            files=[("files", f) for f in files],
+        )
+        # a single attempt, the upload scheduler retries failed batches
+        res = await self._request(
+            "POST",
+            url,
+            content=body,
+            headers={
+                "Content-Type": body.content_type,
+                "Content-Length": str(len(body)),
+            },
+        )
+        return res.json()
@@ -0,0 +1,104 @@
+"""
+In-process fan-out of events to live subscribers, e.g. server-sent event streams.
+"""
+import asyncio
+import logging
+import threading
+from collections import defaultdict, deque
+
+from slowking.config import settings
+from slowking.domain import events
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """
+    A subscriber's buffer of events, bounded to `maxsize`. When the subscriber
+    falls behind the oldest events are dropped and counted, so pushing never
+    blocks the publisher.
+    """
+
+    def __init__(
+        self, benchmark_id: int, maxsize: int, loop: asyncio.AbstractEventLoop
+    ):
+        self.benchmark_id = benchmark_id
+        self.dropped = 0
+        self._buffer: deque[events.Event] = deque(maxlen=maxsize)
+        self._lock = threading.Lock()
+        self._loop = loop
+        self._ready = asyncio.Event()
+
+    def push(self, event: events.Event) -> None:
+        """
+        Buffers an event, called from any thread
+        """
+        with self._lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append(event)
+        try:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            # the subscriber's event loop has been closed
+            pass
+
+    async def get(self, timeout: float) -> list[events.Event]:
+        """
+        Waits up to `timeout` seconds for events and returns every buffered event,
+        or an empty list on timeout
+        """
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        self._ready.clear()
+        with self._lock:
+            buffered = list(self._buffer)
+            self._buffer.clear()
+        return buffered
+
+    def take_dropped(self) -> int:
+        with self._lock:
+            dropped, self.dropped = self.dropped, 0
+        return dropped
+
+
+class EventBroadcaster:
+    """
+    Fans out the events of a benchmark to its subscribers. `publish` is used as,
+    or alongside, the bus publish function; it only appends to bounded buffers so
+    slow subscribers never hold up the handlers.
+    """
+
+    def __init__(self, buffer_size: int = settings.BROADCAST_BUFFER_SIZE):
+        self.buffer_size = buffer_size
+        self._subscriptions: dict[int, set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, benchmark_id: int) -> Subscription:
+        """
+        Subscribes to the events of a benchmark, called from the subscriber's
+        event loop
+        """
+        subscription = Subscription(
+            benchmark_id, self.buffer_size, asyncio.get_running_loop()
+        )
+        with self._lock:
+            self._subscriptions[benchmark_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.benchmark_id)
+            if subscriptions is None:
+                return
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.benchmark_id]
+
+    def publish(self, event: events.Event) -> None:
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(event.benchmark_id, ()))
+        for subscription in subscriptions:
+            subscription.push(event)
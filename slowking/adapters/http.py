@@ -4,6 +4,7 @@ HTTP client adapter to communicate with the benchmark target instance.
 from __future__ import annotations
 
 import logging.config
+import time
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Optional
@@ -11,6 +12,9 @@ from typing import Any, Optional
 from requests import HTTPError, Response, Session
 from tenacity import retry, stop_after_attempt, wait_fixed, wait_random
 
+from slowking.adapters import metrics
+from slowking.adapters.multipart import MultipartEncoder
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,6 +24,12 @@ WAIT_MIN = 0
 WAIT_MAX = 2
 
 
+def with_scheme(url: str) -> str:
+    """Return the url with its scheme, defaulting to http:// for a target url
+    configured without one, e.g. "eigenapi:8080/"."""
+    return url if "://" in url else f"http://{url}"
+
+
 class EigenClient(Session):
     """Class for interacting with the Eigen application's REST API."""
 
@@ -131,11 +141,17 @@ class EigenClient(Session):
     @retry(
         wait=wait_fixed(WAIT_FIXED) + wait_random(WAIT_MIN, WAIT_MAX),
         stop=stop_after_attempt(RETRIES),
+        before_sleep=metrics.count_retries("eigen_request"),
     )
     def request(self, method: str, url: str, **kwargs) -> Response:  # type: ignore
         """Override the base Session.request.
 
-        Adds re-authentication logic to the `request` method.
+        Adds retries and re-authentication logic to the `request` method.
+        """
+        return self._request(method, url, **kwargs)
+
+    def _request(self, method: str, url: str, **kwargs) -> Response:
+        """A single attempt of `request`, for callers retrying at their own layer.
 
         Args:
             method: the method of the request, eg. "GET"
@@ -150,10 +166,19 @@ class EigenClient(Session):
         Returns:
             a `requests` `Response` object
         """
-        url = f"http://{url}"
+        url = with_scheme(url)
         logger.info(f"=== HTTP CLIENT Requesting {method} {url}")
+        if isinstance(kwargs.get("data"), MultipartEncoder):
+            # a retried upload streams the files from the start again
+            kwargs["data"].seek(0)
         try:
-            response = super().request(method, url, **kwargs)
+            start = time.perf_counter()
+            try:
+                response = super().request(method, url, **kwargs)
+            except Exception:
+                metrics.observe_request("sync", method, start, "error")
+                raise
+            metrics.observe_request("sync", method, start, response.status_code)
             self._raise_for_status(response)
 
             if response.headers.get("Deprecation"):
@@ -262,12 +287,14 @@ class EigenClient(Session):
             the response from Eigen
         """
         url = f"{self.base_url_v1}document_uploader/"
-        res = self.post(
-            url=url,
-            data={"document_type_id": project_id},
-            files=[("files", (f.name, f.read_bytes())) for f in files],
+        body = MultipartEncoder(
+            fields={"document_type_id": str(project_id)},
+            files=[("files", f) for f in files],
+        )
+        # a single attempt, the upload scheduler retries failed batches
+        res = self._request(
+            "POST", url, data=body, headers={"Content-Type": body.content_type}
         )
-        self._raise_for_status(res)
         return res.json()
 
 
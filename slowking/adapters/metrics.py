@@ -0,0 +1,170 @@
+"""
+Prometheus metrics of slowking's own hot paths: the message bus handlers, the
+requests to the benchmark target, retries, the events published and the messages
+consumed per channel.
+
+The metrics are registered in the default prometheus_client registry. The API
+exposes them at /metrics, each event consumer on its own listener. In the
+process worker mode of the event consumer set PROMETHEUS_MULTIPROC_DIR, so the
+workers' samples are written to shared files and aggregated on exposition.
+"""
+import logging
+import os
+import time
+from typing import Callable
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+from tenacity import RetryCallState
+
+logger = logging.getLogger(__name__)
+
+# handlers run from a few milliseconds (a timing callback) to minutes (an upload)
+HANDLER_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    300.0,
+)
+
+HANDLER_DURATION = Histogram(
+    "slowking_handler_duration_seconds",
+    "Duration of each message bus handler invocation",
+    ["message", "handler", "outcome"],
+    buckets=HANDLER_BUCKETS,
+)
+EVENT_HANDLER_ERRORS = Counter(
+    "slowking_event_handler_errors",
+    "Exceptions raised by event handlers, logged and swallowed by the message bus",
+    ["event", "handler"],
+)
+EIGEN_REQUEST_DURATION = Histogram(
+    "slowking_eigen_request_duration_seconds",
+    "Duration of each request attempt to the benchmark target",
+    ["client", "method", "status"],
+    buckets=HANDLER_BUCKETS,
+)
+RETRIES = Counter(
+    "slowking_retries",
+    "Attempts retried after a failure",
+    ["operation"],
+)
+EVENTS_PUBLISHED = Counter(
+    "slowking_events_published",
+    "Events published to the redis broker",
+)
+EVENT_PUBLISH_ERRORS = Counter(
+    "slowking_event_publish_errors",
+    "Failed publishes to the redis broker",
+)
+EVENT_PUBLISH_DURATION = Histogram(
+    "slowking_event_publish_duration_seconds",
+    "Duration of each publish round trip to the redis broker",
+    buckets=HANDLER_BUCKETS,
+)
+MESSAGES = Counter(
+    "slowking_messages_received",
+    "Messages received by the event consumer",
+    ["channel"],
+)
+MESSAGE_LAG = Histogram(
+    "slowking_message_lag_seconds",
+    "Time from a message being added to its stream to it being received",
+    ["channel"],
+    buckets=HANDLER_BUCKETS,
+)
+
+
+def observe_handler(
+    message_type: str, handler: str, duration: float, outcome: str
+) -> None:
+    HANDLER_DURATION.labels(message_type, handler, outcome).observe(duration)
+
+
+def observe_request(client: str, method: str, start: float, status: int | str) -> None:
+    EIGEN_REQUEST_DURATION.labels(client, method.upper(), str(status)).observe(
+        time.perf_counter() - start
+    )
+
+
+def observe_publish(published: int, start: float, error: bool = False) -> None:
+    EVENT_PUBLISH_DURATION.observe(time.perf_counter() - start)
+    if error:
+        EVENT_PUBLISH_ERRORS.inc()
+    else:
+        EVENTS_PUBLISHED.inc(published)
+
+
+def count_retries(operation: str) -> Callable[[RetryCallState], None]:
+    """
+    A tenacity `before_sleep` callback counting the retries of an operation
+    """
+    counter = RETRIES.labels(operation)
+
+    def before_sleep(retry_state: RetryCallState) -> None:
+        counter.inc()
+
+    return before_sleep
+
+
+def observe_message(channel: str, message_id: str | None = None) -> None:
+    """
+    Counts a received message. Stream entry ids start with the millisecond the
+    entry was added, which gives the lag of the consumer.
+    """
+    MESSAGES.labels(channel).inc()
+    if message_id is None:
+        return
+    try:
+        added_ms = int(message_id.split("-", 1)[0])
+    except ValueError:
+        return
+    MESSAGE_LAG.labels(channel).observe(max(0.0, time.time() - added_ms / 1000))
+
+
+def registry() -> CollectorRegistry:
+    """
+    The registry to expose, aggregating the files of every process in the
+    multiprocess mode
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    aggregated = CollectorRegistry()
+    multiprocess.MultiProcessCollector(aggregated)  # type: ignore[no-untyped-call]
+    return aggregated
+
+
+def exposition() -> tuple[bytes, str]:
+    """
+    The metrics in the Prometheus text format, and its content type
+    """
+    return generate_latest(registry()), CONTENT_TYPE_LATEST
+
+
+def start_server(port: int) -> None:
+    """
+    Serves the metrics on a listener thread, unless the port is 0
+    """
+    if not port:
+        return
+    start_http_server(port, registry=registry())
+    logger.info(f"Metrics listening on port {port}")
@@ -0,0 +1,128 @@
+"""
+Streaming multipart/form-data encoding for file uploads.
+"""
+import asyncio
+import io
+import mimetypes
+import uuid
+from pathlib import Path
+from typing import AsyncIterator, Generator
+
+from slowking.config import settings
+
+
+class MultipartEncoder:
+    """
+    A multipart/form-data request body which reads each file from disk in chunks
+    as the body is sent, so memory use stays O(chunk_size) whatever the size of
+    the files. Only the part headers are built up front, the length is computed
+    from the file sizes.
+
+    It is a file-like object for `requests` (`read`, `tell`, `seek(0)` and
+    `__len__` for the Content-Length) and an async iterable for httpx, which
+    opens and reads the files in a worker thread so the event loop never blocks
+    on disk I/O. The request adapters rewind it before each attempt, so a retried
+    upload re-reads the files.
+    """
+
+    def __init__(
+        self,
+        fields: dict[str, str],
+        files: list[tuple[str, Path]],
+        boundary: str | None = None,
+        chunk_size: int = settings.UPLOAD_CHUNK_SIZE,
+    ):
+        self.boundary = boundary or uuid.uuid4().hex
+        self.chunk_size = chunk_size
+        self._segments: list[bytes | Path] = []
+        self._length = 0
+
+        for name, value in fields.items():
+            self._add(self._part_header(name), value.encode("utf-8"))
+        for name, path in files:
+            content_type = mimetypes.guess_type(path.name)[0]
+            header = self._part_header(
+                name, path.name, content_type or "application/octet-stream"
+            )
+            self._add(header, path)
+        closing = f"--{self.boundary}--\r\n".encode("utf-8")
+        self._segments.append(closing)
+        self._length += len(closing)
+
+        self._position = 0
+        self._buffer = bytearray()
+        self._chunks = self._iter_chunks()
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self) -> int:
+        return self._length
+
+    def read(self, size: int | None = -1) -> bytes:
+        if size is None or size < 0:
+            size = self._length - self._position
+        while len(self._buffer) < size:
+            chunk = next(self._chunks, b"")
+            if not chunk:
+                break
+            self._buffer += chunk
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        self._position += len(data)
+        return data
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR and offset == 0:
+            return self._position
+        if whence != io.SEEK_SET or offset != 0:
+            raise io.UnsupportedOperation("MultipartEncoder can only rewind")
+        self._chunks.close()
+        self._chunks = self._iter_chunks()
+        self._buffer.clear()
+        self._position = 0
+        return 0
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        chunks = self._iter_chunks()
+        # only empty once the chunks are exhausted, every segment is non-empty
+        while chunk := await asyncio.to_thread(next, chunks, b""):
+            yield chunk
+
+    def _iter_chunks(self) -> Generator[bytes, None, None]:
+        for segment in self._segments:
+            if isinstance(segment, bytes):
+                yield segment
+                continue
+            with segment.open("rb") as f:
+                while chunk := f.read(self.chunk_size):
+                    yield chunk
+            yield b"\r\n"
+
+    def _add(self, header: bytes, value: bytes | Path) -> None:
+        if isinstance(value, Path):
+            self._segments.append(header)
+            self._segments.append(value)
+            self._length += len(header) + value.stat().st_size + 2
+        else:
+            self._segments.append(header + value + b"\r\n")
+            self._length += len(header) + len(value) + 2
+
+    def _part_header(
+        self, name: str, filename: str | None = None, content_type: str | None = None
+    ) -> bytes:
+        disposition = f'form-data; name="{_quote(name)}"'
+        if filename is not None:
+            disposition += f'; filename="{_quote(filename)}"'
+        header = f"--{self.boundary}\r\nContent-Disposition: {disposition}\r\n"
+        if content_type is not None:
+            header += f"Content-Type: {content_type}\r\n"
+        return f"{header}\r\n".encode("utf-8")
+
+
+def _quote(value: str) -> str:
+    return value.replace('"', "%22").replace("\r", "%0D").replace("\n", "%0A")
@@ -3,8 +3,15 @@ Notification adapters. Small examples for logging and email but
 could be extended to send different emails or Slack messages, etc.
 """
 import abc
+import atexit
 import logging.config
+import queue
 import smtplib
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Callable, Iterator
 
 from slowking.config import settings
 from slowking.domain import model
@@ -23,22 +30,190 @@ class LogNotifications(AbstractNotifications):
         logger.info(f"Sending notification for benchmark {benchmark.name}")
 
 
+class SMTPConnectionPool:
+    """
+    A small pool of SMTP connections. Connections are only opened when one is
+    needed, and an idle connection is health checked with NOOP before it is reused
+    so a connection the server has dropped is replaced rather than failing a send.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        size: int,
+        smtp_factory: Callable[..., smtplib.SMTP] = smtplib.SMTP,
+        timeout: float = settings.EMAIL_TIMEOUT,
+    ):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.smtp_factory = smtp_factory
+        self._idle: queue.LifoQueue[smtplib.SMTP] = queue.LifoQueue(maxsize=size)
+
+    @contextmanager
+    def connection(self) -> Iterator[smtplib.SMTP]:
+        server = self._checkout()
+        try:
+            yield server
+        except (smtplib.SMTPServerDisconnected, OSError):
+            self._close(server)
+            raise
+        except Exception:
+            self._checkin(server)
+            raise
+        self._checkin(server)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._close(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+    def _checkout(self) -> smtplib.SMTP:
+        while True:
+            try:
+                server = self._idle.get_nowait()
+            except queue.Empty:
+                logger.info(f"Opening SMTP connection to {self.host}:{self.port}")
+                return self.smtp_factory(
+                    self.host, port=self.port, timeout=self.timeout
+                )
+            if self._is_healthy(server):
+                return server
+            self._close(server)
+
+    def _checkin(self, server: smtplib.SMTP) -> None:
+        try:
+            self._idle.put_nowait(server)
+        except queue.Full:
+            self._close(server)
+
+    @staticmethod
+    def _is_healthy(server: smtplib.SMTP) -> bool:
+        try:
+            return server.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    @staticmethod
+    def _close(server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+
 class EmailNotifications(AbstractNotifications):
-    def __init__(self, smtp_host=settings.EMAIL_HOST, port=settings.EMAIL_PORT):
-        self.server = smtplib.SMTP(smtp_host, port=port)
-        self.server.noop()
+    """
+    Email notifications, sent from background workers so `send` never blocks on
+    SMTP. Up to `pool_size` workers send concurrently, each with a connection of
+    the pool. Messages a worker takes within `digest_window` seconds of its first
+    are sent as a single digest email, e.g. when many benchmarks finish together.
+
+    Queued messages are flushed on exit, for at most `close_timeout` seconds.
+    """
+
+    def __init__(
+        self,
+        smtp_host=settings.EMAIL_HOST,
+        port=settings.EMAIL_PORT,
+        pool_size: int = settings.EMAIL_POOL_SIZE,
+        digest_window: float = settings.EMAIL_DIGEST_WINDOW,
+        smtp_factory: Callable[..., smtplib.SMTP] = smtplib.SMTP,
+        close_timeout: float = settings.EMAIL_CLOSE_TIMEOUT,
+    ):
+        self.pool = SMTPConnectionPool(smtp_host, port, pool_size, smtp_factory)
+        self.pool_size = max(1, pool_size)
+        self.digest_window = digest_window
+        self.close_timeout = close_timeout
+        self._outbox: queue.Queue[tuple[str, str]] = queue.Queue()
+        self._workers: list[threading.Thread] = []
+        self._worker_lock = threading.Lock()
+        _instances.add(self)
 
     def send(self, benchmark: model.Benchmark, message: str) -> None:
-        subject = f"Benchmark Report: {benchmark.name}"
-        body = f"Report generated: {message}"
+        self._outbox.put((benchmark.name, message))
+        self._ensure_workers()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        Blocks until every queued message has been handled, or `timeout` seconds
+        have passed. Returns whether the queue was flushed.
+        """
+        with self._outbox.all_tasks_done:
+            return self._outbox.all_tasks_done.wait_for(
+                lambda: not self._outbox.unfinished_tasks, timeout
+            )
+
+    def close(self) -> None:
+        if self._workers and not self.flush(self.close_timeout):
+            logger.warning(
+                f"{self._outbox.unfinished_tasks} notification(s) not sent within "
+                f"{self.close_timeout}s"
+            )
+        self.pool.close()
+
+    def _ensure_workers(self) -> None:
+        with self._worker_lock:
+            self._workers = [w for w in self._workers if w.is_alive()]
+            while len(self._workers) < self.pool_size:
+                worker = threading.Thread(
+                    target=self._run,
+                    name=f"email-notifications-{len(self._workers)}",
+                    daemon=True,
+                )
+                worker.start()
+                self._workers.append(worker)
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._outbox.get()]
+            deadline = time.monotonic() + self.digest_window
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    batch.append(self._outbox.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                self._deliver(batch)
+            except Exception:
+                logger.exception(f"Failed to send {len(batch)} notification(s)")
+            finally:
+                for _ in batch:
+                    self._outbox.task_done()
+
+    def _deliver(self, batch: list[tuple[str, str]]) -> None:
+        if len(batch) == 1:
+            name, message = batch[0]
+            subject = f"Benchmark Report: {name}"
+            body = f"Report generated: {message}"
+        else:
+            subject = f"Benchmark Reports: {len(batch)} benchmarks completed"
+            body = "\n".join(
+                f"{name} - Report generated: {message}" for name, message in batch
+            )
         msg = f"Subject: {subject}\n{body}"
 
         # Hard coded as an example, could be taken from the benchmark aggregate
         # the CreateBenchmark command could have an email field
         destination = ["hello@example.com"]
 
-        self.server.sendmail(
-            from_addr="benchmarks@slowking.com",
-            to_addrs=destination,
-            msg=msg,
-        )
+        with self.pool.connection() as server:
+            server.sendmail(
+                from_addr="benchmarks@slowking.com",
+                to_addrs=destination,
+                msg=msg,
+            )
+
+
+# bootstrap creates an instance per bus, so a single exit hook closes all of them
+_instances: weakref.WeakSet[EmailNotifications] = weakref.WeakSet()
+
+
+@atexit.register
+def _close_all() -> None:
+    for notifications in list(_instances):
+        notifications.close()
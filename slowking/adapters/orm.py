@@ -26,6 +26,10 @@ benchmark = sa.Table(
     sa.Column("target_url", sa.String(255)),
     sa.Column("password", sa.String(255)),
     sa.Column("username", sa.String(255)),
+    sa.Column("upload_batch_size", sa.Integer(), nullable=True),
+    sa.Column("upload_concurrency", sa.Integer(), nullable=False, server_default="1"),
+    sa.Index("ix_benchmark_name", "name"),
+    sa.Index("ix_benchmark_target_url", "target_url"),
 )
 
 
@@ -37,6 +41,13 @@ project = sa.Table(
     sa.Column("name", sa.String(255)),
     sa.Column("eigen_project_id", sa.Integer(), nullable=True),
     sa.Column("all_docs_uploaded", sa.DateTime(), nullable=True),
+    sa.Column("documents_expected", sa.Integer(), nullable=False, server_default="0"),
+    sa.Column("documents_completed", sa.Integer(), nullable=False, server_default="0"),
+    sa.Column("documents_started", sa.Integer(), nullable=False, server_default="0"),
+    sa.Column("first_upload_time_start", sa.DateTime(), nullable=True),
+    sa.Column("last_upload_time_end", sa.DateTime(), nullable=True),
+    sa.Index("ix_project_benchmark_id", "benchmark_id", unique=True),
+    sa.Index("ix_project_eigen_project_id", "eigen_project_id"),
 )
 
 document = sa.Table(
@@ -49,17 +60,50 @@ document = sa.Table(
     sa.Column("eigen_document_id", sa.Integer(), nullable=True),
     sa.Column("upload_time_start", sa.DateTime(), nullable=True),
     sa.Column("upload_time_end", sa.DateTime(), nullable=True),
+    # also serves lookups by project_id alone, e.g. the project.document relationship
+    sa.Index("ix_document_project_id_name", "project_id", "name", unique=True),
+)
+
+upload_batch = sa.Table(
+    "upload_batch",
+    metadata,
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("benchmark_id", sa.Integer, sa.ForeignKey("benchmark.id")),
+    sa.Column("batch_number", sa.Integer(), nullable=False),
+    sa.Column("document_count", sa.Integer(), nullable=False),
+    sa.Column("size_bytes", sa.BigInteger(), nullable=False),
+    sa.Column("attempts", sa.Integer(), nullable=False),
+    sa.Column("upload_time_start", sa.DateTime(), nullable=False),
+    sa.Column("upload_time_end", sa.DateTime(), nullable=False),
+    sa.Column("error", sa.Text(), nullable=True),
+    sa.Index(
+        "ix_upload_batch_benchmark_id_batch_number",
+        "benchmark_id",
+        "batch_number",
+        unique=True,
+    ),
+)
+
+# bucket counts of the project's LatencySketch, one row per non-empty bucket
+latency_sketch = sa.Table(
+    "latency_sketch",
+    metadata,
+    sa.Column("project_id", sa.Integer, sa.ForeignKey("project.id"), primary_key=True),
+    sa.Column("bucket", sa.Integer(), primary_key=True, autoincrement=False),
+    sa.Column("count", sa.BigInteger(), nullable=False),
 )
 
 
 def start_mappers():
     logger.info("Starting ORM mappers...")
     # NOTE: calling bootstrap.bootstrap() will call this function
-    # and would raise an error if the mapping is already complete
-    # Both the API and the Event Handler call bootstrap.bootstrap()
-    # so for now (until a more refined approach is in place) we catch
-    # the exception and move on.
+    # and would raise an error if the mapping is already complete.
+    # The API and the Event Handler bootstrap once per process, but
+    # the tests bootstrap many times so we catch the exception and move on.
     try:
+        upload_batch_mapper = mapper_registry.map_imperatively(
+            model.UploadBatch, upload_batch
+        )
         document_mapper = mapper_registry.map_imperatively(model.Document, document)
         project_mapper = mapper_registry.map_imperatively(
             model.Project,
@@ -76,6 +120,10 @@ def start_mappers():
                     project_mapper,
                     uselist=False,
                 ),
+                "upload_batches": relationship(
+                    upload_batch_mapper,
+                    order_by=upload_batch.c.batch_number,
+                ),
             },
         )
         logger.info("ORM mapping complete.")
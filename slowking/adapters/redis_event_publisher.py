@@ -1,24 +1,89 @@
 import logging
+import time
+from typing import Iterable
 
 import redis
 
+from slowking.adapters import metrics
 from slowking.config import settings
 from slowking.domain import events
 
 logger = logging.getLogger(__name__)
 
+# One connection pool per process, shared by every publisher
+pool = redis.ConnectionPool(**settings.REDIS_CONFIG)  # type: ignore
 
-def publish(event: events.Event):
+
+def stream_key(channel: str) -> str:
+    return f"{settings.REDIS_STREAM_PREFIX}{channel}"
+
+
+class RedisEventPublisher:
     """
-    Publishes an event to the redis broker
+    Publishes events to the redis broker over pooled connections, either to a
+    pub/sub channel or appended to a stream depending on the event transport.
+    Several events can be pipelined in one round trip with `publish_many`.
     """
-    logger.info(f"publishing event {event} to channel {event.channel}")
 
-    subscribed_channels = settings.REDIS_SUBSCRIBE_CHANNELS
-    if event.channel is None or event.channel not in subscribed_channels:
-        logger.warning(f"Channel {event.channel} not found in subscribed channels")
-        return
+    def __init__(
+        self,
+        client: redis.Redis | None = None,
+        transport: str = settings.EVENT_TRANSPORT,
+    ):
+        self.client = client or redis.Redis(connection_pool=pool)
+        self.transport = transport
+
+    def publish(self, event: events.Event):
+        """
+        Publishes an event to the redis broker
+        """
+        self.publish_many([event])
+
+    def publish_many(self, events_to_publish: Iterable[events.Event]):
+        """
+        Publishes events to the redis broker in a single pipelined round trip
+        """
+        messages = []
+        for event in events_to_publish:
+            logger.info(f"publishing event {event} to channel {event.channel}")
+            if not self._is_subscribed(event):
+                continue
+            messages.append((event.channel, event.to_json()))
+        if not messages:
+            return
+
+        start = time.perf_counter()
+        try:
+            if len(messages) == 1:
+                self._send(self.client, *messages[0])
+            else:
+                pipe = self.client.pipeline(transaction=False)
+                for channel, json_message in messages:
+                    self._send(pipe, channel, json_message)
+                pipe.execute()
+        except redis.RedisError:
+            metrics.observe_publish(0, start, error=True)
+            raise
+        metrics.observe_publish(len(messages), start)
+
+    def _send(self, client: redis.Redis, channel: str, json_message: str):
+        if self.transport == "streams":
+            client.xadd(
+                stream_key(channel),
+                {"data": json_message},
+                maxlen=settings.REDIS_STREAM_MAXLEN,
+                approximate=True,
+            )
+        else:
+            client.publish(channel, json_message)
+
+    @staticmethod
+    def _is_subscribed(event: events.Event) -> bool:
+        subscribed_channels = settings.REDIS_SUBSCRIBE_CHANNELS
+        if event.channel is None or event.channel not in subscribed_channels:
+            logger.warning(f"Channel {event.channel} not found in subscribed channels")
+            return False
+        return True
+
 
-    json_message = event.to_json()
-    broker = redis.Redis(**settings.REDIS_CONFIG)  # type: ignore
-    broker.publish(channel=event.channel, message=json_message)
+publisher = RedisEventPublisher()
@@ -0,0 +1,445 @@
+"""
+Redis subscriber adapters, the consuming side of the event transport.
+"""
+import abc
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Iterator
+
+import redis
+import redis.asyncio as aioredis
+
+from slowking.adapters.redis_event_publisher import stream_key
+from slowking.config import settings
+
+logger = logging.getLogger(__name__)
+
+StreamEntries = list[tuple[Any, dict[Any, Any]]]
+
+
+@dataclass
+class ReceivedMessage:
+    channel: str
+    data: str
+    # stream entry id and key, only set by the streams transport
+    message_id: str | None = None
+    stream: str | None = None
+
+
+class AbstractSubscriber(abc.ABC):
+    @abc.abstractmethod
+    def listen(self) -> Iterator[ReceivedMessage]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def ack(self, message: ReceivedMessage) -> None:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def keep_alive(self, messages: list[ReceivedMessage]) -> None:
+        """
+        Resets the idle time of messages still being handled, so they are not
+        claimed by another consumer
+        """
+        raise NotImplementedError
+
+
+class AbstractAsyncSubscriber(abc.ABC):
+    @abc.abstractmethod
+    def listen(self) -> AsyncIterator[ReceivedMessage]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def ack(self, message: ReceivedMessage) -> None:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def keep_alive(self, messages: list[ReceivedMessage]) -> None:
+        raise NotImplementedError
+
+
+class PubSubSubscriber(AbstractSubscriber):
+    """
+    Fire-and-forget delivery to a single consumer. Messages published while the
+    consumer is down are lost.
+    """
+
+    def __init__(self, client: redis.Redis, channels: list[str]):
+        self.client = client
+        self.channels = channels
+
+    def listen(self) -> Iterator[ReceivedMessage]:
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(*self.channels)
+        for message in pubsub.listen():
+            yield _pubsub_message(message)
+
+    def ack(self, message: ReceivedMessage) -> None:
+        pass
+
+    def keep_alive(self, messages: list[ReceivedMessage]) -> None:
+        pass
+
+
+class AsyncPubSubSubscriber(AbstractAsyncSubscriber):
+    """
+    PubSubSubscriber on redis.asyncio
+    """
+
+    def __init__(self, client: aioredis.Redis, channels: list[str]):
+        self.client = client
+        self.channels = channels
+
+    async def listen(self) -> AsyncIterator[ReceivedMessage]:
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(*self.channels)
+        async for message in pubsub.listen():
+            yield _pubsub_message(message)
+
+    async def ack(self, message: ReceivedMessage) -> None:
+        pass
+
+    async def keep_alive(self, messages: list[ReceivedMessage]) -> None:
+        pass
+
+
+class ConsumerGroup:
+    """
+    At-least-once delivery with a stream per channel, read through a consumer
+    group so any number of consumers share the load. A message stays pending
+    until it is acked. On startup the consumer re-reads its own pending messages,
+    and messages left pending by another consumer for longer than `claim_idle_ms`
+    are claimed. A message delivered `max_deliveries` times is acked and dropped.
+
+    Only the messages of other, dead or stalled, consumers are claimed. A message
+    this consumer failed to handle stays pending until it restarts or another
+    consumer claims it.
+
+    This class holds what the sync and async stream subscribers share, which only
+    make the redis calls.
+    """
+
+    def __init__(
+        self,
+        channels: list[str],
+        group: str = settings.REDIS_STREAM_GROUP,
+        consumer: str = settings.REDIS_STREAM_CONSUMER,
+        count: int = settings.REDIS_STREAM_READ_COUNT,
+        block_ms: int = settings.REDIS_STREAM_BLOCK_MS,
+        claim_idle_ms: int = settings.REDIS_STREAM_CLAIM_IDLE_MS,
+        max_deliveries: int = settings.REDIS_STREAM_MAX_DELIVERIES,
+    ):
+        self.channels = {stream_key(channel): channel for channel in channels}
+        self.group = group
+        self.consumer = consumer
+        self.count = count
+        self.block_ms = block_ms
+        self.claim_idle_ms = claim_idle_ms
+        self.max_deliveries = max_deliveries
+
+    def _claimable(
+        self, stream: str, pending: list[dict[str, Any]]
+    ) -> tuple[list[Any], list[Any]]:
+        """
+        Splits the idle pending entries of a stream into the ids to drop and the
+        ids to claim
+        """
+        dropped, claimable = [], []
+        for entry in pending:
+            # this consumer's own entries may still be queued or being handled
+            if _decode(entry["consumer"]) == self.consumer:
+                continue
+            if entry["times_delivered"] >= self.max_deliveries:
+                logger.error(
+                    f"Dropping {stream} message {entry['message_id']} after "
+                    f"{entry['times_delivered']} deliveries"
+                )
+                dropped.append(entry["message_id"])
+            else:
+                claimable.append(entry["message_id"])
+        if claimable:
+            logger.info(f"Claiming {len(claimable)} idle message(s) from {stream}")
+        return dropped, claimable
+
+    def _decode_entries(
+        self, stream: str, entries: StreamEntries
+    ) -> tuple[list[ReceivedMessage], list[Any]]:
+        """
+        The messages of stream entries, and the ids of entries to ack without
+        handling them: claimed entries which were trimmed from the stream have no
+        fields
+        """
+        messages, trimmed = [], []
+        for message_id, fields in entries:
+            if not fields:
+                trimmed.append(message_id)
+                continue
+            messages.append(
+                ReceivedMessage(
+                    channel=self.channels[stream],
+                    data=_decode(
+                        fields[b"data"] if b"data" in fields else fields["data"]
+                    ),
+                    message_id=_decode(message_id),
+                    stream=stream,
+                )
+            )
+        return messages, trimmed
+
+    def _next_page(
+        self, last_ids: dict[str, str], response: list[Any]
+    ) -> list[tuple[str, StreamEntries]]:
+        """
+        Pages through the pending entries of each stream from id "0", a stream is
+        done once a page is empty
+        """
+        page = []
+        for stream, entries in response:
+            stream = _decode(stream)
+            if not entries:
+                del last_ids[stream]
+                continue
+            last_ids[stream] = _decode(entries[-1][0])
+            page.append((stream, entries))
+        return page
+
+    def _new_entries(self) -> dict[str, str]:
+        return {stream: ">" for stream in self.channels}
+
+    def _next_claim(self) -> float:
+        return time.monotonic() + self.claim_idle_ms / 1000
+
+
+class StreamSubscriber(ConsumerGroup, AbstractSubscriber):
+    def __init__(self, client: redis.Redis, channels: list[str], **kwargs: Any):
+        super().__init__(channels, **kwargs)
+        self.client = client
+
+    def listen(self) -> Iterator[ReceivedMessage]:
+        self.create_groups()
+        yield from self.recover_pending()
+
+        next_claim = 0.0
+        while True:
+            if time.monotonic() >= next_claim:
+                yield from self.claim_idle()
+                next_claim = self._next_claim()
+
+            response = self.client.xreadgroup(
+                self.group,
+                self.consumer,
+                self._new_entries(),
+                count=self.count,
+                block=self.block_ms,
+            )
+            for stream, entries in response or []:
+                yield from self._to_messages(_decode(stream), entries)
+
+    def ack(self, message: ReceivedMessage) -> None:
+        self.client.xack(message.stream, self.group, message.message_id)
+
+    def keep_alive(self, messages: list[ReceivedMessage]) -> None:
+        # claiming its own messages with JUSTID resets their idle time without
+        # counting a delivery
+        for stream, message_ids in _by_stream(messages).items():
+            self.client.xclaim(
+                stream, self.group, self.consumer, 0, message_ids, justid=True
+            )
+
+    def create_groups(self) -> None:
+        for stream in self.channels:
+            try:
+                self.client.xgroup_create(stream, self.group, id="0", mkstream=True)
+            except redis.ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+
+    def claim_idle(self) -> Iterator[ReceivedMessage]:
+        for stream in self.channels:
+            pending = self.client.xpending_range(
+                stream,
+                self.group,
+                min="-",
+                max="+",
+                count=self.count,
+                idle=self.claim_idle_ms,
+            )
+            dropped, claimable = self._claimable(stream, pending)
+            for message_id in dropped:
+                self.client.xack(stream, self.group, message_id)
+            if not claimable:
+                continue
+            claimed = self.client.xclaim(
+                stream, self.group, self.consumer, self.claim_idle_ms, claimable
+            )
+            yield from self._to_messages(stream, claimed)
+
+    def recover_pending(self) -> Iterator[ReceivedMessage]:
+        """
+        Re-reads messages delivered to this consumer before a restart but never
+        acked
+        """
+        last_ids = {stream: "0" for stream in self.channels}
+        while last_ids:
+            response = self.client.xreadgroup(
+                self.group,
+                self.consumer,
+                last_ids,
+                count=self.count,
+            )
+            if not response:
+                break
+            for stream, entries in self._next_page(last_ids, response):
+                yield from self._to_messages(stream, entries)
+
+    def _to_messages(
+        self, stream: str, entries: StreamEntries
+    ) -> Iterator[ReceivedMessage]:
+        messages, trimmed = self._decode_entries(stream, entries)
+        for message_id in trimmed:
+            self.client.xack(stream, self.group, message_id)
+        yield from messages
+
+
+class AsyncStreamSubscriber(ConsumerGroup, AbstractAsyncSubscriber):
+    """
+    StreamSubscriber on redis.asyncio
+    """
+
+    def __init__(self, client: aioredis.Redis, channels: list[str], **kwargs: Any):
+        super().__init__(channels, **kwargs)
+        self.client = client
+
+    async def listen(self) -> AsyncIterator[ReceivedMessage]:
+        await self.create_groups()
+        async for message in self.recover_pending():
+            yield message
+
+        next_claim = 0.0
+        while True:
+            if time.monotonic() >= next_claim:
+                async for message in self.claim_idle():
+                    yield message
+                next_claim = self._next_claim()
+
+            response = await self.client.xreadgroup(
+                self.group,
+                self.consumer,
+                self._new_entries(),
+                count=self.count,
+                block=self.block_ms,
+            )
+            for stream, entries in response or []:
+                for message in await self._to_messages(_decode(stream), entries):
+                    yield message
+
+    async def ack(self, message: ReceivedMessage) -> None:
+        await self.client.xack(message.stream, self.group, message.message_id)
+
+    async def keep_alive(self, messages: list[ReceivedMessage]) -> None:
+        for stream, message_ids in _by_stream(messages).items():
+            await self.client.xclaim(
+                stream, self.group, self.consumer, 0, message_ids, justid=True
+            )
+
+    async def create_groups(self) -> None:
+        for stream in self.channels:
+            try:
+                await self.client.xgroup_create(
+                    stream, self.group, id="0", mkstream=True
+                )
+            except redis.ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+
+    async def claim_idle(self) -> AsyncIterator[ReceivedMessage]:
+        for stream in self.channels:
+            pending = await self.client.xpending_range(
+                stream,
+                self.group,
+                min="-",
+                max="+",
+                count=self.count,
+                idle=self.claim_idle_ms,
+            )
+            dropped, claimable = self._claimable(stream, pending)
+            for message_id in dropped:
+                await self.client.xack(stream, self.group, message_id)
+            if not claimable:
+                continue
+            claimed = await self.client.xclaim(
+                stream, self.group, self.consumer, self.claim_idle_ms, claimable
+            )
+            for message in await self._to_messages(stream, claimed):
+                yield message
+
+    async def recover_pending(self) -> AsyncIterator[ReceivedMessage]:
+        last_ids = {stream: "0" for stream in self.channels}
+        while last_ids:
+            response = await self.client.xreadgroup(
+                self.group,
+                self.consumer,
+                last_ids,
+                count=self.count,
+            )
+            if not response:
+                break
+            for stream, entries in self._next_page(last_ids, response):
+                for message in await self._to_messages(stream, entries):
+                    yield message
+
+    async def _to_messages(
+        self, stream: str, entries: StreamEntries
+    ) -> list[ReceivedMessage]:
+        messages, trimmed = self._decode_entries(stream, entries)
+        for message_id in trimmed:
+            await self.client.xack(stream, self.group, message_id)
+        return messages
+
+
+def get_subscriber(
+    client: redis.Redis, transport: str = settings.EVENT_TRANSPORT
+) -> AbstractSubscriber:
+    channels = settings.REDIS_SUBSCRIBE_CHANNELS
+    match transport:
+        case "streams":
+            return StreamSubscriber(client, channels)
+        case "pubsub":
+            return PubSubSubscriber(client, channels)
+        case _:
+            raise NotImplementedError(f"Unknown event transport: {transport}")
+
+
+def get_async_subscriber(
+    client: aioredis.Redis, transport: str = settings.EVENT_TRANSPORT
+) -> AbstractAsyncSubscriber:
+    channels = settings.REDIS_SUBSCRIBE_CHANNELS
+    match transport:
+        case "streams":
+            return AsyncStreamSubscriber(client, channels)
+        case "pubsub":
+            return AsyncPubSubSubscriber(client, channels)
+        case _:
+            raise NotImplementedError(f"Unknown event transport: {transport}")
+
+
+def _pubsub_message(message: dict[str, Any]) -> ReceivedMessage:
+    logger.info(f"Eventbus message received: {message}")
+    return ReceivedMessage(
+        channel=_decode(message["channel"]), data=_decode(message["data"])
+    )
+
+
+def _by_stream(messages: list[ReceivedMessage]) -> dict[str, list[str]]:
+    by_stream: dict[str, list[str]] = {}
+    for message in messages:
+        if message.stream is not None and message.message_id is not None:
+            by_stream.setdefault(message.stream, []).append(message.message_id)
+    return by_stream
+
+
+def _decode(value: bytes | str) -> str:
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    return value
@@ -2,33 +2,64 @@
 Report generation adapters.
 """
 import abc
+import array
 import csv
+import gzip
 import logging.config
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any, Iterable
 
+import numpy as np
+
+from slowking.adapters.repository import DocumentTimingRow
 from slowking.config import settings
-from slowking.domain import model
+from slowking.domain import model, statistics
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class Report:
+    file_path: str
+    summary_path: str
+    summary: statistics.LatencySummary
+
+
 class AbstractReporter:
     @abc.abstractmethod
-    def create(self, benchmark: model.Benchmark) -> str:
+    def create(
+        self,
+        benchmark: model.Benchmark,
+        documents: Iterable[model.Document | DocumentTimingRow] | None = None,
+    ) -> Report:
         raise NotImplementedError
 
 
 class LatencyReport(AbstractReporter):
     """
-    Latency report generator. Creates a CSV file with document upload times.
+    Latency report generator. Creates a CSV file with document upload times, and
+    a summary CSV with the latency statistics and histogram.
+
+    Rows are written as they are read from `documents`, so a report streamed from
+    the database never holds more than one chunk of documents in memory. Only the
+    upload times are kept, as a float array, for the statistics.
     """
 
     output_dir: str = settings.OUTPUT_DIR
     output_filename: str = settings.OUTPUT_FILENAME
 
     @classmethod
-    def create(cls, benchmark: model.Benchmark) -> str:
+    def create(
+        cls,
+        benchmark: model.Benchmark,
+        documents: Iterable[model.Document | DocumentTimingRow] | None = None,
+        compress: bool = settings.REPORT_GZIP,
+        buckets: list[float] = settings.REPORT_HISTOGRAM_BUCKETS,
+    ) -> Report:
         """
-        Create report for given benchmark.
+        Create report for given benchmark, from `documents` or the documents of the
+        benchmark's project. The report is gzipped when `compress` is set.
         """
         fieldnames = [
             "Benchmark Name",
@@ -38,28 +69,123 @@ class LatencyReport(AbstractReporter):
             "Doc Name",
             "Upload Time (seconds)",
         ]
-        base_info = {
-            "Benchmark Name": benchmark.name,
-            "Benchmark Type": benchmark.benchmark_type,
-            "Infra": benchmark.target_infra,
-            "Eigen Version": benchmark.eigen_platform_version,
-        }
-        fields = []
-        for doc in benchmark.project.document:
-            doc_info = {
-                "Doc Name": doc.name,
-                "Upload Time (seconds)": doc.upload_time,
-            }
-            fields.append({**base_info, **doc_info})
+        base_info = [
+            benchmark.name,
+            benchmark.benchmark_type,
+            benchmark.target_infra,
+            benchmark.eigen_platform_version,
+        ]
+        if documents is None:
+            documents = benchmark.project.document
+
         file_path = f"{cls.output_dir}{cls.output_filename}"
-        with open(file_path, "w") as csv_file:
-            csv_writer = csv.DictWriter(
-                csv_file,
-                delimiter=",",
-                quoting=csv.QUOTE_MINIMAL,
-                fieldnames=fieldnames,
+        if compress:
+            file_path += ".gz"
+        upload_times = array.array("d")
+        rows = 0
+        with cls._open(file_path, compress) as csv_file:
+            csv_writer = csv.writer(csv_file, delimiter=",", quoting=csv.QUOTE_MINIMAL)
+            csv_writer.writerow(fieldnames)
+            for doc in documents:
+                upload_time = doc.upload_time
+                csv_writer.writerow([*base_info, doc.name, upload_time])
+                if upload_time is not None:
+                    upload_times.append(upload_time)
+                rows += 1
+        logger.info(f"=== LatencyReport {file_path} created with {rows} rows ===")
+
+        summary = statistics.summarise(
+            np.frombuffer(upload_times, dtype=np.float64), buckets
+        )
+        summary_path = cls._write_summary(summary)
+        return Report(file_path=file_path, summary_path=summary_path, summary=summary)
+
+    @classmethod
+    def _write_summary(cls, summary: statistics.LatencySummary) -> str:
+        stem = Path(cls.output_filename).stem
+        file_path = f"{cls.output_dir}{stem}_summary.csv"
+        with open(file_path, "w", newline="") as csv_file:
+            csv_writer = csv.writer(csv_file, delimiter=",", quoting=csv.QUOTE_MINIMAL)
+            csv_writer.writerow(["Statistic", "Upload Time (seconds)"])
+            csv_writer.writerow(["count", summary.count])
+            csv_writer.writerow(["min", summary.min])
+            csv_writer.writerow(["max", summary.max])
+            csv_writer.writerow(["mean", summary.mean])
+            csv_writer.writerow(["stddev", summary.stddev])
+            csv_writer.writerows(summary.percentiles.items())
+            csv_writer.writerow([])
+            csv_writer.writerow(
+                ["Bucket Lower (seconds)", "Bucket Upper (seconds)", "Documents"]
             )
-            csv_writer.writeheader()
-            csv_writer.writerows(fields)
-        logger.info(f"=== LatencyReport {file_path} created ===")
+            for bucket in summary.histogram:
+                csv_writer.writerow([bucket.lower, bucket.upper, bucket.count])
+        logger.info(f"=== LatencyReport summary {file_path} created ===")
+        return file_path
+
+    @staticmethod
+    def _open(file_path: str, compress: bool) -> IO[str]:
+        if compress:
+            return gzip.open(file_path, "wt", newline="")
+        return open(file_path, "w", newline="")
+
+
+class ComparisonReport:
+    """
+    Benchmark comparison report generator. Creates a CSV file with a row per
+    percentile of each candidate compared to the baseline.
+    """
+
+    output_dir: str = settings.OUTPUT_DIR
+    output_filename: str = f"comparison_{settings.OUTPUT_FILENAME}"
+
+    @classmethod
+    def create(cls, comparisons: list[dict[str, Any]]) -> str:
+        """
+        Create report for comparisons made by `views.compare_benchmarks`.
+        """
+        fieldnames = [
+            "Baseline Name",
+            "Baseline Eigen Version",
+            "Candidate Name",
+            "Candidate Eigen Version",
+            "Percentile",
+            "Baseline (seconds)",
+            "Candidate (seconds)",
+            "Delta (seconds)",
+            "Relative Delta",
+            "CI Low",
+            "CI High",
+            "Percentile Regressed",
+            "Probability Slower",
+            "P Value",
+            "Regression",
+        ]
+        file_path = f"{cls.output_dir}{cls.output_filename}"
+        with open(file_path, "w", newline="") as csv_file:
+            csv_writer = csv.writer(csv_file, delimiter=",", quoting=csv.QUOTE_MINIMAL)
+            csv_writer.writerow(fieldnames)
+            for comparison in comparisons:
+                baseline = comparison["baseline"]
+                candidate = comparison["candidate"]
+                for delta in comparison["percentiles"]:
+                    csv_writer.writerow(
+                        [
+                            baseline["name"],
+                            baseline["eigen_platform_version"],
+                            candidate["name"],
+                            candidate["eigen_platform_version"],
+                            delta["label"],
+                            delta["baseline"],
+                            delta["candidate"],
+                            delta["delta"],
+                            delta["relative_delta"],
+                            delta["ci_low"],
+                            delta["ci_high"],
+                            delta["regressed"],
+                            comparison["probability_slower"],
+                            comparison["p_value"],
+                            comparison["regression"],
+                        ]
+                    )
+        logger.info(f"=== ComparisonReport {file_path} created ===")
         return file_path
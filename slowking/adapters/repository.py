@@ -2,18 +2,102 @@
 Repository adapters
 """
 import abc
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Iterator, NamedTuple
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql, sqlite
 
 from slowking.adapters import orm
+from slowking.adapters.cache import LRUCache
+from slowking.config import settings
 from slowking.domain import model
+from slowking.domain.statistics import LatencySketch
+
+
+@dataclass(frozen=True)
+class BenchmarkRef:
+    """
+    Identifies the benchmark, and its project row, that a target host and Eigen
+    project id belong to. Never changes once `create_project` has run.
+    """
+
+    benchmark_id: int
+    benchmark_type: str
+    project_id: int
+
+
+@dataclass
+class DocumentUploadTimes:
+    """
+    Upload times of a document row, as returned by an atomic timing update.
+    """
+
+    document_id: int
+    upload_time_start: datetime | None
+    upload_time_end: datetime | None
+
+    @property
+    def upload_time(self) -> float | None:
+        if self.upload_time_start is None or self.upload_time_end is None:
+            return None
+        return (self.upload_time_end - self.upload_time_start).total_seconds()
+
+
+class DocumentTimingRow(NamedTuple):
+    """
+    A row of the latency report.
+    """
+
+    name: str
+    upload_time_start: datetime | None
+    upload_time_end: datetime | None
+
+    @property
+    def upload_time(self) -> float | None:
+        if self.upload_time_start is None or self.upload_time_end is None:
+            return None
+        return (self.upload_time_end - self.upload_time_start).total_seconds()
+
+
+@dataclass
+class DocumentProgress:
+    """
+    Document counters of a benchmark's project, read from a single row.
+    """
+
+    benchmark_id: int
+    benchmark_type: str
+    documents_expected: int
+    documents_completed: int
+    all_docs_uploaded: datetime | None
+    documents_started: int = 0
+    first_upload_time_start: datetime | None = None
+    last_upload_time_end: datetime | None = None
 
 
 class AbstractRepository(abc.ABC):
-    def __init__(self):
-        pass
+    def __init__(self, benchmark_refs: LRUCache[BenchmarkRef] | None = None):
+        if benchmark_refs is None:
+            benchmark_refs = LRUCache(
+                maxsize=settings.BENCHMARK_CACHE_MAXSIZE,
+                ttl=settings.BENCHMARK_CACHE_TTL,
+            )
+        self.benchmark_refs = benchmark_refs
 
     def add(self, benchmark: model.Benchmark) -> model.Benchmark:
         return self._add(benchmark)
 
+    def add_documents(
+        self, benchmark: model.Benchmark, documents: list[tuple[str, str]]
+    ) -> None:
+        """
+        Adds (name, file_path) documents to a flushed benchmark's project, without
+        building a Document entity per row.
+        """
+        self._add_documents(benchmark, documents)
+
     def get_by_id(self, id: int) -> model.Benchmark:
         benchmark = self._get_by_id(id)
         return benchmark
@@ -26,10 +110,98 @@ class AbstractRepository(abc.ABC):
         benchmark = self._get_by_host_and_project_id(host, project_id)
         return benchmark
 
+    def resolve_benchmark(self, host: str, project_id: int) -> BenchmarkRef | None:
+        """
+        Resolves a target host and Eigen project id to the benchmark, served from
+        the `benchmark_refs` cache so the hot ingestion path skips the join query.
+        """
+        key = (host, project_id)
+        benchmark_ref = self.benchmark_refs.get(key)
+        if benchmark_ref is None:
+            benchmark_ref = self._resolve_benchmark(host, project_id)
+            if benchmark_ref is not None:
+                self.benchmark_refs.set(key, benchmark_ref)
+        return benchmark_ref
+
+    def prime_benchmark_ref(self, host: str, project_id: int) -> None:
+        """
+        Eagerly caches the benchmark for a host and Eigen project id.
+        """
+        benchmark_ref = self._resolve_benchmark(host, project_id)
+        if benchmark_ref is not None:
+            self.benchmark_refs.set((host, project_id), benchmark_ref)
+
+    def set_document_upload_times(
+        self,
+        benchmark: BenchmarkRef,
+        document_name: str,
+        start_time: datetime | None,
+        end_time: datetime | None,
+    ) -> DocumentUploadTimes | None:
+        upload_times = self._set_document_upload_times(
+            benchmark, document_name, start_time, end_time
+        )
+        return upload_times
+
+    def stream_document_upload_times(
+        self, benchmark_id: int, chunk_size: int = settings.REPORT_CHUNK_SIZE
+    ) -> Iterator[DocumentTimingRow]:
+        """
+        Yields the name and upload times of every document of a benchmark, fetched
+        in chunks. Must be consumed inside the unit of work.
+        """
+        return self._stream_document_upload_times(benchmark_id, chunk_size)
+
+    def get_upload_times(self, benchmark_id: int) -> list[float]:
+        """
+        The upload time in seconds of every document of a benchmark with both
+        timestamps set
+        """
+        return self._get_upload_times(benchmark_id)
+
+    def increment_documents_started(
+        self, project_id: int, count: int, first_start: datetime
+    ) -> None:
+        """
+        Adds `count` to the started counter and moves the project's first upload
+        start back to `first_start` if it is earlier
+        """
+        self._increment_documents_started(project_id, count, first_start)
+
+    def increment_documents_completed(
+        self, project_id: int, count: int = 1, last_end: datetime | None = None
+    ) -> None:
+        self._increment_documents_completed(project_id, count, last_end)
+
+    def get_document_progress(self, benchmark_id: int) -> DocumentProgress | None:
+        progress = self._get_document_progress(benchmark_id)
+        return progress
+
+    def merge_latency_sketch(self, project_id: int, sketch: LatencySketch) -> None:
+        """
+        Adds the bucket counts of `sketch` to the project's persisted sketch
+        """
+        if sketch.counts:
+            self._merge_latency_sketch(project_id, sketch)
+
+    def get_latency_sketch(self, benchmark_id: int) -> LatencySketch:
+        return self._get_latency_sketch(benchmark_id)
+
+    def mark_all_documents_uploaded(
+        self, benchmark_id: int, uploaded_at: datetime
+    ) -> bool:
+        return self._mark_all_documents_uploaded(benchmark_id, uploaded_at)
+
     @abc.abstractmethod
     def _add(self, benchmark: model.Benchmark) -> model.Benchmark:
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def _add_documents(
+        self, benchmark: model.Benchmark, documents: list[tuple[str, str]]
+    ) -> None:
+        raise NotImplementedError
+
     @abc.abstractmethod
     def _get_by_id(self, id) -> model.Benchmark:
         raise NotImplementedError
@@ -44,19 +216,93 @@ class AbstractRepository(abc.ABC):
     ) -> model.Benchmark:
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def _resolve_benchmark(self, host: str, project_id: int) -> BenchmarkRef | None:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def _set_document_upload_times(
+        self,
+        benchmark: BenchmarkRef,
+        document_name: str,
+        start_time: datetime | None,
+        end_time: datetime | None,
+    ) -> DocumentUploadTimes | None:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def _stream_document_upload_times(
+        self, benchmark_id: int, chunk_size: int
+    ) -> Iterator[DocumentTimingRow]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def _get_upload_times(self, benchmark_id: int) -> list[float]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def _increment_documents_started(
+        self, project_id: int, count: int, first_start: datetime
+    ) -> None:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def _increment_documents_completed(
+        self, project_id: int, count: int, last_end: datetime | None
+    ) -> None:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def _get_document_progress(self, benchmark_id: int) -> DocumentProgress | None:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def _merge_latency_sketch(self, project_id: int, sketch: LatencySketch) -> None:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def _get_latency_sketch(self, benchmark_id: int) -> LatencySketch:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def _mark_all_documents_uploaded(
+        self, benchmark_id: int, uploaded_at: datetime
+    ) -> bool:
+        raise NotImplementedError
+
 
 class SqlAlchemyRepository(AbstractRepository):
     """
     Repository for the Benchmark aggregate model, using SQLAlchemy
     """
 
-    def __init__(self, session):
-        super().__init__()
+    def __init__(self, session, benchmark_refs: LRUCache[BenchmarkRef] | None = None):
+        super().__init__(benchmark_refs)
         self.session = session
 
     def _add(self, benchmark) -> model.Benchmark:
         return self.session.add(benchmark)
 
+    def _add_documents(
+        self, benchmark: model.Benchmark, documents: list[tuple[str, str]]
+    ) -> None:
+        """
+        A single executemany INSERT, which the driver sends in pages of rows.
+        """
+        if not documents:
+            return
+        self.session.execute(
+            sa.insert(orm.document),
+            [
+                {
+                    "project_id": benchmark.project.id,
+                    "name": name,
+                    "file_path": file_path,
+                }
+                for name, file_path in documents
+            ],
+        )
+
     def _get_by_id(self, id) -> model.Benchmark:
         return self.session.query(model.Benchmark).filter_by(id=id).first()
 
@@ -75,3 +321,219 @@ class SqlAlchemyRepository(AbstractRepository):
             )
             .first()
         )
+
+    def _resolve_benchmark(self, host: str, project_id: int) -> BenchmarkRef | None:
+        row = self.session.execute(
+            sa.select(
+                orm.benchmark.c.id,
+                orm.benchmark.c._benchmark_type,
+                orm.project.c.id,
+            )
+            .join(orm.project, orm.project.c.benchmark_id == orm.benchmark.c.id)
+            .where(
+                orm.benchmark.c.target_url == host,
+                orm.project.c.eigen_project_id == project_id,
+            )
+        ).first()
+        if row is None:
+            return None
+        return BenchmarkRef(*row)
+
+    def _set_document_upload_times(
+        self,
+        benchmark: BenchmarkRef,
+        document_name: str,
+        start_time: datetime | None,
+        end_time: datetime | None,
+    ) -> DocumentUploadTimes | None:
+        """
+        Sets the upload start and/or end time of a document with a single conditional
+        UPDATE ... RETURNING. Only the document row is locked, so concurrent updates
+        for different documents never conflict.
+
+        A timestamp is only written if it has not been set yet; replayed timings
+        match no row and None is returned.
+        """
+        document = orm.document
+        values = {}
+        pending = []
+        if start_time is not None:
+            values["upload_time_start"] = start_time
+            pending.append(document.c.upload_time_start.is_(None))
+        if end_time is not None:
+            values["upload_time_end"] = end_time
+            pending.append(document.c.upload_time_end.is_(None))
+        if not values:
+            return None
+
+        stmt = (
+            sa.update(document)
+            .where(
+                document.c.project_id == benchmark.project_id,
+                document.c.name == document_name,
+                sa.or_(*pending),
+            )
+            .values(
+                {
+                    document.c[column]: sa.func.coalesce(document.c[column], value)
+                    for column, value in values.items()
+                }
+            )
+            .returning(
+                document.c.id,
+                document.c.upload_time_start,
+                document.c.upload_time_end,
+            )
+        )
+        row = self.session.execute(stmt).first()
+        if row is None:
+            return None
+        return DocumentUploadTimes(*row)
+
+    def _stream_document_upload_times(
+        self, benchmark_id: int, chunk_size: int
+    ) -> Iterator[DocumentTimingRow]:
+        """
+        yield_per streams the rows through a server-side cursor on PostgreSQL, so
+        only one chunk is held in memory at a time.
+        """
+        document = orm.document
+        result = self.session.execute(
+            sa.select(
+                document.c.name,
+                document.c.upload_time_start,
+                document.c.upload_time_end,
+            )
+            .join(orm.project, orm.project.c.id == document.c.project_id)
+            .where(orm.project.c.benchmark_id == benchmark_id)
+            .order_by(document.c.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        for name, start, end in result:
+            yield DocumentTimingRow(name, start, end)
+
+    def _get_upload_times(self, benchmark_id: int) -> list[float]:
+        """
+        The durations are computed by the database, so no datetime is built per row
+        """
+        document = orm.document
+        start, end = document.c.upload_time_start, document.c.upload_time_end
+        seconds: sa.ColumnElement[Any]
+        if self.session.get_bind().dialect.name == "postgresql":
+            seconds = sa.extract("epoch", end - start)
+        else:
+            seconds = (sa.func.julianday(end) - sa.func.julianday(start)) * 86400.0
+        rows = self.session.execute(
+            sa.select(sa.cast(seconds, sa.Float))
+            .join(orm.project, orm.project.c.id == document.c.project_id)
+            .where(
+                orm.project.c.benchmark_id == benchmark_id,
+                start.is_not(None),
+                end.is_not(None),
+            )
+        )
+        return list(rows.scalars())
+
+    def _increment_documents_started(
+        self, project_id: int, count: int, first_start: datetime
+    ) -> None:
+        project = orm.project
+        first = project.c.first_upload_time_start
+        self.session.execute(
+            sa.update(project)
+            .where(project.c.id == project_id)
+            .values(
+                documents_started=project.c.documents_started + count,
+                first_upload_time_start=sa.case(
+                    (sa.or_(first.is_(None), first > first_start), first_start),
+                    else_=first,
+                ),
+            )
+        )
+
+    def _increment_documents_completed(
+        self, project_id: int, count: int, last_end: datetime | None
+    ) -> None:
+        project = orm.project
+        values: dict[str, Any] = {
+            "documents_completed": project.c.documents_completed + count
+        }
+        if last_end is not None:
+            last = project.c.last_upload_time_end
+            values["last_upload_time_end"] = sa.case(
+                (sa.or_(last.is_(None), last < last_end), last_end), else_=last
+            )
+        self.session.execute(
+            sa.update(project).where(project.c.id == project_id).values(values)
+        )
+
+    def _get_document_progress(self, benchmark_id: int) -> DocumentProgress | None:
+        row = self.session.execute(
+            sa.select(
+                orm.benchmark.c.id,
+                orm.benchmark.c._benchmark_type,
+                orm.project.c.documents_expected,
+                orm.project.c.documents_completed,
+                orm.project.c.all_docs_uploaded,
+                orm.project.c.documents_started,
+                orm.project.c.first_upload_time_start,
+                orm.project.c.last_upload_time_end,
+            )
+            .join(orm.project, orm.project.c.benchmark_id == orm.benchmark.c.id)
+            .where(orm.benchmark.c.id == benchmark_id)
+        ).first()
+        if row is None:
+            return None
+        return DocumentProgress(*row)
+
+    def _merge_latency_sketch(self, project_id: int, sketch: LatencySketch) -> None:
+        """
+        Upserts every bucket with `count = count + excluded.count` in one
+        executemany. Concurrent merges into the same project only wait on the row
+        locks of shared buckets, and buckets are written in ascending order so two
+        merges can not deadlock.
+        """
+        table = orm.latency_sketch
+        dialect = self.session.get_bind().dialect.name
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.project_id, table.c.bucket],
+            set_={"count": table.c.count + stmt.excluded.count},
+        )
+        self.session.execute(
+            stmt,
+            [
+                {"project_id": project_id, "bucket": bucket, "count": count}
+                for bucket, count in sorted(sketch.counts.items())
+            ],
+        )
+
+    def _get_latency_sketch(self, benchmark_id: int) -> LatencySketch:
+        rows = self.session.execute(
+            sa.select(orm.latency_sketch.c.bucket, orm.latency_sketch.c.count)
+            .join(orm.project, orm.project.c.id == orm.latency_sketch.c.project_id)
+            .where(orm.project.c.benchmark_id == benchmark_id)
+        )
+        return LatencySketch({bucket: count for bucket, count in rows})
+
+    def _mark_all_documents_uploaded(
+        self, benchmark_id: int, uploaded_at: datetime
+    ) -> bool:
+        """
+        Stamps all_docs_uploaded once every expected document has completed.
+        Returns False if the project is not complete or was already stamped, so
+        exactly one caller wins.
+        """
+        project = orm.project
+        row = self.session.execute(
+            sa.update(project)
+            .where(
+                project.c.benchmark_id == benchmark_id,
+                project.c.all_docs_uploaded.is_(None),
+                project.c.documents_completed >= project.c.documents_expected,
+            )
+            .values(all_docs_uploaded=uploaded_at)
+            .returning(project.c.id)
+        ).first()
+        return row is not None
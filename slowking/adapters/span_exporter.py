@@ -0,0 +1,212 @@
+"""
+Span exporter, writes trace spans to a local file in the OpenTelemetry JSON format.
+"""
+import atexit
+import json
+import logging
+import queue
+import threading
+import weakref
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, TextIO
+
+logger = logging.getLogger(__name__)
+
+AttributeValue = str | int | float | bool | list[str]
+
+# https://opentelemetry.io/docs/specs/otel/trace/api/#spankind
+SPAN_KIND_INTERNAL = 1
+STATUS_CODE_OK = 1
+STATUS_CODE_ERROR = 2
+
+
+@dataclass
+class Span:
+    # hex encoded, 16 bytes for the trace id and 8 bytes for the span ids
+    trace_id: str
+    span_id: str
+    name: str
+    start_time_ns: int
+    end_time_ns: int
+    parent_span_id: str | None = None
+    attributes: dict[str, AttributeValue] = field(default_factory=dict)
+    error: str | None = None
+
+
+class SpanFileExporter:
+    """
+    Appends spans to a file as OTLP JSON, one `ExportTraceServiceRequest` per line.
+    It is the format the OpenTelemetry Collector's file exporter writes and its
+    `otlpjsonfile` receiver reads, so a trace file can be forwarded to Jaeger or
+    any other OTLP backend.
+
+    The file is opened on the first export and each line is written and flushed
+    whole, so processes appending to the same file do not interleave spans.
+    """
+
+    def __init__(self, path: str, service_name: str = "slowking"):
+        self.path = Path(path)
+        self.service_name = service_name
+        self._file: TextIO | None = None
+        self._lock = threading.Lock()
+
+    def export(self, spans: list[Span]) -> None:
+        if not spans:
+            return
+        line = json.dumps(self._to_otlp(spans), separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = self.path.open("a", encoding="utf-8")
+            self._file.write(line)
+            self._file.flush()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _to_otlp(self, spans: list[Span]) -> dict[str, Any]:
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": _attributes({"service.name": self.service_name})
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "slowking.messagebus"},
+                            "spans": [_span(span) for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+
+
+class BatchSpanExporter:
+    """
+    Buffers spans and exports them in batches from a background thread, so
+    recording a span never blocks the caller, e.g. the event loop of the
+    AsyncMessageBus, on the file write. When more than `max_queue_size` spans are
+    waiting, new spans are dropped rather than growing the buffer.
+
+    Buffered spans are flushed on exit, for at most `shutdown_timeout` seconds.
+    """
+
+    def __init__(
+        self,
+        exporter: SpanFileExporter,
+        max_batch_size: int = 512,
+        max_queue_size: int = 2048,
+        shutdown_timeout: float = 5.0,
+    ):
+        self.exporter = exporter
+        self.max_batch_size = max_batch_size
+        self.shutdown_timeout = shutdown_timeout
+        self.dropped = 0
+        self._queue: queue.Queue[Span] = queue.Queue(maxsize=max_queue_size)
+        self._worker: threading.Thread | None = None
+        self._worker_lock = threading.Lock()
+        _batch_exporters.add(self)
+
+    def export(self, spans: list[Span]) -> None:
+        for span in spans:
+            try:
+                self._queue.put_nowait(span)
+            except queue.Full:
+                self.dropped += 1
+                logger.warning(f"Span buffer full, dropped span {span.name}")
+        self._ensure_worker()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        Blocks until every buffered span has been exported, or `timeout` seconds
+        have passed. Returns whether the buffer was flushed.
+        """
+        with self._queue.all_tasks_done:
+            return self._queue.all_tasks_done.wait_for(
+                lambda: not self._queue.unfinished_tasks, timeout
+            )
+
+    def shutdown(self) -> None:
+        if self._worker is not None and not self.flush(self.shutdown_timeout):
+            logger.warning(
+                f"{self._queue.unfinished_tasks} span(s) not exported within "
+                f"{self.shutdown_timeout}s"
+            )
+        self.exporter.shutdown()
+
+    def _ensure_worker(self) -> None:
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="span-exporter", daemon=True
+                )
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                self.exporter.export(batch)
+            except Exception:
+                logger.exception(f"Failed to export {len(batch)} span(s)")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+
+# bootstrap creates an exporter per bus, so a single exit hook flushes all of them
+_batch_exporters: weakref.WeakSet[BatchSpanExporter] = weakref.WeakSet()
+
+
+@atexit.register
+def _shutdown_all() -> None:
+    for exporter in list(_batch_exporters):
+        exporter.shutdown()
+
+
+def _span(span: Span) -> dict[str, Any]:
+    status: dict[str, Any] = {"code": STATUS_CODE_OK}
+    if span.error is not None:
+        status = {"code": STATUS_CODE_ERROR, "message": span.error}
+    otlp_span = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": SPAN_KIND_INTERNAL,
+        # uint64 values are strings in the protobuf JSON mapping
+        "startTimeUnixNano": str(span.start_time_ns),
+        "endTimeUnixNano": str(span.end_time_ns),
+        "attributes": _attributes(span.attributes),
+        "status": status,
+    }
+    if span.parent_span_id is not None:
+        otlp_span["parentSpanId"] = span.parent_span_id
+    return otlp_span
+
+
+def _attributes(attributes: dict[str, AttributeValue]) -> list[dict[str, Any]]:
+    return [{"key": key, "value": _value(value)} for key, value in attributes.items()]
+
+
+def _value(value: AttributeValue) -> dict[str, Any]:
+    # bool first, it is a subclass of int
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, list):
+        return {"arrayValue": {"values": [_value(v) for v in value]}}
+    return {"stringValue": value}
@@ -1,14 +1,19 @@
+import functools
 import logging.config
 from typing import Callable, Type
 
 from slowking.adapters import orm, redis_event_publisher
+from slowking.adapters.artifacts import ArtifactCatalog
+from slowking.adapters.async_http import AsyncEigenClient
 from slowking.adapters.http import EigenClient
 from slowking.adapters.notifications import (
     AbstractNotifications,
     EmailNotifications,
 )
+from slowking.adapters.span_exporter import BatchSpanExporter, SpanFileExporter
+from slowking.config import settings
 from slowking.domain import commands, events
-from slowking.service_layer import handlers, messagebus, unit_of_work
+from slowking.service_layer import handlers, messagebus, tracing, unit_of_work
 
 logger = logging.getLogger(__name__)
 
@@ -16,10 +21,79 @@ logger = logging.getLogger(__name__)
 def bootstrap(
     start_orm: bool = True,
     notifications: AbstractNotifications = None,  # type: ignore
-    publish: Callable[[events.Event], None] = redis_event_publisher.publish,
+    publish: Callable[[events.Event], None] = redis_event_publisher.publisher.publish,
+    publish_many: Callable[[list[events.Event]], None] | None = None,
     uow: unit_of_work.AbstractUnitOfWork = unit_of_work.SqlAlchemyUnitOfWork(),
     client: Type[EigenClient] = EigenClient,
+    catalog: ArtifactCatalog = None,  # type: ignore
 ) -> messagebus.MessageBus:
+    """
+    Bootstraps the bus. `publish_many` publishes several events in one round
+    trip, it defaults to calling `publish` per event.
+    """
+    publish_many = messagebus.track_published_many(
+        publish_many or _publish_each(publish)
+    )
+    publish = messagebus.track_published(publish)
+    return messagebus.MessageBus(
+        uow=uow,
+        **_inject_handlers(
+            start_orm, notifications, publish, publish_many, uow, client, catalog
+        ),
+    )
+
+
+def bootstrap_async(
+    start_orm: bool = True,
+    notifications: AbstractNotifications = None,  # type: ignore
+    publish: Callable[[events.Event], None] = redis_event_publisher.publisher.publish,
+    publish_many: Callable[[list[events.Event]], None] | None = None,
+    uow: unit_of_work.AbstractUnitOfWork = unit_of_work.SqlAlchemyUnitOfWork(),
+    client: Type[EigenClient] = EigenClient,
+    async_client: Type[AsyncEigenClient] = AsyncEigenClient,
+    catalog: ArtifactCatalog = None,  # type: ignore
+) -> messagebus.AsyncMessageBus:
+    """
+    Bootstraps the bus for the asyncio event consumer. The handlers calling the
+    benchmark target are swapped for their async variants, other sync handlers are
+    run in a worker thread by the bus.
+    """
+    publish_many = messagebus.track_published_many(
+        publish_many or _publish_each(publish)
+    )
+    publish = messagebus.track_published(publish)
+    handlers_ = _inject_handlers(
+        start_orm, notifications, publish, publish_many, uow, client, catalog
+    )
+    handlers_["event_handlers"].update(
+        {
+            events.BenchmarkCreated: [
+                functools.partial(
+                    handlers.create_project_async,
+                    uow=uow,
+                    publish=publish,
+                    client=async_client,
+                ),
+            ],
+            events.ProjectCreated: [
+                functools.partial(
+                    handlers.upload_documents_async, client=async_client, uow=uow
+                ),
+            ],
+        }
+    )
+    return messagebus.AsyncMessageBus(uow=uow, **handlers_)
+
+
+def _inject_handlers(
+    start_orm: bool,
+    notifications: AbstractNotifications | None,
+    publish: Callable[[events.Event], None],
+    publish_many: Callable[[list[events.Event]], None],
+    uow: unit_of_work.AbstractUnitOfWork,
+    client: Type[EigenClient],
+    catalog: ArtifactCatalog | None,
+) -> dict:
     if start_orm:
         orm.start_mappers()
         logger.info("Bootstrap DB and ORM setup completed")
@@ -27,36 +101,69 @@ def bootstrap(
     if notifications is None:
         notifications = EmailNotifications()
 
+    if catalog is None:
+        catalog = ArtifactCatalog()
+
     injected_command_handlers: dict[Type[commands.Command], list[Callable]] = {
         commands.CreateBenchmark: [
-            lambda c: handlers.create_benchmark(c, uow, publish)
+            functools.partial(
+                handlers.create_benchmark, uow=uow, publish=publish, catalog=catalog
+            ),
         ],
         commands.UpdateDocument: [
-            lambda e: handlers.update_document(
-                e,
-                uow,
-                publish,
+            functools.partial(handlers.update_document, uow=uow, publish=publish),
+        ],
+        commands.UpdateDocumentsBatch: [
+            functools.partial(
+                handlers.update_documents_batch, uow=uow, publish_many=publish_many
+            ),
+        ],
+        commands.CompareBenchmarks: [
+            functools.partial(
+                handlers.compare_benchmarks, uow=uow, notifications=notifications
             ),
         ],
     }
 
     injected_event_handlers: dict[Type[events.Event], list[Callable]] = {
         events.BenchmarkCreated: [
-            lambda e: handlers.create_project(e, uow, publish, client),
+            functools.partial(
+                handlers.create_project, uow=uow, publish=publish, client=client
+            ),
         ],
         events.ProjectCreated: [
-            lambda e: handlers.upload_documents(e, client, uow),
+            functools.partial(handlers.upload_documents, client=client, uow=uow),
         ],
         events.DocumentUpdated: [
-            lambda e: handlers.check_all_documents_uploaded(e, uow, publish),
+            functools.partial(
+                handlers.check_all_documents_uploaded, uow=uow, publish=publish
+            ),
         ],
         events.AllDocumentsUploaded: [
-            lambda e: handlers.create_report(e, uow, notifications),
+            functools.partial(
+                handlers.create_report, uow=uow, notifications=notifications
+            ),
         ],
     }
 
-    return messagebus.MessageBus(
-        uow=uow,
-        command_handlers=injected_command_handlers,
-        event_handlers=injected_event_handlers,
-    )
+    hooks: list[messagebus.Hook] = [messagebus.record_metrics]
+    if settings.TRACE_FILE:
+        exporter = BatchSpanExporter(SpanFileExporter(settings.TRACE_FILE))
+        hooks.append(tracing.SpanRecorder(exporter))
+        logger.info(f"Recording message bus spans to {settings.TRACE_FILE}")
+
+    return {
+        "command_handlers": injected_command_handlers,
+        "event_handlers": injected_event_handlers,
+        "hooks": hooks,
+    }
+
+
+def _publish_each(
+    publish: Callable[[events.Event], None],
+) -> Callable[[list[events.Event]], None]:
+    def publish_many(events_to_publish: list[events.Event]):
+        for event in events_to_publish:
+            publish(event)
+
+    return publish_many
@@ -1,6 +1,7 @@
+import socket
 from datetime import datetime, timezone
 from logging import getLogger
-from typing import Any, Optional
+from typing import Any, Literal, Optional
 
 from pydantic import ValidationInfo, field_validator
 from pydantic_settings import BaseSettings
@@ -14,12 +15,60 @@ logger = getLogger(__name__)
 class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     API_BENCHMARK_NAMESPACE_V1_STR: str = f"{API_V1_STR}/benchmarks"
-    DB_MAX_RETRIES: int = 10
-    DB_RETRY_INTERVAL: int = 1
+    BENCHMARK_CACHE_MAXSIZE: int = 1024
+    BENCHMARK_CACHE_TTL: int = 3600
     EMAIL_HOST: str = "slowking-mailhog"
     EMAIL_PORT: int = 1025
     EMAIL_HTTP_PORT: int = 8025
+    EMAIL_POOL_SIZE: int = 2
+    EMAIL_DIGEST_WINDOW: float = 5.0
+    # seconds, SMTP socket operations and the flush of queued emails on exit
+    EMAIL_TIMEOUT: float = 10.0
+    EMAIL_CLOSE_TIMEOUT: float = 10.0
+    # async Eigen client, connections are pooled per target
+    EIGEN_HTTP2: bool = True
+    EIGEN_MAX_CONNECTIONS: int = 20
+    EIGEN_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    EIGEN_KEEPALIVE_EXPIRY: float = 30.0
+    EIGEN_TIMEOUT: float = 60.0
+    EIGEN_CONNECT_TIMEOUT: float = 5.0
+    EIGEN_POOL_TIMEOUT: float = 10.0
+    # uploads stream each artifact from disk in chunks of this many bytes
+    UPLOAD_CHUNK_SIZE: int = 64 * 1024
+    # artifact corpora, a manifest of each is kept in the manifest dir
+    ARTIFACTS_DIR: str = "/home/app/artifacts"
+    ARTIFACTS_GLOB: str = "*.txt"
+    ARTIFACTS_MANIFEST_DIR: str = "/home/app/manifests"
+    # a failed upload batch is retried on its own, with exponential backoff
+    UPLOAD_BATCH_MAX_ATTEMPTS: int = 3
+    UPLOAD_BATCH_RETRY_WAIT: float = 1.0
     OUTPUT_DIR: str = "/home/app/reports/"
+    # events buffered per live stream subscriber, older events are dropped
+    BROADCAST_BUFFER_SIZE: int = 1000
+    # seconds between the progress snapshots of a latency stream
+    LATENCY_STREAM_SNAPSHOT_INTERVAL: float = 5.0
+    # reports stream document rows from the DB in chunks of this many rows
+    REPORT_CHUNK_SIZE: int = 1000
+    REPORT_GZIP: bool = False
+    # upper bounds of the latency histogram buckets, in seconds
+    REPORT_HISTOGRAM_BUCKETS: list[float] = [
+        0.5,
+        1.0,
+        2.0,
+        5.0,
+        10.0,
+        30.0,
+        60.0,
+        120.0,
+        300.0,
+        600.0,
+    ]
+    # a percentile regressed when the lower bound of its confidence interval is
+    # more than this much slower, e.g. 0.1 for 10%
+    COMPARISON_REGRESSION_THRESHOLD: float = 0.1
+    COMPARISON_CONFIDENCE: float = 0.95
+    COMPARISON_SIGNIFICANCE: float = 0.05
+    COMPARISON_BOOTSTRAP_RESAMPLES: int = 2000
     OUTPUT_FILENAME: str = (
         f"report_{datetime.now(timezone.utc).strftime('%Y_%m_%d__%H_%M_%S')}.csv"
     )
@@ -37,6 +86,33 @@ class Settings(BaseSettings):
             "port": values.data.get("SLOWKING_REDIS_PORT"),
         }
 
+    # pubsub: fire-and-forget, single consumer. streams: consumer groups with
+    # at-least-once delivery, shared by any number of event consumers
+    EVENT_TRANSPORT: Literal["pubsub", "streams"] = "pubsub"
+    REDIS_STREAM_PREFIX: str = "slowking:"
+    REDIS_STREAM_GROUP: str = "slowking-event-consumers"
+    REDIS_STREAM_CONSUMER: str = socket.gethostname()
+    REDIS_STREAM_MAXLEN: int = 100_000
+    REDIS_STREAM_READ_COUNT: int = 10
+    REDIS_STREAM_BLOCK_MS: int = 5000
+    REDIS_STREAM_CLAIM_IDLE_MS: int = 60_000
+    REDIS_STREAM_MAX_DELIVERIES: int = 5
+
+    # event consumer workers, messages are partitioned across them by benchmark_id
+    CONSUMER_WORKERS: int = 4
+    CONSUMER_WORKER_MODE: Literal["threads", "processes"] = "threads"
+    CONSUMER_WORKER_QUEUE_SIZE: int = 100
+    # asyncio event consumer, messages handled concurrently across benchmarks
+    ASYNC_CONSUMER_MAX_IN_FLIGHT: int = 100
+    # port of the event consumer's Prometheus metrics listener, 0 to disable
+    CONSUMER_METRICS_PORT: int = 9100
+    # file the message bus appends OpenTelemetry (OTLP JSON) spans to, unset to
+    # disable tracing
+    TRACE_FILE: str = ""
+    # salts the trace ids derived from the benchmark ids, set it per environment
+    # and change it when the database is reset
+    TRACE_DEPLOYMENT_ID: str = "slowking"
+
     REDIS_SUBSCRIBE_CHANNELS: list[str] = []
 
     @field_validator("REDIS_SUBSCRIBE_CHANNELS")
@@ -51,6 +51,7 @@ class LatencyBenchmark(AbstractBenchmarkType):
         events.BenchmarkCreated.__name__: events.ProjectCreated,
         events.ProjectCreated.__name__: events.NoOp,
         commands.UpdateDocument.__name__: events.DocumentUpdated,
+        commands.UpdateDocumentsBatch.__name__: events.DocumentUpdated,
         events.DocumentUpdated.__name__: events.AllDocumentsUploaded,
         events.AllDocumentsUploaded.__name__: events.BenchmarkCompleted,
     }
@@ -9,6 +9,8 @@ from typing import Literal, Self, Type
 class CommandChannelEnum(StrEnum):
     CREATE_BENCHMARK = "create_benchmark"
     UPDATE_DOCUMENT = "update_document"
+    UPDATE_DOCUMENTS_BATCH = "update_documents_batch"
+    COMPARE_BENCHMARKS = "compare_benchmarks"
 
     @classmethod
     def get_command_channels(cls: Type[Self]) -> list[str]:
@@ -30,6 +32,10 @@ class CreateBenchmark(Command):
     target_eigen_platform_version: str
     username: str
     password: str
+    # documents per upload request, all documents in one request when unset
+    upload_batch_size: int | None = None
+    # upload requests in flight at once
+    upload_concurrency: int = 1
 
 
 @dataclass
@@ -41,3 +47,30 @@ class UpdateDocument(Command):
     benchmark_host_name: str  # TODO the same as target_url, rename?
     end_time: float | None
     start_time: float | None
+
+
+@dataclass
+class DocumentTiming:
+    """
+    A single document timing record, as sent by the instrumented Eigen application.
+    """
+
+    document_name: str
+    eigen_document_id: str
+    eigen_project_id: str
+    benchmark_host_name: str
+    end_time: float | None
+    start_time: float | None
+
+
+@dataclass
+class UpdateDocumentsBatch(Command):
+    channel: Literal[CommandChannelEnum.UPDATE_DOCUMENTS_BATCH]
+    documents: list[DocumentTiming]
+
+
+@dataclass
+class CompareBenchmarks(Command):
+    channel: Literal[CommandChannelEnum.COMPARE_BENCHMARKS]
+    # the first benchmark is the baseline the others are compared to
+    benchmark_ids: list[int]
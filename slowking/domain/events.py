@@ -40,6 +40,8 @@ class BenchmarkCreated(Event):
 class DocumentUpdated(Event):
     benchmark_id: int
     channel: str = EventChannelEnum.DOCUMENT_UPDATED.value
+    # upload time in seconds of each document completed by the update
+    upload_times: dict[str, float] | None = None
 
 
 @dataclass
@@ -21,3 +21,13 @@ class MessageNotAssignedToBenchmarkError(Exception):
     def __init__(self, message):
         self.message = message
         super().__init__(self.message)
+
+
+class BenchmarkNotFoundError(Exception):
+    """
+    Benchmark does not exist
+    """
+
+    def __init__(self, message):
+        self.message = message
+        super().__init__(self.message)
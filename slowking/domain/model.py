@@ -25,6 +25,7 @@ class Benchmark:
     The Benchmark entity contains the following entities:
         - Project
             - Document
+        - UploadBatch
     """
 
     id: int
@@ -40,6 +41,9 @@ class Benchmark:
         username: str,
         password: str,
         project: Project,
+        upload_batch_size: int | None = None,
+        upload_concurrency: int = 1,
+        upload_batches: list[UploadBatch] | None = None,
     ):
         self.name = name
         self.benchmark_type = benchmark_type
@@ -49,6 +53,9 @@ class Benchmark:
         self.username = username
         self.password = password
         self.project = project
+        self.upload_batch_size = upload_batch_size
+        self.upload_concurrency = upload_concurrency
+        self.upload_batches = upload_batches or []
 
     def __repr__(self):
         return f"<Benchmark {self.name}>"
@@ -71,17 +78,33 @@ class Benchmark:
 
 
 class Project:
+    id: int
+
     def __init__(
         self,
         name: str,
         document: list[Document] = [],
         eigen_project_id: int = None,  # type: ignore
         all_docs_uploaded: datetime | None = None,
+        documents_expected: int | None = None,
+        documents_completed: int = 0,
+        documents_started: int = 0,
+        first_upload_time_start: datetime | None = None,
+        last_upload_time_end: datetime | None = None,
     ):
         self.name = name
         self.document = document
         self.eigen_project_id = eigen_project_id
         self.all_docs_uploaded = all_docs_uploaded
+        self.documents_expected = (
+            len(document) if documents_expected is None else documents_expected
+        )
+        self.documents_completed = documents_completed
+        self.documents_started = documents_started
+        # earliest upload start and latest upload end of the documents, as timed by
+        # the benchmark target
+        self.first_upload_time_start = first_upload_time_start
+        self.last_upload_time_end = last_upload_time_end
 
     def __repr__(self):
         return f"<Project {self.name}>"
@@ -111,3 +134,36 @@ class Document:
             return None
         upload_time = self.upload_time_end - self.upload_time_start
         return upload_time.total_seconds()
+
+
+class UploadBatch:
+    """
+    Client-side timing of one upload request, a batch of the benchmark's documents
+    """
+
+    def __init__(
+        self,
+        batch_number: int,
+        document_count: int,
+        size_bytes: int,
+        attempts: int,
+        upload_time_start: datetime,
+        upload_time_end: datetime,
+        error: str | None = None,
+    ):
+        self.batch_number = batch_number
+        self.document_count = document_count
+        self.size_bytes = size_bytes
+        self.attempts = attempts
+        self.upload_time_start = upload_time_start
+        self.upload_time_end = upload_time_end
+        self.error = error
+
+    def __repr__(self):
+        return f"<UploadBatch {self.batch_number}>"
+
+    @property
+    def upload_time(self):
+        """Calculate the upload time of the batch, including retries"""
+        upload_time = self.upload_time_end - self.upload_time_start
+        return upload_time.total_seconds()
@@ -0,0 +1,287 @@
+"""
+Latency statistics, computed with NumPy over a benchmark's upload times
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import Iterable, Sequence
+
+import numpy as np
+
+PERCENTILES = (50, 90, 95, 99, 99.9)
+HEADLINE_PERCENTILES = ("p50", "p90", "p99")
+
+# The sketch bucket boundaries depend on the relative accuracy, so changing it
+# invalidates every persisted sketch.
+SKETCH_RELATIVE_ACCURACY = 0.01
+SKETCH_GAMMA = (1 + SKETCH_RELATIVE_ACCURACY) / (1 - SKETCH_RELATIVE_ACCURACY)
+# smaller latencies, including zero and negative ones from clock skew, are
+# counted as this value
+SKETCH_MIN_VALUE = 1e-6
+
+
+@dataclass(frozen=True)
+class HistogramBucket:
+    """
+    Documents uploaded in `lower <= seconds < upper`
+    """
+
+    lower: float
+    upper: float
+    count: int
+
+
+@dataclass(frozen=True)
+class LatencySummary:
+    count: int
+    min: float | None = None
+    max: float | None = None
+    mean: float | None = None
+    stddev: float | None = None
+    # keyed by label, e.g. "p99.9"
+    percentiles: dict[str, float] = field(default_factory=dict)
+    histogram: list[HistogramBucket] = field(default_factory=list)
+
+    def headline(self) -> str:
+        if not self.count:
+            return "No documents uploaded"
+        percentiles = ", ".join(
+            f"{label} {self.percentiles[label]:.3f}s" for label in HEADLINE_PERCENTILES
+        )
+        return f"{self.count} documents uploaded: {percentiles}"
+
+
+def percentile_label(percentile: float) -> str:
+    return f"p{percentile:g}"
+
+
+def summarise(upload_times: np.ndarray, buckets: Sequence[float]) -> LatencySummary:
+    """
+    Summarises upload times in seconds. `buckets` are the ascending upper bounds of
+    the histogram buckets; they are fixed rather than derived from the data so the
+    histograms of different benchmarks can be compared. A last bucket holds the
+    times above the largest bound.
+    """
+    bounds = np.asarray(buckets, dtype=np.float64)
+    counts = np.bincount(
+        np.searchsorted(bounds, upload_times, side="right"),
+        minlength=len(bounds) + 1,
+    )
+    lowers = np.concatenate(([0.0], bounds))
+    uppers = np.concatenate((bounds, [np.inf]))
+    histogram = [
+        HistogramBucket(lower=float(lower), upper=float(upper), count=int(count))
+        for lower, upper, count in zip(lowers, uppers, counts)
+    ]
+    if not upload_times.size:
+        return LatencySummary(count=0, histogram=histogram)
+
+    values = np.percentile(upload_times, PERCENTILES)
+    return LatencySummary(
+        count=int(upload_times.size),
+        min=float(upload_times.min()),
+        max=float(upload_times.max()),
+        mean=float(upload_times.mean()),
+        stddev=float(upload_times.std()),
+        percentiles={
+            percentile_label(p): float(v) for p, v in zip(PERCENTILES, values)
+        },
+        histogram=histogram,
+    )
+
+
+class LatencySketch:
+    """
+    A mergeable quantile sketch of latencies in seconds, after DDSketch. A value is
+    counted in the logarithmic bucket `ceil(log_gamma(value))`, so a quantile is
+    estimated within SKETCH_RELATIVE_ACCURACY of the true value, whatever the
+    number of values. Latencies from 1 microsecond to 1 day span 1,260
+    buckets and only buckets which hold a value are kept.
+
+    Merging adds the bucket counts, so the sketches of any number of workers, or
+    of partial batches, merge into the sketch of all their values.
+    """
+
+    def __init__(self, counts: dict[int, int] | None = None):
+        self.counts: dict[int, int] = dict(counts or {})
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, LatencySketch) and self.counts == other.counts
+
+    def __repr__(self) -> str:
+        return f"LatencySketch(count={self.count}, buckets={len(self.counts)})"
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts.values())
+
+    @staticmethod
+    def buckets(values: Iterable[float]) -> np.ndarray:
+        clipped = np.maximum(np.fromiter(values, dtype=np.float64), SKETCH_MIN_VALUE)
+        return np.ceil(np.log(clipped) / math.log(SKETCH_GAMMA)).astype(np.int64)
+
+    def add(self, values: Iterable[float]) -> None:
+        keys, counts = np.unique(self.buckets(values), return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            self.counts[key] = self.counts.get(key, 0) + count
+
+    def merge(self, other: LatencySketch) -> None:
+        for key, count in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + count
+
+    def quantiles(self, qs: Sequence[float]) -> list[float]:
+        """
+        Estimates the quantiles `qs`, each between 0 and 1, with the same rank
+        convention as np.percentile
+        """
+        if not self.counts:
+            return []
+        keys = np.array(sorted(self.counts), dtype=np.int64)
+        cumulative = np.cumsum([self.counts[key] for key in keys.tolist()])
+        ranks = np.asarray(qs, dtype=np.float64) * (cumulative[-1] - 1)
+        indexes = np.searchsorted(cumulative, ranks, side="right")
+        # the bucket midpoint, in relative terms, of (gamma^(k-1), gamma^k]
+        estimates = 2 * SKETCH_GAMMA ** keys[indexes] / (SKETCH_GAMMA + 1)
+        return [float(estimate) for estimate in estimates]
+
+    def percentiles(self) -> dict[str, float]:
+        values = self.quantiles([p / 100 for p in PERCENTILES])
+        return {percentile_label(p): v for p, v in zip(PERCENTILES, values)}
+
+
+@dataclass(frozen=True)
+class PercentileDelta:
+    """
+    The change of a percentile from the baseline to the candidate. The confidence
+    interval is of the relative delta, e.g. 0.1 for 10% slower.
+    """
+
+    label: str
+    baseline: float
+    candidate: float
+    delta: float
+    relative_delta: float
+    ci_low: float
+    ci_high: float
+    regressed: bool
+
+
+@dataclass(frozen=True)
+class LatencyComparison:
+    baseline_count: int
+    candidate_count: int
+    percentiles: list[PercentileDelta] = field(default_factory=list)
+    # probability that a candidate upload is slower than a baseline upload,
+    # U / (n1 * n2) of the Mann-Whitney U test, 0.5 when there is no difference
+    probability_slower: float | None = None
+    p_value: float | None = None
+    regression: bool = False
+
+
+def compare(
+    baseline: np.ndarray,
+    candidate: np.ndarray,
+    threshold: float,
+    confidence: float,
+    significance: float,
+    resamples: int,
+    seed: int | None = None,
+) -> LatencyComparison:
+    """
+    Compares the upload times of a candidate benchmark to a baseline.
+
+    A percentile has regressed when the lower bound of the bootstrap confidence
+    interval of its relative delta is above `threshold`. The comparison is a
+    regression when a percentile has regressed and the Mann-Whitney U test finds
+    the candidate slower at `significance`.
+    """
+    if not baseline.size or not candidate.size:
+        return LatencyComparison(
+            baseline_count=int(baseline.size), candidate_count=int(candidate.size)
+        )
+
+    rng = np.random.default_rng(seed)
+    qs = np.array(PERCENTILES) / 100
+    baseline = np.sort(baseline)
+    candidate = np.sort(candidate)
+    base_points = np.percentile(baseline, PERCENTILES)
+    cand_points = np.percentile(candidate, PERCENTILES)
+    base_samples = bootstrap_quantiles(baseline, qs, resamples, rng)
+    cand_samples = bootstrap_quantiles(candidate, qs, resamples, rng)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        relative = cand_samples / base_samples - 1
+        relative_points = cand_points / base_points - 1
+    tail = (1 - confidence) / 2 * 100
+    ci_low, ci_high = np.nanpercentile(relative, [tail, 100 - tail], axis=0)
+
+    percentiles = [
+        PercentileDelta(
+            label=percentile_label(p),
+            baseline=float(base_points[i]),
+            candidate=float(cand_points[i]),
+            delta=float(cand_points[i] - base_points[i]),
+            relative_delta=float(relative_points[i]),
+            ci_low=float(ci_low[i]),
+            ci_high=float(ci_high[i]),
+            regressed=bool(ci_low[i] > threshold),
+        )
+        for i, p in enumerate(PERCENTILES)
+    ]
+    probability_slower, p_value = mann_whitney_u(baseline, candidate)
+    return LatencyComparison(
+        baseline_count=int(baseline.size),
+        candidate_count=int(candidate.size),
+        percentiles=percentiles,
+        probability_slower=probability_slower,
+        p_value=p_value,
+        regression=(
+            any(delta.regressed for delta in percentiles)
+            and probability_slower > 0.5
+            and p_value < significance
+        ),
+    )
+
+
+def bootstrap_quantiles(
+    sorted_values: np.ndarray,
+    qs: np.ndarray,
+    resamples: int,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """
+    Draws the (nearest rank) quantiles `qs` of `resamples` bootstrap resamples of
+    `sorted_values`, one row per resample.
+
+    The k-th smallest of n resampled values is sorted_values[ceil(n * U)], where
+    U, the k-th smallest of n uniforms, is Beta(k, n - k + 1) distributed. So each
+    resampled quantile is one Beta draw, rather than a resample of n values.
+    """
+    n = sorted_values.size
+    ranks = np.clip(np.ceil(qs * n), 1, n)
+    uniforms = rng.beta(ranks, n - ranks + 1, size=(resamples, qs.size))
+    indexes = np.clip(np.ceil(uniforms * n).astype(np.int64) - 1, 0, n - 1)
+    return sorted_values[indexes]
+
+
+def mann_whitney_u(baseline: np.ndarray, candidate: np.ndarray) -> tuple[float, float]:
+    """
+    Two-sided Mann-Whitney U test, with the normal approximation corrected for
+    ties. Returns U / (n1 * n2) of the candidate and the p-value.
+    """
+    n1, n2 = baseline.size, candidate.size
+    _, inverse, counts = np.unique(
+        np.concatenate((baseline, candidate)), return_inverse=True, return_counts=True
+    )
+    # tied values share the average of their ranks
+    ranks = (np.cumsum(counts) - (counts - 1) / 2)[inverse]
+    u = float(ranks[n1:].sum() - n2 * (n2 + 1) / 2)
+
+    n = n1 + n2
+    ties = float((counts.astype(np.float64) ** 3 - counts).sum())
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1)))
+    if variance <= 0:
+        return u / (n1 * n2), 1.0
+    mean = n1 * n2 / 2
+    z = (abs(u - mean) - 0.5) / math.sqrt(variance)
+    return u / (n1 * n2), min(1.0, math.erfc(max(z, 0.0) / math.sqrt(2)))
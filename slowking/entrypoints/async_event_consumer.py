@@ -0,0 +1,164 @@
+"""
+Asyncio event consumer. Messages of different benchmarks are handled concurrently
+on one event loop, while the messages of one benchmark are handled in order.
+"""
+import asyncio
+import json
+import logging.config
+import signal
+from collections import Counter
+
+import redis.asyncio as aioredis
+
+from slowking import bootstrap, config
+from slowking.adapters import metrics
+from slowking.adapters.async_http import AsyncEigenClient
+from slowking.adapters.redis_event_subscriber import (
+    AbstractAsyncSubscriber,
+    ReceivedMessage,
+    get_async_subscriber,
+)
+from slowking.config import settings
+from slowking.domain.events import EVENT_MAPPER
+from slowking.entrypoints.worker_pool import partition_key
+from slowking.service_layer import messagebus
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncConsumer:
+    """
+    Starts a task per message. Tasks with the same benchmark_id take turns on a
+    shared lock, which asyncio hands out in arrival order. At most `max_in_flight`
+    messages are handled at once, after which reading from the subscriber waits.
+
+    Messages waiting on a lock are already pending for this consumer. Every
+    `keep_alive_interval` seconds the messages not yet handled are passed to the
+    subscriber's `keep_alive`, so another consumer never claims them.
+    """
+
+    def __init__(
+        self,
+        bus: messagebus.AsyncMessageBus,
+        subscriber: AbstractAsyncSubscriber,
+        max_in_flight: int = settings.ASYNC_CONSUMER_MAX_IN_FLIGHT,
+        keep_alive_interval: float = settings.REDIS_STREAM_CLAIM_IDLE_MS / 1000 / 2,
+    ):
+        self.bus = bus
+        self.subscriber = subscriber
+        self.keep_alive_interval = keep_alive_interval
+        self._accepted: dict[int, ReceivedMessage] = {}
+        self._keep_alive_task: asyncio.Task | None = None
+        self._in_flight = asyncio.Semaphore(max(1, max_in_flight))
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._waiting: Counter[str] = Counter()
+        self._tasks: set[asyncio.Task] = set()
+
+    async def run(self) -> None:
+        if self._keep_alive_task is None:
+            self._keep_alive_task = asyncio.create_task(self._keep_alive())
+        async for message in self.subscriber.listen():
+            await self.submit(message)
+
+    async def submit(self, message: ReceivedMessage) -> None:
+        await self._in_flight.acquire()
+        key = partition_key(message)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        self._waiting[key] += 1
+        self._accepted[id(message)] = message
+        task = asyncio.create_task(self._handle(message, key, lock))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def drain(self) -> None:
+        """
+        Waits for every message already submitted to be handled
+        """
+        logger.info(f"Draining {len(self._tasks)} in-flight message(s)...")
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._keep_alive_task is not None:
+            self._keep_alive_task.cancel()
+            self._keep_alive_task = None
+
+    async def _handle(
+        self, message: ReceivedMessage, key: str, lock: asyncio.Lock
+    ) -> None:
+        try:
+            async with lock:
+                await handle_message(message, self.bus, self.subscriber)
+        finally:
+            del self._accepted[id(message)]
+            self._waiting[key] -= 1
+            if not self._waiting[key]:
+                del self._waiting[key]
+                del self._locks[key]
+            self._in_flight.release()
+
+    async def _keep_alive(self) -> None:
+        while True:
+            await asyncio.sleep(self.keep_alive_interval)
+            messages = list(self._accepted.values())
+            if not messages:
+                continue
+            try:
+                await self.subscriber.keep_alive(messages)
+            except Exception:
+                logger.exception(f"Failed to keep {len(messages)} message(s) alive")
+
+
+async def handle_message(
+    message: ReceivedMessage,
+    bus: messagebus.AsyncMessageBus,
+    subscriber: AbstractAsyncSubscriber,
+) -> None:
+    """
+    Handles a message and acks it. A message which fails is left unacked, so the
+    streams transport redelivers it.
+    """
+    metrics.observe_message(message.channel, message.message_id)
+    try:
+        await assign_channel_event_to_handler(message, bus)
+    except Exception:
+        logger.exception(f"Eventbus failed to handle message: {message}")
+        return
+    await subscriber.ack(message)
+
+
+async def assign_channel_event_to_handler(
+    message: ReceivedMessage, bus: messagebus.AsyncMessageBus
+):
+    """
+    Assigns a channel message event to a function which will call the message bus
+    """
+    channel = message.channel
+    mapped_event = EVENT_MAPPER.get(channel)
+    if mapped_event is None:
+        logger.warning(f"Channel {channel} not found for message: {message}")
+        return
+
+    payload = json.loads(message.data)
+    event = mapped_event(**payload)
+    await bus.handle(event)
+
+
+async def main():
+    logger.info(f"Async eventbus starting with {settings.EVENT_TRANSPORT} transport...")
+    client = aioredis.Redis(**settings.REDIS_CONFIG)  # type: ignore
+    metrics.start_server(settings.CONSUMER_METRICS_PORT)
+    consumer = AsyncConsumer(bootstrap.bootstrap_async(), get_async_subscriber(client))
+
+    reader = asyncio.create_task(consumer.run())
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, reader.cancel)
+    try:
+        await reader
+    except asyncio.CancelledError:
+        logger.info("Async eventbus received SIGTERM, shutting down...")
+    finally:
+        await consumer.drain()
+        await AsyncEigenClient.close_transports()
+        await client.aclose()  # type: ignore[attr-defined]
+
+
+if __name__ == "__main__":
+    logging.config.dictConfig(config.logger_dict_config())
+    asyncio.run(main())
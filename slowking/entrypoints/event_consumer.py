@@ -1,12 +1,16 @@
 import json
 import logging.config
-from typing import Any
+import signal
+import sys
 
 import redis
 
 from slowking import bootstrap, config
+from slowking.adapters import metrics
+from slowking.adapters.redis_event_subscriber import ReceivedMessage, get_subscriber
 from slowking.config import settings
 from slowking.domain.events import EVENT_MAPPER
+from slowking.entrypoints.worker_pool import MessageHandler, PartitionedWorkerPool
 from slowking.service_layer import messagebus
 
 logger = logging.getLogger(__name__)
@@ -16,24 +20,54 @@ r = redis.Redis(**settings.REDIS_CONFIG)  # type: ignore
 
 
 def main():
-    logger.info("Eventbus starting...")
+    logger.info(f"Eventbus starting with {settings.EVENT_TRANSPORT} transport...")
+    subscriber = get_subscriber(r)
+    metrics.start_server(settings.CONSUMER_METRICS_PORT)
+    signal.signal(signal.SIGTERM, shutdown)
+
+    with PartitionedWorkerPool(
+        build_message_handler, keep_alive=subscriber.keep_alive
+    ) as pool:
+        for message in subscriber.listen():
+            pool.submit(message)
+
+
+def shutdown(signum, frame):
+    """
+    Raises SystemExit on SIGTERM, so the worker pool drains before exiting
+    """
+    logger.info(f"Eventbus received signal {signum}, shutting down...")
+    sys.exit(0)
+
+
+def build_message_handler() -> MessageHandler:
+    """
+    Builds the function the consumer workers handle each message with. The message
+    is acked once it has been handled.
+    """
     bus = bootstrap.bootstrap()
-    pubsub = r.pubsub(ignore_subscribe_messages=True)
-    pubsub.subscribe(*settings.REDIS_SUBSCRIBE_CHANNELS)
+    subscriber = get_subscriber(redis.Redis(**settings.REDIS_CONFIG))  # type: ignore
+
+    def handle_message(message: ReceivedMessage):
+        metrics.observe_message(message.channel, message.message_id)
+        try:
+            assign_channel_event_to_handler(message, bus)
+        except Exception:
+            # left unacked, so the streams transport redelivers it
+            logger.exception(f"Eventbus failed to handle message: {message}")
+            return
+        subscriber.ack(message)
 
-    for message in pubsub.listen():
-        logger.info(f"Eventbus message received: {message}")
-        assign_channel_event_to_handler(message, bus)
+    return handle_message
 
 
 def assign_channel_event_to_handler(
-    message: dict[Any, Any], bus: messagebus.MessageBus
+    message: ReceivedMessage, bus: messagebus.MessageBus
 ):
     """
     Assigns a channel message event to a function which will call the message bus
     """
-    channel = message["channel"]
-    channel = str(channel, "utf-8")
+    channel = message.channel
     logger.info(
         f"assign_channel_event_to_handler channel {channel} with message: {message}"
     )
@@ -43,7 +77,7 @@ def assign_channel_event_to_handler(
         logger.warning(f"Channel {channel} not found for message: {message}")
         return
 
-    payload = json.loads(message["data"])
+    payload = json.loads(message.data)
     event = mapped_event(**payload)
     bus.handle(event)
 
@@ -1,17 +1,27 @@
 """
 HTTP entrypoints for the Eventbus application
 """
+import asyncio
+import functools
+import json
 import logging.config
+import time
 from http import HTTPStatus
 from logging import getLogger
-from typing import Optional
+from typing import Any, AsyncIterator, Optional
 
-from fastapi import APIRouter, BackgroundTasks, Response
-from pydantic import BaseModel
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 
-from slowking import bootstrap, config
+from slowking import bootstrap, config, views
+from slowking.adapters import redis_event_publisher
+from slowking.adapters.broadcast import EventBroadcaster
 from slowking.config import settings
-from slowking.domain import commands
+from slowking.domain import commands, events
+from slowking.domain.exceptions import BenchmarkNotFoundError
+from slowking.service_layer import messagebus
 
 router = APIRouter(prefix=settings.API_BENCHMARK_NAMESPACE_V1_STR, tags=["benchmarks"])
 
@@ -20,12 +30,41 @@ logging.config.dictConfig(config.logger_dict_config())
 logger = getLogger(__name__)
 
 
+broadcaster = EventBroadcaster()
+
+
+def publish(event: events.Event):
+    """
+    Publishes an event to the redis broker, and to the live streams of the API
+    process
+    """
+    broadcaster.publish(event)
+    redis_event_publisher.publisher.publish(event)
+
+
+def publish_many(events_to_publish: list[events.Event]):
+    """
+    `publish` for several events, sent to the redis broker in one round trip
+    """
+    for event in events_to_publish:
+        broadcaster.publish(event)
+    redis_event_publisher.publisher.publish_many(events_to_publish)
+
+
+@functools.cache
+def get_bus() -> messagebus.MessageBus:
+    """
+    Returns the message bus of the API process. It is bootstrapped once, by the app
+    lifespan on startup, and shared by every request.
+    """
+    return bootstrap.bootstrap(publish=publish, publish_many=publish_many)
+
+
 def publish_to_bus(cmd: commands.Command):
     """
     Publishes a command to the eventbus
     """
-    bus = bootstrap.bootstrap()
-    bus.handle(cmd)
+    get_bus().handle(cmd)
 
 
 @router.get("/channels")
@@ -41,6 +80,8 @@ class BenchmarkPayload(BaseModel):
     target_eigen_platform_version: str
     username: str
     password: str
+    upload_batch_size: int | None = Field(default=None, ge=1)
+    upload_concurrency: int = Field(default=1, ge=1)
 
 
 @router.post("/start", status_code=HTTPStatus.ACCEPTED)
@@ -55,6 +96,8 @@ async def start_benchmark(payload: BenchmarkPayload, background_tasks: Backgroun
         target_eigen_platform_version=payload.target_eigen_platform_version,
         username=payload.username,
         password=payload.password,  # type: ignore
+        upload_batch_size=payload.upload_batch_size,
+        upload_concurrency=payload.upload_concurrency,
     )
     background_tasks.add_task(publish_to_bus, cmd)
     return Response(status_code=HTTPStatus.ACCEPTED)
@@ -89,3 +132,137 @@ async def update_document(
     )
     background_tasks.add_task(publish_to_bus, cmd)
     return Response(status_code=HTTPStatus.ACCEPTED)
+
+
+class UpdateDocumentsBatchPayload(BaseModel):
+    documents: list[UpdateDocumentPayload]
+
+
+@router.post("/documents/batch/", status_code=HTTPStatus.ACCEPTED)
+async def update_documents_batch(
+    payload: UpdateDocumentsBatchPayload, background_tasks: BackgroundTasks
+):
+    """
+    Update many documents in one request by issuing an `UpdateDocumentsBatch`
+    command. The whole batch is applied in a single transaction.
+    """
+    logger.info(f"API /benchmarks/documents/batch/ updating {len(payload.documents)}")
+    cmd = commands.UpdateDocumentsBatch(
+        channel=commands.CommandChannelEnum.UPDATE_DOCUMENTS_BATCH,
+        documents=[
+            commands.DocumentTiming(
+                document_name=document.document_name,
+                eigen_document_id=document.eigen_document_id,
+                eigen_project_id=document.eigen_project_id,
+                benchmark_host_name=document.benchmark_host_name,
+                end_time=document.end_time,
+                start_time=document.start_time,
+            )
+            for document in payload.documents
+        ],
+    )
+    background_tasks.add_task(publish_to_bus, cmd)
+    return Response(status_code=HTTPStatus.ACCEPTED)
+
+
+@router.get("/{benchmark_id}/progress")
+def benchmark_progress(benchmark_id: int):
+    """
+    Document counters, throughput and running upload time percentiles of a
+    benchmark, served from aggregates kept up to date as timings arrive.
+    """
+    progress = views.benchmark_progress(benchmark_id, get_bus().uow)
+    if progress is None:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail=f"Benchmark {benchmark_id} not found",
+        )
+    return progress
+
+
+@router.get("/{benchmark_id}/latency/stream")
+async def stream_latency(benchmark_id: int, request: Request):
+    """
+    Server-sent events of a benchmark: a `document` event with the upload time of
+    each completed document and, every LATENCY_STREAM_SNAPSHOT_INTERVAL seconds, a
+    `snapshot` event with the progress.
+    """
+    logger.info(f"API /benchmarks/{benchmark_id}/latency/stream subscribed")
+    return StreamingResponse(
+        latency_events(benchmark_id, request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+async def latency_events(
+    benchmark_id: int,
+    request: Request,
+    snapshot_interval: float = settings.LATENCY_STREAM_SNAPSHOT_INTERVAL,
+) -> AsyncIterator[str]:
+    subscription = broadcaster.subscribe(benchmark_id)
+    next_snapshot = time.monotonic()
+    try:
+        while not await request.is_disconnected():
+            if time.monotonic() >= next_snapshot:
+                progress = await asyncio.to_thread(
+                    views.benchmark_progress, benchmark_id, get_bus().uow
+                )
+                yield _server_sent_event("snapshot", progress)
+                next_snapshot = time.monotonic() + snapshot_interval
+
+            received = await subscription.get(
+                timeout=max(0.0, next_snapshot - time.monotonic())
+            )
+            if dropped := subscription.take_dropped():
+                yield _server_sent_event("dropped", {"count": dropped})
+            for event in received:
+                if not isinstance(event, events.DocumentUpdated):
+                    continue
+                for document_name, upload_time in (event.upload_times or {}).items():
+                    yield _server_sent_event(
+                        "document",
+                        {"document_name": document_name, "upload_time": upload_time},
+                    )
+    finally:
+        broadcaster.unsubscribe(subscription)
+        logger.info(f"API /benchmarks/{benchmark_id}/latency/stream unsubscribed")
+
+
+def _server_sent_event(name: str, data: Any) -> str:
+    return f"event: {name}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+
+@router.get("/compare")
+def compare_benchmarks(benchmark_ids: list[int] = Query(min_length=2)):
+    """
+    Compares the upload time percentiles of benchmarks to the first one, with
+    bootstrap confidence intervals and a Mann-Whitney U test.
+    """
+    logger.info(f"API /benchmarks/compare comparing {benchmark_ids}")
+    try:
+        comparisons = views.compare_benchmarks(benchmark_ids, get_bus().uow)
+    except BenchmarkNotFoundError as e:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail=e.message)
+    return {"comparisons": comparisons}
+
+
+class CompareBenchmarksPayload(BaseModel):
+    benchmark_ids: list[int] = Field(min_length=2)
+
+
+@router.post("/compare/report", status_code=HTTPStatus.ACCEPTED)
+async def compare_benchmarks_report(
+    payload: CompareBenchmarksPayload, background_tasks: BackgroundTasks
+):
+    """
+    Creates a comparison report by issuing a `CompareBenchmarks` command, the
+    report is sent as a notification.
+    """
+    logger.info(f"API /benchmarks/compare/report comparing {payload.benchmark_ids}")
+    cmd = commands.CompareBenchmarks(
+        channel=commands.CommandChannelEnum.COMPARE_BENCHMARKS,
+        benchmark_ids=payload.benchmark_ids,
+    )
+    background_tasks.add_task(publish_to_bus, cmd)
+    return Response(status_code=HTTPStatus.ACCEPTED)
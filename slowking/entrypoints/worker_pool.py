@@ -0,0 +1,212 @@
+"""
+Partitioned worker pool for the event consumer
+"""
+import json
+import logging.config
+import multiprocessing
+import queue
+import threading
+import zlib
+from typing import Any, Callable
+
+from slowking import config
+from slowking.adapters.redis_event_subscriber import ReceivedMessage
+
+logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[ReceivedMessage], None]
+KeepAlive = Callable[[list[ReceivedMessage]], None]
+
+
+class PartitionedWorkerPool:
+    """
+    Handles messages on a pool of thread or process workers. A message is routed to
+    a worker by hashing its benchmark_id, so the events of one benchmark are handled
+    in order while different benchmarks are handled in parallel.
+
+    Each worker has a bounded queue and `submit` blocks while it is full, which
+    applies backpressure to the subscriber. Closing the pool lets every worker
+    drain its queue before it stops.
+
+    `handler_factory` builds the function which handles a message. It is called
+    once and shared by the threads, or called in each process as processes cannot
+    share a message bus.
+
+    Stream messages are pending for this consumer from the moment they are read,
+    and may wait in a queue behind a slow message for longer than another
+    consumer's claim idle time. The pool keeps the messages it has accepted, queued
+    or being handled, and passes them to `keep_alive` every `keep_alive_interval`
+    seconds, which resets their idle time so they are never claimed while the
+    consumer is alive.
+    """
+
+    def __init__(
+        self,
+        handler_factory: Callable[[], MessageHandler],
+        workers: int = config.settings.CONSUMER_WORKERS,
+        queue_size: int = config.settings.CONSUMER_WORKER_QUEUE_SIZE,
+        mode: str = config.settings.CONSUMER_WORKER_MODE,
+        keep_alive: KeepAlive | None = None,
+        keep_alive_interval: float = (
+            config.settings.REDIS_STREAM_CLAIM_IDLE_MS / 1000 / 2
+        ),
+    ):
+        self.workers = max(1, workers)
+        self.mode = mode
+        self.keep_alive = keep_alive
+        self.keep_alive_interval = keep_alive_interval
+        self._queues: list[Any]
+        self._workers: list[Any]
+        self._accepted: dict[tuple[str | None, str], ReceivedMessage] = {}
+        self._accepted_lock = threading.Lock()
+        self._done: Any = None
+        self._stopped = threading.Event()
+        self._keep_alive_thread = threading.Thread(
+            target=self._keep_alive, name="consumer-keep-alive", daemon=True
+        )
+
+        match mode:
+            case "threads":
+                handler = handler_factory()
+                self._queues = [
+                    queue.Queue(maxsize=queue_size) for _ in range(self.workers)
+                ]
+                self._workers = [
+                    threading.Thread(
+                        target=_work,
+                        args=(q, handler, self._handled),
+                        name=f"consumer-worker-{i}",
+                        daemon=True,
+                    )
+                    for i, q in enumerate(self._queues)
+                ]
+            case "processes":
+                ctx = multiprocessing.get_context("spawn")
+                if keep_alive is not None:
+                    # the workers report the keys of handled messages back
+                    self._done = ctx.Queue()
+                self._queues = [
+                    ctx.Queue(maxsize=queue_size) for _ in range(self.workers)
+                ]
+                self._workers = [
+                    ctx.Process(
+                        target=_work_in_process,
+                        args=(q, handler_factory, self._done),
+                        name=f"consumer-worker-{i}",
+                    )
+                    for i, q in enumerate(self._queues)
+                ]
+            case _:
+                raise NotImplementedError(f"Unknown worker mode: {mode}")
+
+    def __enter__(self) -> "PartitionedWorkerPool":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def start(self) -> None:
+        logger.info(f"Starting {self.workers} consumer worker {self.mode}")
+        for worker in self._workers:
+            worker.start()
+        if self.keep_alive is not None:
+            self._keep_alive_thread.start()
+
+    def submit(self, message: ReceivedMessage) -> None:
+        key = _key(message)
+        if key is not None and self.keep_alive is not None:
+            with self._accepted_lock:
+                self._accepted[key] = message
+        self._queues[self.partition(message)].put(message)
+
+    def in_flight(self) -> list[ReceivedMessage]:
+        """
+        The stream messages accepted by `submit` and not yet handled, tracked when
+        the pool has a `keep_alive`
+        """
+        if self._done is not None:
+            while True:
+                try:
+                    self._handled_key(self._done.get_nowait())
+                except queue.Empty:
+                    break
+        with self._accepted_lock:
+            return list(self._accepted.values())
+
+    def partition(self, message: ReceivedMessage) -> int:
+        return zlib.crc32(partition_key(message).encode("utf-8")) % self.workers
+
+    def close(self) -> None:
+        """
+        Stops the workers once they have handled every queued message.
+        """
+        logger.info("Draining consumer workers...")
+        for q in self._queues:
+            q.put(None)
+        for worker in self._workers:
+            worker.join()
+        self._stopped.set()
+        if self._keep_alive_thread.is_alive():
+            self._keep_alive_thread.join()
+        logger.info("Consumer workers stopped")
+
+    def _handled(self, message: ReceivedMessage) -> None:
+        self._handled_key(_key(message))
+
+    def _handled_key(self, key: tuple[str | None, str] | None) -> None:
+        if key is None:
+            return
+        with self._accepted_lock:
+            self._accepted.pop(key, None)
+
+    def _keep_alive(self) -> None:
+        while not self._stopped.wait(self.keep_alive_interval):
+            messages = self.in_flight()
+            if not messages or self.keep_alive is None:
+                continue
+            try:
+                self.keep_alive(messages)
+            except Exception:
+                logger.exception(f"Failed to keep {len(messages)} message(s) alive")
+
+
+def partition_key(message: ReceivedMessage) -> str:
+    """
+    The key a message is ordered by, its benchmark_id or, without one, its data
+    """
+    try:
+        key = json.loads(message.data).get("benchmark_id")
+    except (ValueError, AttributeError):
+        key = None
+    if key is None:
+        key = message.data
+    return str(key)
+
+
+def _key(message: ReceivedMessage) -> tuple[str | None, str] | None:
+    if message.message_id is None:
+        return None
+    return (message.stream, message.message_id)
+
+
+def _work(messages: Any, handler: MessageHandler, handled: MessageHandler) -> None:
+    while (message := messages.get()) is not None:
+        try:
+            handler(message)
+        except Exception:
+            logger.exception(f"Consumer worker failed to handle message: {message}")
+        finally:
+            handled(message)
+
+
+def _work_in_process(
+    messages: Any, handler_factory: Callable[[], MessageHandler], done: Any
+) -> None:
+    logging.config.dictConfig(config.logger_dict_config())
+
+    def handled(message: ReceivedMessage) -> None:
+        if done is not None:
+            done.put(_key(message))
+
+    _work(messages, handler_factory(), handled)
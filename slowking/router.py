@@ -1,15 +1,32 @@
 """
 API Router
 """
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
 
+from fastapi import FastAPI, Response
+
+from slowking.adapters import metrics as metrics_adapter
 from slowking.config import settings
-from slowking.entrypoints.http import router
+from slowking.entrypoints.http import get_bus, router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # bootstrap the message bus, ORM mappers and adapters once per process
+    get_bus()
+    yield
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(router)
 
 
 @app.get(f"{settings.API_V1_STR}/health")
 def health():
     return {"status": "ok"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    data, content_type = metrics_adapter.exposition()
+    return Response(content=data, media_type=content_type)
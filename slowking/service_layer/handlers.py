@@ -1,18 +1,19 @@
+import asyncio
 import logging
 import pathlib
-import time
+from collections import Counter, defaultdict
+from dataclasses import asdict, dataclass
 from datetime import datetime, timezone
 from typing import Callable, Type
 
-from sqlalchemy.exc import IllegalStateChangeError, InvalidRequestError
-from sqlalchemy.orm.exc import DetachedInstanceError
-
-from slowking.adapters import notifications
+from slowking import views
+from slowking.adapters import notifications, repository
+from slowking.adapters.artifacts import ArtifactCatalog
+from slowking.adapters.async_http import AsyncEigenClient
 from slowking.adapters.http import EigenClient
-from slowking.adapters.report import LatencyReport
-from slowking.config import settings
-from slowking.domain import benchmarks, commands, events, model
-from slowking.service_layer import unit_of_work
+from slowking.adapters.report import ComparisonReport, LatencyReport
+from slowking.domain import benchmarks, commands, events, model, statistics
+from slowking.service_layer import messagebus, unit_of_work, upload_scheduler
 
 logger = logging.getLogger(__name__)
 
@@ -21,22 +22,17 @@ def create_benchmark(
     cmd: commands.CreateBenchmark,
     uow: unit_of_work.AbstractUnitOfWork,
     publish: Callable[[events.Event], None],
+    catalog: ArtifactCatalog,
 ):
     logger.info("=== Called create_benchmark handler ===")
 
     name = f"{datetime.now(timezone.utc).strftime('%Y-%m-%d, %H:%M:%S')} - {cmd.name}"
+    manifest = catalog.manifest()
 
     with uow:
-        documents = []
-        files = pathlib.Path("/home/app/artifacts").glob("*.txt")
-        for file in files:
-            documents.append(
-                model.Document(
-                    name=file.name,
-                    file_path=str(file),
-                )
-            )
-        project = model.Project(name=name, document=documents)
+        project = model.Project(
+            name=name, documents_expected=len(manifest.entries), document=[]
+        )
         bm = model.Benchmark(
             name=name,
             benchmark_type=cmd.benchmark_type,
@@ -46,22 +42,50 @@ def create_benchmark(
             username=cmd.username,
             password=cmd.password,
             project=project,
+            upload_batch_size=cmd.upload_batch_size,
+            upload_concurrency=cmd.upload_concurrency,
         )
         uow.benchmarks.add(bm)
         uow.flush()
-        benchmark = uow.benchmarks.get_by_name(name)
-        logger.info(f"=== create_benchmark :: benchmark.id === : {benchmark.id}")
+        uow.benchmarks.add_documents(
+            bm,
+            [
+                (entry.name, str(path))
+                for entry, path in zip(manifest.entries, manifest.paths())
+            ],
+        )
+        benchmark_id = bm.id
+        logger.info(f"=== create_benchmark :: benchmark.id === : {benchmark_id}")
 
         next_event = benchmarks.get_next_event(
-            benchmark_id=benchmark.id,
-            benchmark_type=benchmark.benchmark_type,
+            benchmark_id=benchmark_id,
+            benchmark_type=bm.benchmark_type,
             current_message=cmd,
         )
-        if next_event is None:
-            logger.info("=== No next event ===")
-            return
 
-        publish(next_event)
+    if next_event is None:
+        logger.info("=== No next event ===")
+        return
+
+    # published once committed, so the consumer can read the benchmark
+    publish(next_event)
+
+
+@dataclass(frozen=True)
+class EigenTarget:
+    """
+    What a handler needs to call the benchmark target, read in its own transaction
+    so no session is held while waiting on the network
+    """
+
+    url: str
+    username: str
+    password: str
+    benchmark_name: str
+    benchmark_type: str
+    eigen_project_id: int | None
+    upload_batch_size: int | None
+    upload_concurrency: int
 
 
 def create_project(
@@ -73,37 +97,96 @@ def create_project(
     logger.info("=== Called create_project ===")
     logger.info(f"create_project event: {event}")
 
-    with uow:
-        benchmark = uow.benchmarks.get_by_id(event.benchmark_id)
+    target = _get_eigen_target(uow, event.benchmark_id)
+    eigen = client(
+        base_url=target.url,
+        username=target.username,
+        password=target.password,
+    )
+    project = eigen.create_project(
+        name=target.benchmark_name, description=target.benchmark_type
+    )
+    logger.info(f"=== create_project :: project response === : {project}")
 
-        eigen = client(
-            base_url=benchmark.target_url,
+    next_event = _set_eigen_project(uow, event, project.document_type_id)
+    if next_event is None:
+        logger.info("=== No next event ===")
+        return
+
+    logger.info(f"=== next_event === : {next_event}")
+    publish(next_event)
+
+
+async def create_project_async(
+    event: events.BenchmarkCreated,
+    uow: unit_of_work.AbstractUnitOfWork,
+    publish: Callable[[events.Event], None],
+    client: type[AsyncEigenClient],
+):
+    """
+    create_project for the asyncio event consumer. The DB work and publish are
+    sync, so they run in a worker thread.
+    """
+    logger.info(f"create_project_async event: {event}")
+
+    target = await asyncio.to_thread(_get_eigen_target, uow, event.benchmark_id)
+    eigen = await client.create(
+        base_url=target.url,
+        username=target.username,
+        password=target.password,
+    )
+    project = await eigen.create_project(
+        name=target.benchmark_name, description=target.benchmark_type
+    )
+    logger.info(f"=== create_project_async :: project response === : {project}")
+
+    next_event = await asyncio.to_thread(
+        _set_eigen_project, uow, event, project.document_type_id
+    )
+    if next_event is None:
+        logger.info("=== No next event ===")
+        return
+
+    logger.info(f"=== next_event === : {next_event}")
+    await asyncio.to_thread(publish, next_event)
+
+
+def _get_eigen_target(
+    uow: unit_of_work.AbstractUnitOfWork, benchmark_id: int
+) -> EigenTarget:
+    with uow:
+        benchmark = uow.benchmarks.get_by_id(benchmark_id)
+        return EigenTarget(
+            url=benchmark.target_url,
             username=benchmark.username,
             password=benchmark.password,
+            benchmark_name=benchmark.name,
+            benchmark_type=benchmark.benchmark_type,
+            eigen_project_id=benchmark.project.eigen_project_id,
+            upload_batch_size=benchmark.upload_batch_size,
+            upload_concurrency=benchmark.upload_concurrency,
         )
-        project = eigen.create_project(
-            name=benchmark.name, description=benchmark.benchmark_type
-        )
-        logger.info(f"=== create_project :: project response === : {project}")
-        project_id = project.document_type_id
 
+
+def _set_eigen_project(
+    uow: unit_of_work.AbstractUnitOfWork,
+    event: events.BenchmarkCreated,
+    project_id: int,
+) -> events.Event | None:
+    with uow:
+        benchmark = uow.benchmarks.get_by_id(event.benchmark_id)
         benchmark.project.eigen_project_id = project_id
         logger.info(f"===  benchmark.project === : {benchmark.project}")
         uow.benchmarks.add(benchmark)
         uow.flush()
+        uow.benchmarks.prime_benchmark_ref(benchmark.target_url, project_id)
         logger.info("=== Create Project completed ===")
 
-        next_event = benchmarks.get_next_event(
+        return benchmarks.get_next_event(
             benchmark_id=benchmark.id,
             benchmark_type=benchmark.benchmark_type,
             current_message=event,
         )
-        if next_event is None:
-            logger.info("=== No next event ===")
-            return
-
-        logger.info(f"=== next_event === : {next_event}")
-        publish(next_event)
 
 
 def upload_documents(
@@ -113,25 +196,90 @@ def upload_documents(
 ):
     logger.info("=== Called upload_documents ===")
     logger.info(f"upload_documents event: {event}")
-    # TODO using hardcoded artifacts dir to get docs for upload, move to settings
-    files = pathlib.Path("/home/app/artifacts").glob("*.txt")
-    logger.info(f"=== upload_documents :: found files === : {files}")
-    f_list = list(files.__iter__())
-    logger.info(f"=== upload_documents :: f_list === : {f_list}")
+    f_list = _get_upload_files(uow, event.benchmark_id)
 
-    with uow:
-        benchmark = uow.benchmarks.get_by_id(event.benchmark_id)
+    target = _get_eigen_target(uow, event.benchmark_id)
 
+    def upload_factory() -> upload_scheduler.Upload:
+        # a client per upload thread, a requests Session is not thread-safe
         eigen = client(
-            base_url=benchmark.target_url,
-            username=benchmark.username,
-            password=benchmark.password,
+            base_url=target.url,
+            username=target.username,
+            password=target.password,
         )
-        response = eigen.upload_files(
-            project_id=benchmark.project.eigen_project_id, files=f_list
+        return lambda batch: eigen.upload_files(
+            project_id=target.eigen_project_id,  # type: ignore[arg-type]
+            files=batch,
         )
-        logger.info(f"=== upload_documents :: response === : {response}")
-        logger.info("=== Upload Documents completed ===")
+
+    results = upload_scheduler.upload_batches(
+        upload_factory,
+        upload_scheduler.split_batches(f_list, target.upload_batch_size),
+        concurrency=target.upload_concurrency,
+    )
+    _record_upload_batches(uow, event.benchmark_id, results)
+    logger.info("=== Upload Documents completed ===")
+
+
+async def upload_documents_async(
+    event: events.ProjectCreated,
+    client: Type[AsyncEigenClient],
+    uow: unit_of_work.AbstractUnitOfWork,
+):
+    """
+    upload_documents for the asyncio event consumer
+    """
+    logger.info(f"upload_documents_async event: {event}")
+    f_list = await asyncio.to_thread(_get_upload_files, uow, event.benchmark_id)
+
+    target = await asyncio.to_thread(_get_eigen_target, uow, event.benchmark_id)
+    eigen = await client.create(
+        base_url=target.url,
+        username=target.username,
+        password=target.password,
+    )
+    results = await upload_scheduler.upload_batches_async(
+        lambda batch: eigen.upload_files(
+            project_id=target.eigen_project_id,  # type: ignore[arg-type]
+            files=batch,
+        ),
+        upload_scheduler.split_batches(f_list, target.upload_batch_size),
+        concurrency=target.upload_concurrency,
+    )
+    await asyncio.to_thread(_record_upload_batches, uow, event.benchmark_id, results)
+
+
+def _record_upload_batches(
+    uow: unit_of_work.AbstractUnitOfWork,
+    benchmark_id: int,
+    results: list[upload_scheduler.BatchResult],
+):
+    failed = [r.batch_number for r in results if not r.succeeded]
+    if failed:
+        logger.error(
+            f"=== upload_documents :: {len(failed)} of {len(results)} batches "
+            f"failed: {failed} ==="
+        )
+
+    with uow:
+        benchmark = uow.benchmarks.get_by_id(benchmark_id)
+        benchmark.upload_batches.extend(
+            model.UploadBatch(**asdict(result)) for result in results
+        )
+
+
+def _get_upload_files(
+    uow: unit_of_work.AbstractUnitOfWork, benchmark_id: int
+) -> list[pathlib.Path]:
+    """
+    The benchmark's documents, as listed by the artifact catalog when the
+    benchmark was created
+    """
+    with uow:
+        benchmark = uow.benchmarks.get_by_id(benchmark_id)
+        f_list = [pathlib.Path(d.file_path) for d in benchmark.project.document]
+    logger.info(f"=== upload_documents :: {len(f_list)} files ===")
+    return f_list
 
 
 def update_document(
@@ -142,46 +290,139 @@ def update_document(
     logger.info("=== Called update_document ===")
     logger.info(f"update_document cmd: {cmd}")
 
-    for _ in range(0, settings.DB_MAX_RETRIES):
-        try:
-            with uow:
-                bm = uow.benchmarks.get_by_host_and_project_id(
-                    host=cmd.benchmark_host_name, project_id=int(cmd.eigen_project_id)
-                )
-                logger.info(f"=== bm === : {bm}")
-
-                documents = bm.project.document
-                logger.info(f"=== documents === : {documents}")
-                for doc in documents:
-                    if doc.name == cmd.document_name:
-                        logger.info(f"=== doc === : {doc}")
-                        if cmd.start_time:
-                            doc.upload_time_start = datetime.fromtimestamp(
-                                cmd.start_time
-                            )
-                        if cmd.end_time:
-                            doc.upload_time_end = datetime.fromtimestamp(cmd.end_time)
-                        logger.info(f"=== doc updated === : {doc}")
-                        break
-
-                uow.benchmarks.add(bm)
-
-                next_event = benchmarks.get_next_event(
-                    benchmark_id=bm.id,
-                    benchmark_type=bm.benchmark_type,
-                    current_message=cmd,
-                )
-                if next_event is None:
-                    logger.info("=== No next event ===")
-                    return
-
-                publish(next_event)
-
-        except (DetachedInstanceError, IllegalStateChangeError, InvalidRequestError):
-            logger.info(
-                f"===DB exception when updating doc {cmd.document_name}, retrying."
+    with uow:
+        bm = uow.benchmarks.resolve_benchmark(
+            host=cmd.benchmark_host_name, project_id=int(cmd.eigen_project_id)
+        )
+        logger.info(f"=== bm === : {bm}")
+        if bm is None:
+            logger.warning(f"=== No benchmark found for {cmd.benchmark_host_name} ===")
+            return
+        messagebus.attribute_benchmark(bm.benchmark_id)
+
+        start_time = _to_datetime(cmd.start_time)
+        upload_times = uow.benchmarks.set_document_upload_times(
+            benchmark=bm,
+            document_name=cmd.document_name,
+            start_time=start_time,
+            end_time=_to_datetime(cmd.end_time),
+        )
+        logger.info(f"=== upload_times === : {upload_times}")
+        if upload_times is None:
+            logger.info(f"=== No timing recorded for doc {cmd.document_name} ===")
+            return
+        if start_time is not None and upload_times.upload_time_start == start_time:
+            uow.benchmarks.increment_documents_started(bm.project_id, 1, start_time)
+        upload_time = upload_times.upload_time
+        if upload_time is None:
+            logger.info(f"=== Waiting for other timing of {cmd.document_name} ===")
+            return
+
+        uow.benchmarks.increment_documents_completed(
+            bm.project_id, last_end=upload_times.upload_time_end
+        )
+        sketch = statistics.LatencySketch()
+        sketch.add([upload_time])
+        uow.benchmarks.merge_latency_sketch(bm.project_id, sketch)
+
+    next_event = benchmarks.get_next_event(
+        benchmark_id=bm.benchmark_id,
+        benchmark_type=bm.benchmark_type,
+        current_message=cmd,
+    )
+    if next_event is None:
+        logger.info("=== No next event ===")
+        return
+
+    if isinstance(next_event, events.DocumentUpdated):
+        next_event.upload_times = {cmd.document_name: upload_time}
+    publish(next_event)
+
+
+def update_documents_batch(
+    cmd: commands.UpdateDocumentsBatch,
+    uow: unit_of_work.AbstractUnitOfWork,
+    publish_many: Callable[[list[events.Event]], None],
+):
+    """
+    Applies a batch of document timings in a single unit of work. Each timing is a
+    single-row update, and one event is published per benchmark with completed
+    documents, so the completion check runs once per batch rather than once per
+    timing. The events are published together, in one round trip to the broker.
+    """
+    logger.info("=== Called update_documents_batch ===")
+    logger.info(f"update_documents_batch size: {len(cmd.documents)}")
+
+    started: Counter[repository.BenchmarkRef] = Counter()
+    first_starts: dict[repository.BenchmarkRef, datetime] = {}
+    completed: Counter[repository.BenchmarkRef] = Counter()
+    last_ends: dict[repository.BenchmarkRef, datetime] = {}
+    latencies: dict[repository.BenchmarkRef, dict[str, float]] = defaultdict(dict)
+    with uow:
+        for timing in cmd.documents:
+            bm = uow.benchmarks.resolve_benchmark(
+                host=timing.benchmark_host_name,
+                project_id=int(timing.eigen_project_id),
             )
-            time.sleep(settings.DB_RETRY_INTERVAL)
+            if bm is None:
+                logger.warning(f"=== No benchmark for {timing.document_name} ===")
+                continue
+            messagebus.attribute_benchmark(bm.benchmark_id)
+
+            start_time = _to_datetime(timing.start_time)
+            upload_times = uow.benchmarks.set_document_upload_times(
+                benchmark=bm,
+                document_name=timing.document_name,
+                start_time=start_time,
+                end_time=_to_datetime(timing.end_time),
+            )
+            if upload_times is None:
+                logger.info(f"=== No timing recorded for {timing.document_name} ===")
+                continue
+            if start_time is not None and upload_times.upload_time_start == start_time:
+                started[bm] += 1
+                first_starts[bm] = min(first_starts.get(bm, start_time), start_time)
+            upload_time = upload_times.upload_time
+            if upload_time is not None and upload_times.upload_time_end is not None:
+                completed[bm] += 1
+                end_time = upload_times.upload_time_end
+                last_ends[bm] = max(last_ends.get(bm, end_time), end_time)
+                latencies[bm][timing.document_name] = upload_time
+
+        for bm, count in started.items():
+            uow.benchmarks.increment_documents_started(
+                bm.project_id, count, first_starts[bm]
+            )
+        for bm, count in completed.items():
+            uow.benchmarks.increment_documents_completed(
+                bm.project_id, count, last_ends[bm]
+            )
+            sketch = statistics.LatencySketch()
+            sketch.add(latencies[bm].values())
+            uow.benchmarks.merge_latency_sketch(bm.project_id, sketch)
+
+    next_events: list[events.Event] = []
+    for bm in completed:
+        next_event = benchmarks.get_next_event(
+            benchmark_id=bm.benchmark_id,
+            benchmark_type=bm.benchmark_type,
+            current_message=cmd,
+        )
+        if next_event is None:
+            logger.info("=== No next event ===")
+            continue
+
+        if isinstance(next_event, events.DocumentUpdated):
+            next_event.upload_times = latencies[bm]
+        next_events.append(next_event)
+    if next_events:
+        publish_many(next_events)
+
+
+def _to_datetime(timestamp: float | None) -> datetime | None:
+    if not timestamp:
+        return None
+    return datetime.fromtimestamp(timestamp)
 
 
 def check_all_documents_uploaded(
@@ -189,45 +430,40 @@ def check_all_documents_uploaded(
     uow: unit_of_work.AbstractUnitOfWork,
     publish: Callable[[events.Event], None],
 ):
+    """
+    Compares the project's completed and expected document counters, which the
+    timing write path maintains, so the check never loads the documents.
+    """
     logger.info("=== Called check_all_documents_uploaded ===")
     logger.info(f"check_all_documents_uploaded event: {event}")
 
     with uow:
-        bm = uow.benchmarks.get_by_id(event.benchmark_id)
-        logger.info(f"=== check_all_documents_uploaded bm === : {bm}")
-        documents = bm.project.document
-
-        docs_with_upload_time = [
-            doc.upload_time for doc in documents if doc.upload_time
-        ]
-        logger.info(f"=== docs_with_upload_time === : {docs_with_upload_time}")
-        logger.info(
-            f"=== len(docs_with_upload_time) === : {len(docs_with_upload_time)}"
-        )
-        logger.info(f"=== len(documents) === : {len(documents)}")
-
-        if len(docs_with_upload_time) == len(documents):
-            logger.info(f"=== docs_with_upload_time === : {docs_with_upload_time}")
-
-            if bm.project.all_docs_uploaded:
-                logger.info("=== All docs already uploaded ===")
-                return
-            else:
-                logger.info("=== All docs uploaded, updating project ===")
-                bm.project.all_docs_uploaded = datetime.now(timezone.utc)
-                uow.benchmarks.add(bm)
-                uow.flush()
-
-                next_event = benchmarks.get_next_event(
-                    benchmark_id=bm.id,
-                    benchmark_type=bm.benchmark_type,
-                    current_message=event,
-                )
-                if next_event is None:
-                    logger.info("=== No next event ===")
-                    return
-
-                publish(next_event)
+        progress = uow.benchmarks.get_document_progress(event.benchmark_id)
+        logger.info(f"=== check_all_documents_uploaded progress === : {progress}")
+        if progress is None:
+            logger.warning(f"=== No benchmark found for {event.benchmark_id} ===")
+            return
+
+        if progress.documents_completed < progress.documents_expected:
+            return
+
+        logger.info("=== All docs uploaded, updating project ===")
+        if not uow.benchmarks.mark_all_documents_uploaded(
+            event.benchmark_id, datetime.now(timezone.utc)
+        ):
+            logger.info("=== All docs already uploaded ===")
+            return
+
+    next_event = benchmarks.get_next_event(
+        benchmark_id=progress.benchmark_id,
+        benchmark_type=progress.benchmark_type,
+        current_message=event,
+    )
+    if next_event is None:
+        logger.info("=== No next event ===")
+        return
+
+    publish(next_event)
 
 
 def create_report(
@@ -239,6 +475,32 @@ def create_report(
     with uow:
         bm = uow.benchmarks.get_by_id(event.benchmark_id)
         logger.info(f"=== create_report bm === : {bm}")
-        report = LatencyReport().create(bm)
-        notifications.send(benchmark=bm, message=report)
+        report = LatencyReport().create(
+            bm, uow.benchmarks.stream_document_upload_times(bm.id)
+        )
+        notifications.send(
+            benchmark=bm,
+            message=(
+                f"{report.file_path}\nSummary: {report.summary_path}\n"
+                f"{report.summary.headline()}"
+            ),
+        )
         logger.info("=== Create Report Notification sent  ===")
+
+
+def compare_benchmarks(
+    cmd: commands.CompareBenchmarks,
+    uow: unit_of_work.AbstractUnitOfWork,
+    notifications: notifications.AbstractNotifications,
+):
+    logger.info(f"=== Called compare_benchmarks with {cmd} ===")
+    comparisons = views.compare_benchmarks(cmd.benchmark_ids, uow)
+    report = ComparisonReport.create(comparisons)
+    regressions = [c["candidate"]["name"] for c in comparisons if c["regression"]]
+    with uow:
+        baseline = uow.benchmarks.get_by_id(cmd.benchmark_ids[0])
+        notifications.send(
+            benchmark=baseline,
+            message=f"{report}\nRegressions: {', '.join(regressions) or 'none'}",
+        )
+    logger.info("=== Comparison Report Notification sent ===")
@@ -1,9 +1,17 @@
 """
 MessageBus is a class that handles the communication between the application
 """
+import asyncio
+import contextlib
+import contextvars
+import functools
+import inspect
 import logging
-from typing import Callable, Type, Union
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Generator, Iterator, Type, Union
 
+from slowking.adapters import metrics
 from slowking.domain import commands, events
 from slowking.service_layer import unit_of_work
 
@@ -12,9 +20,141 @@ logger = logging.getLogger(__name__)
 Message = Union[commands.Command, events.Event]
 
 
-class MessageBus:
+@dataclass
+class HandlerInvocation:
     """
-    MessageBus is a class that handles the communication between the application
+    One call of a handler with a message, passed to the bus hooks once the handler
+    has returned or raised
+    """
+
+    message: Message
+    handler_name: str
+    # wall clock start, for exporting; the duration is measured on the monotonic
+    # clock
+    started_at_ns: int
+    duration: float = 0.0
+    outcome: str = "success"
+    error: Exception | None = None
+    # events the handler published, see `track_published`
+    published: list[events.Event] = field(default_factory=list)
+    # the benchmark of a message not keyed by benchmark, see `attribute_benchmark`
+    benchmark_id: int | None = None
+
+
+Hook = Callable[[HandlerInvocation], None]
+
+_current_invocation: contextvars.ContextVar[
+    HandlerInvocation | None
+] = contextvars.ContextVar("current_invocation", default=None)
+
+
+def handler_name(handler: Callable) -> str:
+    """
+    The name of a handler, unwrapping the partials the handlers are injected with
+    """
+    while isinstance(handler, functools.partial):
+        handler = handler.func
+    return getattr(handler, "__name__", type(handler).__name__)
+
+
+def track_published(
+    publish: Callable[[events.Event], None],
+) -> Callable[[events.Event], None]:
+    """
+    Wraps the publish function injected into the handlers, so each event is added
+    to the invocation of the handler publishing it
+    """
+
+    def publish_tracked(event: events.Event):
+        invocation = _current_invocation.get()
+        if invocation is not None:
+            invocation.published.append(event)
+        publish(event)
+
+    return publish_tracked
+
+
+def track_published_many(
+    publish_many: Callable[[list[events.Event]], None],
+) -> Callable[[list[events.Event]], None]:
+    """
+    `track_published` for the function injected into the handlers publishing
+    several events in one round trip
+    """
+
+    def publish_many_tracked(events_to_publish: list[events.Event]):
+        invocation = _current_invocation.get()
+        if invocation is not None:
+            invocation.published.extend(events_to_publish)
+        publish_many(events_to_publish)
+
+    return publish_many_tracked
+
+
+def attribute_benchmark(benchmark_id: int) -> None:
+    """
+    Attributes the current handler invocation to a benchmark, for the handlers of
+    messages keyed by target host and Eigen project rather than benchmark_id, e.g.
+    the document timing callbacks. The first benchmark attributed wins.
+    """
+    invocation = _current_invocation.get()
+    if invocation is not None and invocation.benchmark_id is None:
+        invocation.benchmark_id = benchmark_id
+
+
+def record_metrics(invocation: HandlerInvocation):
+    """
+    The default hook, observes the handler duration and counts the event handler
+    exceptions the bus swallows
+    """
+    message_type = type(invocation.message).__name__
+    metrics.observe_handler(
+        message_type, invocation.handler_name, invocation.duration, invocation.outcome
+    )
+    if invocation.error is not None and isinstance(invocation.message, events.Event):
+        metrics.EVENT_HANDLER_ERRORS.labels(message_type, invocation.handler_name).inc()
+
+
+@contextlib.contextmanager
+def _invoke(
+    hooks: list[Hook], message: Message, handler: Callable
+) -> Iterator[HandlerInvocation]:
+    invocation = HandlerInvocation(
+        message=message,
+        handler_name=handler_name(handler),
+        started_at_ns=time.time_ns(),
+    )
+    token = _current_invocation.set(invocation)
+    start = time.perf_counter()
+    try:
+        yield invocation
+    except Exception as ex:
+        invocation.outcome = "error"
+        invocation.error = ex
+        raise
+    except BaseException:
+        invocation.outcome = "error"
+        raise
+    finally:
+        invocation.duration = time.perf_counter() - start
+        _current_invocation.reset(token)
+        for hook in hooks:
+            try:
+                hook(invocation)
+            except Exception:
+                # a hook never fails the handling of a message
+                logger.exception(f"Exception in message bus hook {hook}")
+
+
+# a handler call the dispatch loop asks the bus to make
+Call = tuple[Callable, Message]
+
+
+class _BaseMessageBus:
+    """
+    The dispatch loop shared by the sync and async buses. `_dispatch` yields each
+    handler call for the bus to make, and is sent back the exception a handler
+    raised, so the routing, error handling and hooks are implemented once.
     """
 
     def __init__(
@@ -22,29 +162,34 @@ class MessageBus:
         uow: unit_of_work.AbstractUnitOfWork,
         command_handlers: dict[Type[commands.Command], list[Callable]],
         event_handlers: dict[Type[events.Event], list[Callable]],
+        hooks: list[Hook] | None = None,
     ):
         self.uow = uow
         self.command_handlers = command_handlers
         self.event_handlers = event_handlers
+        self.hooks: list[Hook] = [record_metrics] if hooks is None else hooks
 
-    def handle(self, message: Message):
+    def _dispatch(self, message: Message) -> Generator[Call, Exception | None, None]:
         """
-        Evalutes the message and if a command, calls the handle_command method, else if
-        an event, calls the handle_event method.
+        Evalutes the message and if a command, dispatches it with _dispatch_command,
+        else if an event, with _dispatch_event.
         """
-        self.queue = [message]
-        while self.queue:
-            message = self.queue.pop(0)
+        # local to the call, as one bus is shared by concurrent requests
+        queue = [message]
+        while queue:
+            message = queue.pop(0)
             if isinstance(message, events.Event):
                 logger.info(f"handling event {message}")
-                self.handle_event(message)
+                yield from self._dispatch_event(message)
             elif isinstance(message, commands.Command):
                 logger.info(f"handler: handling command {message}")
-                self.handle_command(message)
+                yield from self._dispatch_command(message)
             else:
                 raise Exception(f"{message} was not an Event or Command")
 
-    def handle_command(self, command: commands.Command):
+    def _dispatch_command(
+        self, command: commands.Command
+    ) -> Generator[Call, Exception | None, None]:
         """
         Commands capture intent. They express our wish for the system to do something.
         As a result, when they fail, the sender needs to receive error information.
@@ -56,12 +201,14 @@ class MessageBus:
         for handler in self.command_handlers[type(command)]:
             try:
                 logger.info(f"handle_command: handling command {command}")
-                handler(command)
+                yield from self._invoke(command, handler)
             except Exception:
                 logger.exception(f"Exception handling command {command}")
                 raise
 
-    def handle_event(self, event):
+    def _dispatch_event(
+        self, event: events.Event
+    ) -> Generator[Call, Exception | None, None]:
         """
         Events are broadcast by an actor to all interested listeners.
 
@@ -72,7 +219,73 @@ class MessageBus:
         for handler in self.event_handlers[type(event)]:
             try:
                 logger.info(f"handle_event {event} with handler {handler}")
-                handler(event)
+                yield from self._invoke(event, handler)
             except Exception as ex:
                 logger.exception(f"Exception {ex} handling event {event}")
                 continue
+
+    def _invoke(
+        self, message: Message, handler: Callable
+    ) -> Generator[Call, Exception | None, None]:
+        with _invoke(self.hooks, message, handler):
+            error = yield handler, message
+            if error is not None:
+                raise error
+
+
+class MessageBus(_BaseMessageBus):
+    """
+    MessageBus is a class that handles the communication between the application
+
+    Each handler invocation is passed to the `hooks` in order, with the handler
+    name, duration and outcome. The default hooks record the handler metrics.
+    """
+
+    def handle(self, message: Message):
+        dispatch = self._dispatch(message)
+        error: Exception | None = None
+        # closed when a handler is interrupted, e.g. by a KeyboardInterrupt, so the
+        # hooks still see the invocation
+        with contextlib.closing(dispatch):
+            while True:
+                try:
+                    handler, message = dispatch.send(error)
+                except StopIteration:
+                    return
+                error = None
+                try:
+                    handler(message)
+                except Exception as ex:
+                    error = ex
+
+
+class AsyncMessageBus(_BaseMessageBus):
+    """
+    The asyncio variant of the MessageBus. Coroutine handlers are awaited, so the
+    I/O of many messages runs concurrently on the event loop. Sync handlers are
+    run in a worker thread with asyncio.to_thread so they never block the loop.
+    """
+
+    async def handle(self, message: Message):
+        dispatch = self._dispatch(message)
+        error: Exception | None = None
+        # closed when a handler is interrupted, e.g. by a cancellation, so the
+        # hooks still see the invocation
+        with contextlib.closing(dispatch):
+            while True:
+                try:
+                    handler, message = dispatch.send(error)
+                except StopIteration:
+                    return
+                error = None
+                try:
+                    await self._call(handler, message)
+                except Exception as ex:
+                    error = ex
+
+    @staticmethod
+    async def _call(handler: Callable, message: Message):
+        # to_thread copies the context, so the invocation is current in the thread
+        if inspect.iscoroutinefunction(handler):
+            return await handler(message)
+        return await asyncio.to_thread(handler, message)
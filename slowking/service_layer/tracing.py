@@ -0,0 +1,119 @@
+"""
+Tracing of the message bus, a hook recording a span per handler invocation
+"""
+import hashlib
+import logging
+import secrets
+
+from slowking.adapters.span_exporter import (
+    AttributeValue,
+    BatchSpanExporter,
+    Span,
+    SpanFileExporter,
+)
+from slowking.config import settings
+from slowking.domain import commands
+from slowking.service_layer.messagebus import HandlerInvocation
+
+logger = logging.getLogger(__name__)
+
+
+def trace_id(
+    benchmark_id: int, deployment_id: str = settings.TRACE_DEPLOYMENT_ID
+) -> str:
+    """
+    The trace of a benchmark. It is derived from the benchmark id, so every process
+    handling the benchmark's messages records its spans in the same trace without
+    the trace context being passed along with the events.
+
+    The benchmark id is a database serial, so it is salted with the deployment id:
+    benchmarks of another environment, or from before a database reset with a new
+    TRACE_DEPLOYMENT_ID, never share a trace.
+    """
+    return _digest(f"slowking.{deployment_id}.benchmark.{benchmark_id}", 16)
+
+
+def root_span_id(
+    benchmark_id: int, deployment_id: str = settings.TRACE_DEPLOYMENT_ID
+) -> str:
+    """
+    The span of the handler creating the benchmark, the parent of every other
+    span of the benchmark
+    """
+    return _digest(f"slowking.{deployment_id}.benchmark.{benchmark_id}.root", 8)
+
+
+class SpanRecorder:
+    """
+    A message bus hook exporting a span per handler invocation, named after the
+    message and the handler, e.g. "ProjectCreated upload_documents".
+
+    The spans of a benchmark's whole chain, from CreateBenchmark to
+    AllDocumentsUploaded and the report, share one trace. A message without a
+    benchmark_id is attributed to the benchmark its handler resolved, see
+    `attribute_benchmark`, as the document timing callbacks do, or else to the
+    benchmark of the first event its handler published, as CreateBenchmark does.
+    An invocation which cannot be attributed gets a trace of its own.
+
+    Wrap the exporter in a BatchSpanExporter so the spans are written off the
+    thread, or event loop, handling the message.
+    """
+
+    root_messages: tuple[type, ...] = (commands.CreateBenchmark,)
+
+    def __init__(
+        self,
+        exporter: SpanFileExporter | BatchSpanExporter,
+        deployment_id: str = settings.TRACE_DEPLOYMENT_ID,
+    ):
+        self.exporter = exporter
+        self.deployment_id = deployment_id
+
+    def __call__(self, invocation: HandlerInvocation):
+        self.exporter.export([self.to_span(invocation)])
+
+    def to_span(self, invocation: HandlerInvocation) -> Span:
+        message = invocation.message
+        benchmark_id = getattr(message, "benchmark_id", invocation.benchmark_id)
+        if benchmark_id is None and invocation.published:
+            benchmark_id = invocation.published[0].benchmark_id
+
+        attributes: dict[str, AttributeValue] = {
+            "slowking.message": type(message).__name__,
+            "slowking.handler": invocation.handler_name,
+            "slowking.outcome": invocation.outcome,
+        }
+        if invocation.published:
+            attributes["slowking.published"] = [
+                type(event).__name__ for event in invocation.published
+            ]
+
+        if benchmark_id is None:
+            trace, span_id, parent = _random_id(16), _random_id(8), None
+        else:
+            attributes["slowking.benchmark_id"] = benchmark_id
+            trace = trace_id(benchmark_id, self.deployment_id)
+            root = root_span_id(benchmark_id, self.deployment_id)
+            if isinstance(message, self.root_messages):
+                span_id, parent = root, None
+            else:
+                span_id, parent = _random_id(8), root
+
+        return Span(
+            trace_id=trace,
+            span_id=span_id,
+            parent_span_id=parent,
+            name=f"{type(message).__name__} {invocation.handler_name}",
+            start_time_ns=invocation.started_at_ns,
+            end_time_ns=invocation.started_at_ns + int(invocation.duration * 1e9),
+            attributes=attributes,
+            error=None if invocation.error is None else repr(invocation.error),
+        )
+
+
+def _digest(key: str, size: int) -> str:
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=size).hexdigest()
+
+
+def _random_id(size: int) -> str:
+    return secrets.token_hex(size)
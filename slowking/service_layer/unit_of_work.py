@@ -2,12 +2,14 @@ from __future__ import annotations
 
 import abc
 import logging.config
+import threading
 
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm.session import Session
 
 from slowking.adapters import repository
+from slowking.adapters.cache import LRUCache
 from slowking.config import settings
 
 logger = logging.getLogger(__name__)
@@ -15,7 +17,7 @@ logger = logging.getLogger(__name__)
 DEFAULT_SESSION_FACTORY = sessionmaker(
     bind=create_engine(
         settings.SQLALCHEMY_DATABASE_URI,  # type: ignore
-        isolation_level="REPEATABLE READ",
+        isolation_level="READ COMMITTED",
     )
 )
 
@@ -56,10 +58,37 @@ class SqlAlchemyUnitOfWork(AbstractUnitOfWork):
 
     def __init__(self, session_factory=DEFAULT_SESSION_FACTORY):
         self.session_factory = session_factory
+        # Outlives the per-transaction repositories, resolving timing callbacks
+        # to their benchmark without a join
+        self.benchmark_refs: LRUCache[repository.BenchmarkRef] = LRUCache(
+            maxsize=settings.BENCHMARK_CACHE_MAXSIZE,
+            ttl=settings.BENCHMARK_CACHE_TTL,
+        )
+        # A UoW instance is shared by every handler in the process, so the session
+        # is scoped to the calling thread (SQLAlchemy: one Session per thread)
+        self._local = threading.local()
+
+    @property
+    def session(self) -> Session:
+        return self._local.session
+
+    @session.setter
+    def session(self, session: Session):
+        self._local.session = session
+
+    @property
+    def benchmarks(self) -> repository.AbstractRepository:
+        return self._local.benchmarks
+
+    @benchmarks.setter
+    def benchmarks(self, benchmarks: repository.AbstractRepository):
+        self._local.benchmarks = benchmarks
 
     def __enter__(self):
-        self.session: Session = self.session_factory()
-        self.benchmarks = repository.SqlAlchemyRepository(self.session)
+        self.session = self.session_factory()
+        self.benchmarks = repository.SqlAlchemyRepository(
+            self.session, self.benchmark_refs
+        )
         return super().__enter__()
 
     def __exit__(self, exc_type, exc_value, traceback):
@@ -0,0 +1,200 @@
+"""
+Upload scheduler, sends a corpus to the benchmark target in concurrent batches
+"""
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from tenacity import (
+    AsyncRetrying,
+    RetryError,
+    Retrying,
+    stop_after_attempt,
+    wait_exponential,
+)
+
+from slowking.adapters import metrics
+from slowking.config import settings
+
+logger = logging.getLogger(__name__)
+
+Upload = Callable[[list[Path]], Any]
+AsyncUpload = Callable[[list[Path]], Awaitable[Any]]
+
+
+@dataclass
+class BatchResult:
+    """
+    Client-side timing of one batch, from the first attempt to the last
+    """
+
+    batch_number: int
+    document_count: int
+    size_bytes: int
+    attempts: int
+    upload_time_start: datetime
+    upload_time_end: datetime
+    error: str | None = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+
+def split_batches(files: list[Path], batch_size: int | None) -> list[list[Path]]:
+    """
+    Splits the files into batches of `batch_size`, or a single batch when it is
+    not set
+    """
+    if not files:
+        return []
+    if not batch_size or batch_size >= len(files):
+        return [files]
+    return [files[i : i + batch_size] for i in range(0, len(files), batch_size)]
+
+
+def upload_batches(
+    upload_factory: Callable[[], Upload],
+    batches: list[list[Path]],
+    concurrency: int = 1,
+    max_attempts: int = settings.UPLOAD_BATCH_MAX_ATTEMPTS,
+) -> list[BatchResult]:
+    """
+    Uploads the batches on up to `concurrency` threads. A failed batch is retried
+    on its own, up to `max_attempts` times, and does not stop the other batches.
+
+    `upload_factory` builds the upload function of each thread, so a client which
+    is not thread-safe, like a requests Session, is never shared between them.
+    The upload should make a single attempt, the retries happen here.
+    """
+    local = threading.local()
+
+    def upload(batch: list[Path]) -> Any:
+        if not hasattr(local, "upload"):
+            local.upload = upload_factory()
+        return local.upload(batch)
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        return list(
+            executor.map(
+                lambda n, batch: _upload_batch(upload, n, batch, max_attempts),
+                range(1, len(batches) + 1),
+                batches,
+            )
+        )
+
+
+async def upload_batches_async(
+    upload: AsyncUpload,
+    batches: list[list[Path]],
+    concurrency: int = 1,
+    max_attempts: int = settings.UPLOAD_BATCH_MAX_ATTEMPTS,
+) -> list[BatchResult]:
+    """
+    upload_batches for the asyncio event consumer, with at most `concurrency`
+    batches in flight
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def bounded(batch_number: int, batch: list[Path]) -> BatchResult:
+        async with semaphore:
+            return await _upload_batch_async(upload, batch_number, batch, max_attempts)
+
+    return list(
+        await asyncio.gather(
+            *(bounded(n, batch) for n, batch in enumerate(batches, start=1))
+        )
+    )
+
+
+def _upload_batch(
+    upload: Upload, batch_number: int, batch: list[Path], max_attempts: int
+) -> BatchResult:
+    size_bytes = _size_bytes(batch)
+    started_at = datetime.now(timezone.utc)
+    start = time.perf_counter()
+    attempts = 0
+    error = None
+    try:
+        for attempt in Retrying(**_retry_policy(max_attempts)):
+            with attempt:
+                attempts = attempt.retry_state.attempt_number
+                upload(batch)
+    except RetryError as e:
+        error = _describe(batch_number, e)
+    return _result(batch_number, batch, size_bytes, attempts, started_at, start, error)
+
+
+async def _upload_batch_async(
+    upload: AsyncUpload, batch_number: int, batch: list[Path], max_attempts: int
+) -> BatchResult:
+    size_bytes = await asyncio.to_thread(_size_bytes, batch)
+    started_at = datetime.now(timezone.utc)
+    start = time.perf_counter()
+    attempts = 0
+    error = None
+    try:
+        async for attempt in AsyncRetrying(**_retry_policy(max_attempts)):
+            with attempt:
+                attempts = attempt.retry_state.attempt_number
+                await upload(batch)
+    except RetryError as e:
+        error = _describe(batch_number, e)
+    return _result(batch_number, batch, size_bytes, attempts, started_at, start, error)
+
+
+def _retry_policy(max_attempts: int) -> dict[str, Any]:
+    return {
+        "stop": stop_after_attempt(max(1, max_attempts)),
+        "wait": wait_exponential(multiplier=settings.UPLOAD_BATCH_RETRY_WAIT),
+        "before_sleep": metrics.count_retries("upload_batch"),
+    }
+
+
+def _describe(batch_number: int, error: RetryError) -> str:
+    cause = error.last_attempt.exception()
+    logger.error(f"Upload batch {batch_number} failed: {cause!r}")
+    return repr(cause)
+
+
+def _size_bytes(batch: list[Path]) -> int:
+    """
+    The size of the batch, taken before it is uploaded. A file which can not be
+    read is counted as empty, the upload reports the error.
+    """
+    size = 0
+    for path in batch:
+        try:
+            size += path.stat().st_size
+        except OSError:
+            logger.warning(f"Could not read the size of {path}")
+    return size
+
+
+def _result(
+    batch_number: int,
+    batch: list[Path],
+    size_bytes: int,
+    attempts: int,
+    started_at: datetime,
+    start: float,
+    error: str | None,
+) -> BatchResult:
+    # the duration is measured on the monotonic clock, so it is not skewed by
+    # wall clock adjustments during the upload
+    ended_at = started_at + timedelta(seconds=time.perf_counter() - start)
+    return BatchResult(
+        batch_number=batch_number,
+        document_count=len(batch),
+        size_bytes=size_bytes,
+        attempts=attempts,
+        upload_time_start=started_at,
+        upload_time_end=ended_at,
+        error=error,
+    )
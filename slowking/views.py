@@ -0,0 +1,97 @@
+"""
+Read-only views, queried outside of the message bus
+"""
+from dataclasses import asdict
+from typing import Any
+
+import numpy as np
+
+from slowking.config import settings
+from slowking.domain import statistics
+from slowking.domain.exceptions import BenchmarkNotFoundError
+from slowking.service_layer import unit_of_work
+
+
+def compare_benchmarks(
+    benchmark_ids: list[int],
+    uow: unit_of_work.AbstractUnitOfWork,
+    seed: int | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Compares the upload times of each benchmark after the first to the first, the
+    baseline. Returns one comparison per candidate.
+
+    Raises:
+        BenchmarkNotFoundError: when one of the benchmarks does not exist
+    """
+    with uow:
+        infos = []
+        upload_times = []
+        for benchmark_id in benchmark_ids:
+            benchmark = uow.benchmarks.get_by_id(benchmark_id)
+            if benchmark is None:
+                raise BenchmarkNotFoundError(f"Benchmark {benchmark_id} not found")
+            infos.append(
+                {
+                    "id": benchmark_id,
+                    "name": benchmark.name,
+                    "eigen_platform_version": benchmark.eigen_platform_version,
+                    "target_infra": benchmark.target_infra,
+                }
+            )
+            upload_times.append(np.array(uow.benchmarks.get_upload_times(benchmark_id)))
+
+    comparisons = []
+    for info, times in zip(infos[1:], upload_times[1:]):
+        comparison = statistics.compare(
+            upload_times[0],
+            times,
+            threshold=settings.COMPARISON_REGRESSION_THRESHOLD,
+            confidence=settings.COMPARISON_CONFIDENCE,
+            significance=settings.COMPARISON_SIGNIFICANCE,
+            resamples=settings.COMPARISON_BOOTSTRAP_RESAMPLES,
+            seed=seed,
+        )
+        comparisons.append(
+            {"baseline": infos[0], "candidate": info, **asdict(comparison)}
+        )
+    return comparisons
+
+
+def benchmark_progress(
+    benchmark_id: int, uow: unit_of_work.AbstractUnitOfWork
+) -> dict[str, Any] | None:
+    """
+    Progress of a benchmark from the project counters and the latency sketch, which
+    the timing write path maintains. Two small queries whatever the corpus size.
+    """
+    with uow:
+        progress = uow.benchmarks.get_document_progress(benchmark_id)
+        if progress is None:
+            return None
+        sketch = uow.benchmarks.get_latency_sketch(benchmark_id)
+
+    # measured on the benchmark target's clock, from the first upload start to the
+    # last upload end
+    elapsed = None
+    throughput = None
+    if progress.first_upload_time_start and progress.last_upload_time_end:
+        elapsed = max(
+            0.0,
+            (
+                progress.last_upload_time_end - progress.first_upload_time_start
+            ).total_seconds(),
+        )
+        if elapsed:
+            throughput = progress.documents_completed / elapsed
+    return {
+        "benchmark_id": progress.benchmark_id,
+        "benchmark_type": progress.benchmark_type,
+        "documents_expected": progress.documents_expected,
+        "documents_started": progress.documents_started,
+        "documents_completed": progress.documents_completed,
+        "all_docs_uploaded": progress.all_docs_uploaded,
+        "elapsed_seconds": elapsed,
+        "documents_per_second": throughput,
+        "percentiles": sketch.percentiles(),
+    }
@@ -0,0 +1,67 @@
+"""
+Checks the hot repository queries are served by indexes. The SQL emitted by the
+repository is captured and explained with SQLite's EXPLAIN QUERY PLAN, where a full
+table scan is reported as `SCAN <table>` and an index lookup as `SEARCH <table>`.
+"""
+import pytest
+from sqlalchemy import event
+
+from slowking.adapters import repository
+
+pytestmark = pytest.mark.usefixtures("mappers")
+
+
+@pytest.fixture
+def captured_selects(in_memory_sqlite_db):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(in_memory_sqlite_db, "before_cursor_execute", capture)
+    yield statements
+    event.remove(in_memory_sqlite_db, "before_cursor_execute", capture)
+
+
+def full_table_scans(engine, statement, parameters) -> list[str]:
+    with engine.connect() as conn:
+        plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        details = [row[3] for row in plan]
+    return [d for d in details if d.startswith("SCAN") and "INDEX" not in d]
+
+
+@pytest.fixture
+def repo(sqlite_session_factory, benchmark):
+    session = sqlite_session_factory()
+    session.add(benchmark)
+    session.commit()
+    session.close()
+    return repository.SqlAlchemyRepository(sqlite_session_factory())
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        lambda repo: repo.get_by_id(1),
+        lambda repo: repo.get_by_name("latency benchmark for release 1.0.0"),
+        lambda repo: repo.get_by_host_and_project_id("http://localhost:8080", 20),
+        lambda repo: repo.resolve_benchmark("http://localhost:8080", 20),
+        lambda repo: repo.get_document_progress(1),
+        lambda repo: repo.get_by_id(1).project.document,
+    ],
+    ids=[
+        "get_by_id",
+        "get_by_name",
+        "get_by_host_and_project_id",
+        "resolve_benchmark",
+        "get_document_progress",
+        "project_document_relationship",
+    ],
+)
+def test_query_uses_indexes(repo, captured_selects, in_memory_sqlite_db, query):
+    query(repo)
+
+    assert captured_selects
+    for statement, parameters in captured_selects:
+        assert full_table_scans(in_memory_sqlite_db, statement, parameters) == []
@@ -1,33 +1,85 @@
-# from datetime import datetime, timedelta, timezone
-
-# from slowking.adapters.report import LatencyReport
-# from slowking.domain import model
-
-
-# def test_latency_report_create():
-#     # TODO how to test output?
-#     # TODO how to override config (output dir, filename)
-#     doc = model.Document(
-#         name="test doc",
-#         file_path="test path",
-#     )
-#     doc.upload_time_start = datetime.now(timezone.utc) - timedelta(seconds=5)
-#     doc.upload_time_end = datetime.now(timezone.utc)
-#     doc2 = model.Document(
-#         name="test doc2",
-#         file_path="test path",
-#     )
-#     doc2.upload_time_start = datetime.now(timezone.utc) - timedelta(seconds=2)
-#     doc2.upload_time_end = datetime.now(timezone.utc)
-
-#     benchmark = model.Benchmark(
-#         name="test bm",
-#         benchmark_type="latency",
-#         eigen_platform_version="5.11.0-rc.1",
-#         target_infra="k8s",
-#         target_url="localhost",
-#         username="test user",
-#         password="test pw",
-#         project=model.Project(name="test project", document=[doc, doc2]),
-#     )
-#     LatencyReport.create(benchmark)
+import csv
+import gzip
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from slowking.adapters.report import LatencyReport
+from slowking.adapters.repository import DocumentTimingRow
+from slowking.domain import model
+
+
+@pytest.fixture
+def report_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(LatencyReport, "output_dir", f"{tmp_path}/")
+    monkeypatch.setattr(LatencyReport, "output_filename", "report.csv")
+    return tmp_path
+
+
+@pytest.fixture
+def benchmark():
+    return model.Benchmark(
+        name="test bm",
+        benchmark_type="latency",
+        eigen_platform_version="5.11.0-rc.1",
+        target_infra="k8s",
+        target_url="localhost",
+        username="test user",
+        password="test pw",
+        project=model.Project(name="test project", document=[]),
+    )
+
+
+def _rows(count):
+    start = datetime.now(timezone.utc)
+    for i in range(count):
+        yield DocumentTimingRow(f"doc {i}", start, start + timedelta(seconds=i))
+
+
+def test_latency_report_create(report_dir, benchmark):
+    report = LatencyReport.create(benchmark, _rows(3))
+
+    assert report.file_path == f"{report_dir}/report.csv"
+    with open(report.file_path, newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0][-2:] == ["Doc Name", "Upload Time (seconds)"]
+    assert rows[1:] == [
+        ["test bm", "latency", "k8s", "5.11.0-rc.1", f"doc {i}", f"{float(i)}"]
+        for i in range(3)
+    ]
+
+
+def test_latency_report_create_gzip(report_dir, benchmark):
+    report = LatencyReport.create(benchmark, _rows(3), compress=True)
+
+    assert report.file_path == f"{report_dir}/report.csv.gz"
+    with gzip.open(report.file_path, "rt", newline="") as f:
+        rows = list(csv.reader(f))
+    assert len(rows) == 4
+    assert rows[3][-2:] == ["doc 2", "2.0"]
+
+
+def test_latency_report_create_from_project_documents(report_dir, benchmark):
+    doc = model.Document(name="test doc", file_path="test path")
+    doc.upload_time_start = datetime.now(timezone.utc) - timedelta(seconds=5)
+    doc.upload_time_end = doc.upload_time_start + timedelta(seconds=5)
+    benchmark.project.document = [doc]
+
+    report = LatencyReport.create(benchmark)
+
+    with open(report.file_path, newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[1][-2:] == ["test doc", "5.0"]
+
+
+def test_latency_report_create_summary(report_dir, benchmark):
+    report = LatencyReport.create(benchmark, _rows(5), buckets=[2.0])
+
+    assert report.summary.count == 5
+    assert report.summary.percentiles["p50"] == 2.0
+    assert report.summary_path == f"{report_dir}/report_summary.csv"
+    with open(report.summary_path, newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[1] == ["count", "5"]
+    assert ["p50", "2.0"] in rows
+    assert rows[-2:] == [["0.0", "2.0", "2"], ["2.0", "inf", "3"]]
@@ -3,9 +3,14 @@ Note these tests pass when running the entire test suite
 but do not pass when running just this module.
 The error is `UnmappedInstanceError`.
 """
+from datetime import datetime, timedelta
+
 import pytest
+from sqlalchemy import event
 
 from slowking.adapters import repository
+from slowking.domain import model
+from slowking.domain.statistics import LatencySketch
 
 pytestmark = pytest.mark.usefixtures("mappers")
 
@@ -32,3 +37,204 @@ def test_get_by_host_and_project_id(sqlite_session_factory, benchmark):
         repo.get_by_host_and_project_id(host="http://localhost:8080", project_id=20)
         == benchmark
     )
+
+
+def test_set_document_upload_times(sqlite_session_factory, benchmark):
+    session = sqlite_session_factory()
+    repo = repository.SqlAlchemyRepository(session)
+    repo.add(benchmark)
+    session.flush()
+    start = datetime(2024, 1, 1, 12, 0, 0)
+    end = start + timedelta(seconds=3)
+    benchmark_ref = repo.resolve_benchmark(host="http://localhost:8080", project_id=20)
+    assert benchmark_ref is not None
+
+    started = repo.set_document_upload_times(
+        benchmark=benchmark_ref,
+        document_name="doc test",
+        start_time=start,
+        end_time=None,
+    )
+    assert started is not None
+    assert started.upload_time_start == start
+    assert started.upload_time_end is None
+
+    ended = repo.set_document_upload_times(
+        benchmark=benchmark_ref,
+        document_name="doc test",
+        start_time=None,
+        end_time=end,
+    )
+    assert ended is not None
+    assert (ended.upload_time_start, ended.upload_time_end) == (start, end)
+
+
+def test_set_document_upload_times_ignores_replayed_timing(
+    sqlite_session_factory, benchmark
+):
+    session = sqlite_session_factory()
+    repo = repository.SqlAlchemyRepository(session)
+    repo.add(benchmark)
+    session.flush()
+    start = datetime(2024, 1, 1, 12, 0, 0)
+
+    benchmark_ref = repo.resolve_benchmark(host="http://localhost:8080", project_id=20)
+    assert benchmark_ref is not None
+
+    for start_time in (start, start + timedelta(seconds=1)):
+        result = repo.set_document_upload_times(
+            benchmark=benchmark_ref,
+            document_name="doc test",
+            start_time=start_time,
+            end_time=None,
+        )
+    # the replayed start time matches no row and the first one is kept
+    assert result is None
+    session.expire_all()
+    assert benchmark.project.document[0].upload_time_start == start
+
+
+def test_document_progress_and_mark_all_documents_uploaded(
+    sqlite_session_factory, benchmark
+):
+    session = sqlite_session_factory()
+    repo = repository.SqlAlchemyRepository(session)
+    repo.add(benchmark)
+    session.flush()
+    uploaded_at = datetime(2024, 1, 1, 12, 0, 0)
+
+    progress = repo.get_document_progress(benchmark.id)
+    assert progress is not None
+    assert (progress.documents_expected, progress.documents_completed) == (1, 0)
+    assert repo.mark_all_documents_uploaded(benchmark.id, uploaded_at) is False
+
+    repo.increment_documents_completed(benchmark.project.id)
+    progress = repo.get_document_progress(benchmark.id)
+    assert progress is not None
+    assert progress.documents_completed == 1
+    assert repo.mark_all_documents_uploaded(benchmark.id, uploaded_at) is True
+    # only the first caller stamps the project
+    assert repo.mark_all_documents_uploaded(benchmark.id, uploaded_at) is False
+
+
+def test_resolve_benchmark_is_cached(sqlite_session_factory, benchmark):
+    session = sqlite_session_factory()
+    repo = repository.SqlAlchemyRepository(session)
+    repo.add(benchmark)
+    session.flush()
+
+    benchmark_ref = repo.resolve_benchmark(host="http://localhost:8080", project_id=20)
+    assert benchmark_ref == repository.BenchmarkRef(
+        benchmark_id=benchmark.id,
+        benchmark_type="latency",
+        project_id=benchmark.project.id,
+    )
+    assert repo.resolve_benchmark("http://localhost:8080", 20) == benchmark_ref
+    assert (repo.benchmark_refs.hits, repo.benchmark_refs.misses) == (1, 1)
+
+
+def test_prime_benchmark_ref(sqlite_session_factory, benchmark):
+    session = sqlite_session_factory()
+    repo = repository.SqlAlchemyRepository(session)
+    repo.add(benchmark)
+    session.flush()
+
+    repo.prime_benchmark_ref(host="http://localhost:8080", project_id=20)
+    assert repo.resolve_benchmark("http://localhost:8080", 20) is not None
+    assert (repo.benchmark_refs.hits, repo.benchmark_refs.misses) == (1, 0)
+
+
+def test_upload_batches_are_saved_in_batch_order(sqlite_session_factory, benchmark):
+    session = sqlite_session_factory()
+    repo = repository.SqlAlchemyRepository(session)
+    start = datetime(2024, 1, 1, 12, 0, 0)
+    benchmark.upload_batches = [
+        model.UploadBatch(n, 10, 1024, 1, start, start + timedelta(seconds=n))
+        for n in (2, 1)
+    ]
+    repo.add(benchmark)
+    session.commit()
+    session.expire_all()
+
+    saved = repo.get_by_id(benchmark.id).upload_batches
+    assert [b.batch_number for b in saved] == [1, 2]
+    assert saved[1].upload_time == 2.0
+
+
+def test_add_documents_is_one_executemany_insert(
+    sqlite_session_factory, in_memory_sqlite_db, benchmark
+):
+    session = sqlite_session_factory()
+    repo = repository.SqlAlchemyRepository(session)
+    repo.add(benchmark)
+    session.flush()
+
+    inserts = []
+
+    @event.listens_for(in_memory_sqlite_db, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO document"):
+            inserts.append((executemany, len(parameters)))
+
+    repo.add_documents(benchmark, [(f"doc {i}", f"path/{i}") for i in range(500)])
+    session.commit()
+    event.remove(in_memory_sqlite_db, "before_cursor_execute", capture)
+
+    assert inserts == [(True, 500)]
+    session.expire_all()
+    assert len(repo.get_by_id(benchmark.id).project.document) == 501
+
+
+def test_stream_document_upload_times(sqlite_session_factory, benchmark):
+    session = sqlite_session_factory()
+    repo = repository.SqlAlchemyRepository(session)
+    start = datetime(2023, 11, 1, 12, 0, 0)
+    benchmark.project.document[0].upload_time_start = start
+    benchmark.project.document[0].upload_time_end = start + timedelta(seconds=3)
+    benchmark.project.document.append(
+        model.Document(name="doc two", file_path="path/to/two")
+    )
+    repo.add(benchmark)
+    session.commit()
+
+    rows = list(repo.stream_document_upload_times(benchmark.id, chunk_size=1))
+
+    assert [row.name for row in rows] == ["doc test", "doc two"]
+    assert rows[0].upload_time == 3.0
+    assert rows[1].upload_time is None
+
+
+def test_merge_latency_sketch(sqlite_session_factory, benchmark):
+    session = sqlite_session_factory()
+    repo = repository.SqlAlchemyRepository(session)
+    repo.add(benchmark)
+    session.flush()
+
+    worker_a, worker_b = LatencySketch(), LatencySketch()
+    worker_a.add([1.0, 2.0])
+    worker_b.add([2.0, 30.0])
+    repo.merge_latency_sketch(benchmark.project.id, worker_a)
+    repo.merge_latency_sketch(benchmark.project.id, worker_b)
+
+    sketch = repo.get_latency_sketch(benchmark.id)
+    worker_a.merge(worker_b)
+    assert sketch == worker_a
+    assert sketch.count == 4
+    assert sketch.counts[LatencySketch.buckets([2.0])[0]] == 2
+
+
+def test_get_upload_times(sqlite_session_factory, benchmark):
+    session = sqlite_session_factory()
+    repo = repository.SqlAlchemyRepository(session)
+    start = datetime(2023, 11, 1, 12, 0, 0)
+    benchmark.project.document[0].upload_time_start = start
+    benchmark.project.document[0].upload_time_end = start + timedelta(seconds=2.5)
+    benchmark.project.document.append(
+        model.Document(name="doc two", file_path="path/to/two")
+    )
+    repo.add(benchmark)
+    session.commit()
+
+    upload_times = repo.get_upload_times(benchmark.id)
+
+    assert upload_times == [pytest.approx(2.5, abs=1e-3)]
@@ -1,11 +1,22 @@
+import asyncio
 from http import HTTPStatus
 from unittest.mock import patch
 
 import pytest
+from fastapi import HTTPException
 from fastapi.exceptions import RequestValidationError
 from fastapi.testclient import TestClient
 
-from slowking.entrypoints.http import router
+from slowking.domain import commands, events
+from slowking.domain.exceptions import BenchmarkNotFoundError
+from slowking.entrypoints.http import (
+    broadcaster,
+    get_bus,
+    latency_events,
+    publish,
+    publish_to_bus,
+    router,
+)
 
 client = TestClient(router)
 
@@ -21,6 +32,8 @@ def test_channels_endpoint():
             "project_created",
             "create_benchmark",
             "update_document",
+            "update_documents_batch",
+            "compare_benchmarks",
         ]
     }
 
@@ -53,6 +66,31 @@ def test_start_benchmark_endpoint_unprocessable_entity():
         assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
 
 
+@patch("fastapi.BackgroundTasks.add_task")
+def test_start_benchmark_endpoint_passes_upload_settings(mock_add_task):
+    payload = {
+        "name": "test-benchmark",
+        "benchmark_type": "latency",
+        "target_infra": "k8s",
+        "target_url": "localhost",
+        "target_eigen_platform_version": "5.11.0-rc.1",
+        "username": "test user",
+        "password": "test pw",
+        "upload_batch_size": 50,
+        "upload_concurrency": 4,
+    }
+    response = client.post("/api/v1/benchmarks/start", json=payload)
+    assert response.status_code == HTTPStatus.ACCEPTED
+
+    cmd = mock_add_task.call_args.args[1]
+    assert (cmd.upload_batch_size, cmd.upload_concurrency) == (50, 4)
+
+    with pytest.raises(RequestValidationError):
+        client.post(
+            "/api/v1/benchmarks/start", json={**payload, "upload_concurrency": 0}
+        )
+
+
 @patch("fastapi.BackgroundTasks.add_task")
 def test_update_document_endpoint_accepted_with_start_time(mock_add_task):
     payload = {
@@ -90,3 +128,163 @@ def test_update_document_endpoint_unprocessable_entity():
     with pytest.raises(RequestValidationError):
         response = client.post("/api/v1/benchmarks/documents", json=payload)
         assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@patch("fastapi.BackgroundTasks.add_task")
+def test_update_documents_batch_endpoint_accepted(mock_add_task):
+    payload = {
+        "documents": [
+            {
+                "document_name": "test doc",
+                "eigen_document_id": "11",
+                "eigen_project_id": "22",
+                "benchmark_host_name": "test host",
+                "start_time": 123.456,
+                "end_time": None,
+            },
+            {
+                "document_name": "test doc",
+                "eigen_document_id": "11",
+                "eigen_project_id": "22",
+                "benchmark_host_name": "test host",
+                "start_time": None,
+                "end_time": 124.456,
+            },
+        ]
+    }
+    response = client.post("/api/v1/benchmarks/documents/batch", json=payload)
+    assert response.status_code == HTTPStatus.ACCEPTED
+    cmd = mock_add_task.call_args.args[1]
+    assert len(cmd.documents) == 2
+
+
+def test_update_documents_batch_endpoint_unprocessable_entity():
+    payload = {"documents": [{"document_name": "test doc"}]}
+    with pytest.raises(RequestValidationError):
+        response = client.post("/api/v1/benchmarks/documents/batch", json=payload)
+        assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@patch("slowking.entrypoints.http.get_bus")
+@patch("slowking.entrypoints.http.views.benchmark_progress")
+def test_benchmark_progress_endpoint(mock_progress, mock_get_bus):
+    mock_progress.return_value = {"benchmark_id": 1, "documents_completed": 2}
+    response = client.get("/api/v1/benchmarks/1/progress")
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {"benchmark_id": 1, "documents_completed": 2}
+    assert mock_progress.call_args.args[0] == 1
+
+
+@patch("slowking.entrypoints.http.get_bus")
+@patch("slowking.entrypoints.http.views.benchmark_progress")
+def test_benchmark_progress_endpoint_not_found(mock_progress, mock_get_bus):
+    mock_progress.return_value = None
+    with pytest.raises(HTTPException) as e:
+        client.get("/api/v1/benchmarks/1/progress")
+    assert e.value.status_code == HTTPStatus.NOT_FOUND
+
+
+@patch("slowking.entrypoints.http.get_bus")
+@patch("slowking.entrypoints.http.views.compare_benchmarks")
+def test_compare_endpoint(mock_compare, mock_get_bus):
+    mock_compare.return_value = [{"regression": False}]
+    response = client.get("/api/v1/benchmarks/compare?benchmark_ids=1&benchmark_ids=2")
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {"comparisons": [{"regression": False}]}
+    assert mock_compare.call_args.args[0] == [1, 2]
+
+
+@patch("slowking.entrypoints.http.get_bus")
+@patch("slowking.entrypoints.http.views.compare_benchmarks")
+def test_compare_endpoint_not_found(mock_compare, mock_get_bus):
+    mock_compare.side_effect = BenchmarkNotFoundError("Benchmark 2 not found")
+    with pytest.raises(HTTPException) as e:
+        client.get("/api/v1/benchmarks/compare?benchmark_ids=1&benchmark_ids=2")
+    assert e.value.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_compare_endpoint_needs_two_benchmarks():
+    with pytest.raises(RequestValidationError):
+        client.get("/api/v1/benchmarks/compare?benchmark_ids=1")
+
+
+@patch("fastapi.BackgroundTasks.add_task")
+def test_compare_report_endpoint_accepted(mock_add_task):
+    response = client.post(
+        "/api/v1/benchmarks/compare/report", json={"benchmark_ids": [1, 2, 3]}
+    )
+    assert response.status_code == HTTPStatus.ACCEPTED
+    cmd = mock_add_task.call_args.args[1]
+    assert cmd == commands.CompareBenchmarks(
+        channel=commands.CommandChannelEnum.COMPARE_BENCHMARKS,
+        benchmark_ids=[1, 2, 3],
+    )
+
+
+@patch("slowking.entrypoints.http.bootstrap.bootstrap")
+def test_publish_to_bus_bootstraps_once(mock_bootstrap):
+    get_bus.cache_clear()
+    cmd = commands.CreateBenchmark(
+        channel=commands.CommandChannelEnum.CREATE_BENCHMARK,
+        name="test-benchmark",
+        benchmark_type="latency",
+        target_infra="k8s",
+        target_url="localhost",
+        target_eigen_platform_version="5.11.0-rc.1",
+        username="test user",
+        password="test pw",
+    )
+    publish_to_bus(cmd)
+    publish_to_bus(cmd)
+
+    mock_bootstrap.assert_called_once()
+    assert mock_bootstrap.return_value.handle.call_count == 2
+    get_bus.cache_clear()
+
+
+class DisconnectingRequest:
+    """
+    Stands in for the request of a stream, disconnecting after `polls` polls
+    """
+
+    def __init__(self, polls: int):
+        self.polls = polls
+
+    async def is_disconnected(self) -> bool:
+        self.polls -= 1
+        return self.polls < 0
+
+
+@patch("slowking.entrypoints.http.get_bus")
+@patch("slowking.entrypoints.http.views.benchmark_progress")
+def test_latency_events(mock_progress, mock_get_bus):
+    mock_progress.return_value = {"benchmark_id": 1, "documents_completed": 1}
+
+    async def run():
+        request = DisconnectingRequest(polls=1)
+        stream = latency_events(1, request, snapshot_interval=60)  # type: ignore
+        received = [await stream.__anext__()]
+        publish_event = events.DocumentUpdated(
+            benchmark_id=1, upload_times={"doc test": 2.5}
+        )
+        broadcaster.publish(publish_event)
+        received += [message async for message in stream]
+        return received
+
+    with patch("slowking.entrypoints.http.redis_event_publisher.publisher"):
+        received = asyncio.run(run())
+
+    assert received == [
+        'event: snapshot\ndata: {"benchmark_id": 1, "documents_completed": 1}\n\n',
+        'event: document\ndata: {"document_name": "doc test", "upload_time": 2.5}\n\n',
+    ]
+    assert broadcaster._subscriptions == {}
+
+
+@patch("slowking.entrypoints.http.redis_event_publisher.publisher")
+def test_publish_tees_events_to_the_broadcaster(mock_publisher):
+    event = events.DocumentUpdated(benchmark_id=1)
+    with patch.object(broadcaster, "publish") as mock_broadcast:
+        publish(event)
+    mock_broadcast.assert_called_once_with(event)
+    mock_publisher.publish.assert_called_once_with(event)
@@ -1,24 +1,48 @@
+import asyncio
+import csv
 import uuid
 from collections import defaultdict
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
 
 from slowking import bootstrap
 from slowking.adapters import notifications, repository
+from slowking.adapters.artifacts import ArtifactCatalog
+from slowking.adapters.async_http import AsyncEigenClient
 from slowking.adapters.http import EigenClient, ProjectStruct
+from slowking.adapters.report import ComparisonReport
 from slowking.domain import commands, events, model
-from slowking.service_layer import unit_of_work
+from slowking.domain.statistics import LatencySketch
+from slowking.config import settings
+from slowking.service_layer import tracing, unit_of_work
 
 
 class FakeRepository(repository.AbstractRepository):
     def __init__(self, benchmarks):
         super().__init__()
         self._benchmarks = set(benchmarks)
+        self._sketches: dict[int, LatencySketch] = defaultdict(LatencySketch)
+        # project id -> benchmark id, the project table's benchmark_id column
+        self._project_benchmarks: dict[int, int] = {}
 
     def _add(self, benchmark):
-        # add a fake id to the benchmark
+        # add fake ids to the benchmark and its project, offset so a project id
+        # used as a benchmark id is not found
         benchmark.id = len(self._benchmarks) + 1
+        benchmark.project.id = benchmark.id + 1000
+        self._project_benchmarks[benchmark.project.id] = benchmark.id
         self._benchmarks.add(benchmark)
 
+    def _get_project(self, project_id: int) -> model.Project:
+        return self._get_by_id(self._project_benchmarks[project_id]).project
+
+    def _add_documents(self, benchmark, documents):
+        benchmark.project.document.extend(
+            model.Document(name=name, file_path=file_path)
+            for name, file_path in documents
+        )
+
     def _get_by_id(self, id):
         return next((b for b in self._benchmarks if b.id == id), None)
 
@@ -26,8 +50,106 @@ class FakeRepository(repository.AbstractRepository):
         return next((b for b in self._benchmarks if b.name == name), None)
 
     def _get_by_host_and_project_id(self, host: str, project_id: int):
-        # implement if needed
-        pass
+        return next(
+            (
+                b
+                for b in self._benchmarks
+                if b.target_url == host and b.project.eigen_project_id == project_id
+            ),
+            None,
+        )
+
+    def _resolve_benchmark(self, host: str, project_id: int):
+        benchmark = self._get_by_host_and_project_id(host, project_id)
+        if benchmark is None:
+            return None
+        return repository.BenchmarkRef(
+            benchmark_id=benchmark.id,
+            benchmark_type=benchmark.benchmark_type,
+            project_id=benchmark.project.id,
+        )
+
+    def _set_document_upload_times(
+        self, benchmark, document_name, start_time, end_time
+    ):
+        project = self._get_by_id(benchmark.benchmark_id).project
+        document = next((d for d in project.document if d.name == document_name), None)
+        if document is None:
+            return None
+        start = getattr(document, "upload_time_start", None)
+        end = getattr(document, "upload_time_end", None)
+        if not (start is None and start_time) and not (end is None and end_time):
+            return None
+        document.upload_time_start = start or start_time
+        document.upload_time_end = end or end_time
+        return repository.DocumentUploadTimes(
+            document_id=1,
+            upload_time_start=document.upload_time_start,
+            upload_time_end=document.upload_time_end,
+        )
+
+    def _stream_document_upload_times(self, benchmark_id: int, chunk_size: int):
+        for doc in self._get_by_id(benchmark_id).project.document:
+            yield repository.DocumentTimingRow(
+                doc.name,
+                getattr(doc, "upload_time_start", None),
+                getattr(doc, "upload_time_end", None),
+            )
+
+    def _get_upload_times(self, benchmark_id: int):
+        return [
+            row.upload_time
+            for row in self._stream_document_upload_times(benchmark_id, 1)
+            if row.upload_time is not None
+        ]
+
+    def _increment_documents_started(self, project_id: int, count: int, first_start):
+        project = self._get_project(project_id)
+        project.documents_started += count
+        project.first_upload_time_start = min(
+            project.first_upload_time_start or first_start, first_start
+        )
+
+    def _increment_documents_completed(self, project_id: int, count: int, last_end):
+        project = self._get_project(project_id)
+        project.documents_completed += count
+        if last_end is not None:
+            project.last_upload_time_end = max(
+                project.last_upload_time_end or last_end, last_end
+            )
+
+    def _get_document_progress(self, benchmark_id: int):
+        benchmark = self._get_by_id(benchmark_id)
+        if benchmark is None:
+            return None
+        return repository.DocumentProgress(
+            benchmark_id=benchmark.id,
+            benchmark_type=benchmark.benchmark_type,
+            documents_expected=benchmark.project.documents_expected,
+            documents_completed=benchmark.project.documents_completed,
+            all_docs_uploaded=benchmark.project.all_docs_uploaded,
+            documents_started=benchmark.project.documents_started,
+            first_upload_time_start=benchmark.project.first_upload_time_start,
+            last_upload_time_end=benchmark.project.last_upload_time_end,
+        )
+
+    def _merge_latency_sketch(self, project_id: int, sketch: LatencySketch):
+        # the sketch rows reference the project, like the foreign key
+        self._get_project(project_id)
+        self._sketches[project_id].merge(sketch)
+
+    def _get_latency_sketch(self, benchmark_id: int):
+        project_id = self._get_by_id(benchmark_id).project.id
+        return LatencySketch(self._sketches[project_id].counts)
+
+    def _mark_all_documents_uploaded(self, benchmark_id: int, uploaded_at):
+        project = self._get_by_id(benchmark_id).project
+        if project.all_docs_uploaded is not None:
+            return False
+        if project.documents_completed < project.documents_expected:
+            return False
+        project.all_docs_uploaded = uploaded_at
+        return True
 
 
 class FakeUnitOfWork(unit_of_work.AbstractUnitOfWork):
@@ -55,7 +177,7 @@ class FakeNotifications(notifications.AbstractNotifications):
         self.sent = defaultdict(list)
 
     def send(self, benchmark: model.Benchmark, message: str):
-        destination = ["test@example.com"]
+        destination = "test@example.com"
         self.sent[destination].append(message)
 
 
@@ -75,13 +197,33 @@ class FakeClient(EigenClient):
         )
         return response
 
+    def upload_files(self, project_id, files):
+        if any(f.name == "fail.txt" for f in files):
+            raise ConnectionError("reset by peer")
+        return [{"document_type_id": project_id}]
+
 
-def bootstrap_test_app():
+class FakeAsyncClient(AsyncEigenClient):
+    def __init__(self, *args, **kwargs):
+        pass
+
+    @classmethod
+    async def create(cls, *args, **kwargs):
+        return cls()
+
+    async def create_project(self, *args, **kwargs):
+        return FakeClient().create_project()
+
+
+def bootstrap_test_app(
+    publish=lambda *args: None, notifications=None, publish_many=None
+):
     return bootstrap.bootstrap(
         start_orm=False,
         uow=FakeUnitOfWork(),
-        notifications=FakeNotifications(),
-        publish=lambda *args: None,
+        notifications=notifications or FakeNotifications(),
+        publish=publish,
+        publish_many=publish_many,
         client=FakeClient,
     )
 
@@ -104,6 +246,40 @@ def test_create_benchmark():
     assert bus.uow.committed  # type: ignore
 
 
+def test_create_benchmark_documents_come_from_the_artifact_catalog(tmp_path):
+    corpus = tmp_path / "artifacts"
+    corpus.mkdir()
+    for name in ("b.txt", "a.txt", "ignored.pdf"):
+        (corpus / name).write_text(name)
+    bus = bootstrap.bootstrap(
+        start_orm=False,
+        uow=FakeUnitOfWork(),
+        notifications=FakeNotifications(),
+        publish=lambda *args: None,
+        client=FakeClient,
+        catalog=ArtifactCatalog(str(corpus), "*.txt", str(tmp_path / "manifests")),
+    )
+    bus.handle(
+        commands.CreateBenchmark(
+            channel=commands.CommandChannelEnum.CREATE_BENCHMARK,
+            name="test",
+            benchmark_type="latency",
+            target_infra="k8s",
+            target_url="http://localhost:8080",
+            target_eigen_platform_version="0.0.1",
+            username="test",
+            password="secret_pw",
+        )
+    )
+
+    project = bus.uow.benchmarks.get_by_id(1).project
+    assert [(d.name, d.file_path) for d in project.document] == [
+        ("a.txt", str(corpus / "a.txt")),
+        ("b.txt", str(corpus / "b.txt")),
+    ]
+    assert project.documents_expected == 2
+
+
 def test_create_project():
     bus = bootstrap_test_app()
     bus.handle(
@@ -125,3 +301,269 @@ def test_create_project():
     # this is the project id returned from the fake client
     assert benchmark.project.eigen_project_id == 123
     assert bus.uow.committed  # type: ignore
+
+
+def test_create_project_async():
+    published: list[events.Event] = []
+    bus = bootstrap.bootstrap_async(
+        start_orm=False,
+        uow=FakeUnitOfWork(),
+        notifications=FakeNotifications(),
+        publish=published.append,
+        client=FakeClient,
+        async_client=FakeAsyncClient,
+    )
+
+    async def run():
+        await bus.handle(
+            commands.CreateBenchmark(
+                channel=commands.CommandChannelEnum.CREATE_BENCHMARK,
+                name="test",
+                benchmark_type="latency",
+                target_infra="k8s",
+                target_url="http://localhost:8080",
+                target_eigen_platform_version="0.0.1",
+                username="test",
+                password="secret_pw",
+            )
+        )
+        await bus.handle(events.BenchmarkCreated(benchmark_id=1))
+
+    asyncio.run(run())
+
+    (benchmark,) = bus.uow.benchmarks._benchmarks  # type: ignore
+    # this is the project id returned from the fake client
+    assert benchmark.project.eigen_project_id == 123
+    assert isinstance(published[-1], events.ProjectCreated)
+
+
+def test_upload_documents_records_batch_timings(monkeypatch, tmp_path, benchmark):
+    monkeypatch.setattr(settings, "UPLOAD_BATCH_RETRY_WAIT", 0)
+    files = [tmp_path / name for name in ("a.txt", "b.txt", "fail.txt")]
+    for f in files:
+        f.write_text("content")
+
+    bus = bootstrap_test_app()
+    benchmark.project.document = [
+        model.Document(name=f.name, file_path=str(f)) for f in files
+    ]
+    benchmark.upload_batch_size = 2
+    benchmark.upload_concurrency = 2
+    bus.uow.benchmarks.add(benchmark)
+
+    bus.handle(events.ProjectCreated(benchmark_id=benchmark.id))
+
+    batches = benchmark.upload_batches
+    assert [(b.batch_number, b.document_count) for b in batches] == [(1, 2), (2, 1)]
+    assert batches[0].error is None
+    assert batches[1].attempts == settings.UPLOAD_BATCH_MAX_ATTEMPTS
+    assert "reset by peer" in batches[1].error
+
+
+def test_update_documents_batch(benchmark):
+    published: list[events.Event] = []
+    bus = bootstrap_test_app(publish=published.append)
+    bus.uow.benchmarks.add(benchmark)
+
+    timing = dict(
+        document_name="doc test",
+        eigen_document_id="1",
+        eigen_project_id="20",
+        benchmark_host_name="http://localhost:8080",
+    )
+    bus.handle(
+        commands.UpdateDocumentsBatch(
+            channel=commands.CommandChannelEnum.UPDATE_DOCUMENTS_BATCH,
+            documents=[
+                commands.DocumentTiming(**timing, start_time=100.0, end_time=None),
+                commands.DocumentTiming(**timing, start_time=None, end_time=102.5),
+                commands.DocumentTiming(
+                    **{**timing, "document_name": "unknown doc"},
+                    start_time=100.0,
+                    end_time=None,
+                ),
+            ],
+        )
+    )
+    assert benchmark.project.document[0].upload_time == 2.5
+    assert bus.uow.benchmarks.get_latency_sketch(benchmark.id).count == 1
+    assert published == [
+        events.DocumentUpdated(
+            benchmark_id=benchmark.id, upload_times={"doc test": 2.5}
+        )
+    ]
+    assert bus.uow.committed  # type: ignore
+
+
+def test_update_documents_batch_publishes_events_in_one_round_trip(benchmark):
+    published: list[events.Event] = []
+    round_trips: list[list[events.Event]] = []
+    bus = bootstrap_test_app(publish=published.append, publish_many=round_trips.append)
+    other = model.Benchmark(
+        name="other benchmark",
+        benchmark_type="latency",
+        eigen_platform_version="v1.0.0",
+        target_infra="kubernetes",
+        target_url="http://otherhost:8080",
+        username="test_user",
+        password="test_password",
+        project=model.Project(
+            name="other project",
+            document=[model.Document(name="doc test", file_path="path/to/file")],
+            eigen_project_id=21,
+        ),
+    )
+    bus.uow.benchmarks.add(benchmark)
+    bus.uow.benchmarks.add(other)
+
+    bus.handle(
+        commands.UpdateDocumentsBatch(
+            channel=commands.CommandChannelEnum.UPDATE_DOCUMENTS_BATCH,
+            documents=[
+                commands.DocumentTiming(
+                    document_name="doc test",
+                    eigen_document_id="1",
+                    eigen_project_id=str(project_id),
+                    benchmark_host_name=host,
+                    start_time=100.0,
+                    end_time=101.0,
+                )
+                for host, project_id in [
+                    ("http://localhost:8080", 20),
+                    ("http://otherhost:8080", 21),
+                ]
+            ],
+        )
+    )
+
+    assert published == []
+    assert round_trips == [
+        [
+            events.DocumentUpdated(
+                benchmark_id=benchmark.id, upload_times={"doc test": 1.0}
+            ),
+            events.DocumentUpdated(
+                benchmark_id=other.id, upload_times={"doc test": 1.0}
+            ),
+        ]
+    ]
+
+
+def test_all_documents_uploaded_is_published_once(benchmark):
+    published: list[events.Event] = []
+    bus = bootstrap_test_app(publish=published.append)
+    bus.uow.benchmarks.add(benchmark)
+
+    bus.handle(
+        commands.UpdateDocument(
+            channel=commands.CommandChannelEnum.UPDATE_DOCUMENT,
+            document_name="doc test",
+            eigen_document_id="1",
+            eigen_project_id="20",
+            benchmark_host_name="http://localhost:8080",
+            start_time=100.0,
+            end_time=None,
+        )
+    )
+    # the document is not complete until both timings are recorded
+    assert published == []
+
+    bus.handle(
+        commands.UpdateDocument(
+            channel=commands.CommandChannelEnum.UPDATE_DOCUMENT,
+            document_name="doc test",
+            eigen_document_id="1",
+            eigen_project_id="20",
+            benchmark_host_name="http://localhost:8080",
+            start_time=None,
+            end_time=101.0,
+        )
+    )
+    assert benchmark.project.documents_completed == 1
+    assert published == [
+        events.DocumentUpdated(
+            benchmark_id=benchmark.id, upload_times={"doc test": 1.0}
+        )
+    ]
+
+    bus.handle(events.DocumentUpdated(benchmark_id=benchmark.id))
+    bus.handle(events.DocumentUpdated(benchmark_id=benchmark.id))
+    assert published[1:] == [events.AllDocumentsUploaded(benchmark_id=benchmark.id)]
+
+
+def test_start_only_update_document_is_traced_with_its_benchmark(benchmark):
+    spans = []
+
+    class ListExporter:
+        def export(self, exported):
+            spans.extend(exported)
+
+    bus = bootstrap_test_app()
+    bus.hooks.append(tracing.SpanRecorder(ListExporter()))  # type: ignore[arg-type]
+    bus.uow.benchmarks.add(benchmark)
+
+    # publishes nothing, the benchmark is resolved from the host and project
+    bus.handle(
+        commands.UpdateDocument(
+            channel=commands.CommandChannelEnum.UPDATE_DOCUMENT,
+            document_name="doc test",
+            eigen_document_id="1",
+            eigen_project_id="20",
+            benchmark_host_name="http://localhost:8080",
+            start_time=100.0,
+            end_time=None,
+        )
+    )
+
+    [span] = spans
+    assert span.name == "UpdateDocument update_document"
+    assert span.trace_id == tracing.trace_id(benchmark.id)
+    assert span.parent_span_id == tracing.root_span_id(benchmark.id)
+
+
+def _timed_benchmark(name, upload_times):
+    start = datetime(2023, 11, 1, tzinfo=timezone.utc)
+    documents = []
+    for i, upload_time in enumerate(upload_times):
+        document = model.Document(name=f"doc {i}", file_path=f"doc_{i}.txt")
+        document.upload_time_start = start
+        document.upload_time_end = start + timedelta(seconds=upload_time)
+        documents.append(document)
+    return model.Benchmark(
+        name=name,
+        benchmark_type="latency",
+        eigen_platform_version=name,
+        target_infra="k8s",
+        target_url=f"http://{name}",
+        username="test user",
+        password="test pw",
+        project=model.Project(name=name, document=documents),
+    )
+
+
+def test_compare_benchmarks(tmp_path, monkeypatch):
+    monkeypatch.setattr(ComparisonReport, "output_dir", f"{tmp_path}/")
+    notifications = FakeNotifications()
+    bus = bootstrap_test_app(notifications=notifications)
+    rng = np.random.default_rng(1)
+    baseline = _timed_benchmark("5.10.0", rng.lognormal(size=500))
+    candidate = _timed_benchmark("5.11.0", rng.lognormal(mean=0.5, size=500))
+    bus.uow.benchmarks.add(baseline)
+    bus.uow.benchmarks.add(candidate)
+
+    bus.handle(
+        commands.CompareBenchmarks(
+            channel=commands.CommandChannelEnum.COMPARE_BENCHMARKS,
+            benchmark_ids=[baseline.id, candidate.id],
+        )
+    )
+
+    [message] = notifications.sent["test@example.com"]
+    report, regressions = message.split("\n")
+    assert report.startswith(f"{tmp_path}/comparison_")
+    assert regressions == "Regressions: 5.11.0"
+    with open(report, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["Percentile"] for row in rows] == ["p50", "p90", "p95", "p99", "p99.9"]
+    assert rows[0]["Candidate Name"] == "5.11.0"
+    assert rows[0]["Regression"] == "True"
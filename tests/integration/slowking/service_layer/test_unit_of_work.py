@@ -1,3 +1,5 @@
+import threading
+
 import pytest
 from sqlalchemy import text
 
@@ -36,3 +38,21 @@ def test_rolls_back_on_error(sqlite_session_factory, benchmark):
     new_session = sqlite_session_factory()
     rows = list(new_session.execute(text('SELECT * FROM "benchmark"')))
     assert rows == []
+
+
+def test_uow_session_is_scoped_to_thread(sqlite_session_factory):
+    uow = unit_of_work.SqlAlchemyUnitOfWork(sqlite_session_factory)
+    sessions = []
+
+    def enter_uow():
+        with uow:
+            sessions.append(uow.session)
+
+    with uow:
+        thread = threading.Thread(target=enter_uow)
+        thread.start()
+        thread.join()
+        sessions.append(uow.session)
+
+    assert len(sessions) == 2
+    assert sessions[0] is not sessions[1]
@@ -0,0 +1,56 @@
+import pytest
+
+from slowking import views
+from slowking.domain import commands, model
+from slowking.service_layer import handlers, unit_of_work
+
+pytestmark = pytest.mark.usefixtures("mappers")
+
+
+def _timing(document_name, start_time=None, end_time=None):
+    return commands.DocumentTiming(
+        document_name=document_name,
+        eigen_document_id="1",
+        eigen_project_id="20",
+        benchmark_host_name="http://localhost:8080",
+        start_time=start_time,
+        end_time=end_time,
+    )
+
+
+def test_benchmark_progress(sqlite_session_factory, benchmark):
+    uow = unit_of_work.SqlAlchemyUnitOfWork(sqlite_session_factory)
+    benchmark.project.document.append(model.Document(name="doc two", file_path="two"))
+    benchmark.project.documents_expected = 2
+    with uow:
+        uow.benchmarks.add(benchmark)
+    benchmark_id = 1
+
+    handlers.update_documents_batch(
+        commands.UpdateDocumentsBatch(
+            channel=commands.CommandChannelEnum.UPDATE_DOCUMENTS_BATCH,
+            documents=[
+                _timing("doc test", start_time=1_000.0),
+                _timing("doc two", start_time=1_001.0),
+                _timing("doc test", end_time=1_004.0),
+            ],
+        ),
+        uow,
+        publish_many=lambda events: None,
+    )
+
+    progress = views.benchmark_progress(benchmark_id, uow)
+
+    assert progress is not None
+    assert progress["documents_expected"] == 2
+    assert progress["documents_started"] == 2
+    assert progress["documents_completed"] == 1
+    assert progress["all_docs_uploaded"] is None
+    assert progress["elapsed_seconds"] == 4.0
+    assert progress["documents_per_second"] == 0.25
+    assert progress["percentiles"]["p50"] == pytest.approx(4.0, rel=0.01)
+
+
+def test_benchmark_progress_not_found(sqlite_session_factory):
+    uow = unit_of_work.SqlAlchemyUnitOfWork(sqlite_session_factory)
+    assert views.benchmark_progress(1, uow) is None
@@ -0,0 +1,86 @@
+import json
+import os
+
+import pytest
+
+from slowking.adapters import artifacts
+from slowking.adapters.artifacts import ArtifactCatalog
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    path = tmp_path / "artifacts"
+    path.mkdir()
+    (path / "a.txt").write_text("first")
+    (path / "b.txt").write_text("second")
+    return path
+
+
+@pytest.fixture
+def hashed(monkeypatch) -> list[str]:
+    calls: list[str] = []
+    sha256 = artifacts._sha256
+
+    def counting_sha256(path):
+        calls.append(path.name)
+        return sha256(path)
+
+    monkeypatch.setattr(artifacts, "_sha256", counting_sha256)
+    return calls
+
+
+def catalog_for(corpus) -> ArtifactCatalog:
+    return ArtifactCatalog(str(corpus), "*.txt", str(corpus.parent / "manifests"))
+
+
+def test_manifest_lists_name_size_sha256_and_mtime(corpus):
+    manifest = catalog_for(corpus).manifest()
+
+    assert [(e.name, e.size) for e in manifest.entries] == [("a.txt", 5), ("b.txt", 6)]
+    assert manifest.entries[0].sha256 == (
+        "a7937b64b8caa58f03721bb6bacf5c78cb235febe0e70b1b84cd99541461a08e"
+    )
+    assert manifest.entries[0].mtime_ns == (corpus / "a.txt").stat().st_mtime_ns
+    assert manifest.paths() == [corpus / "a.txt", corpus / "b.txt"]
+
+
+def test_manifest_is_persisted_and_read_without_rehashing(corpus, hashed):
+    catalog_for(corpus).manifest()
+    assert hashed == ["a.txt", "b.txt"]
+
+    saved = json.loads((corpus.parent / "manifests" / "default.json").read_text())
+    assert [e["name"] for e in saved["entries"]] == ["a.txt", "b.txt"]
+
+    # a new process loads the persisted manifest
+    assert len(catalog_for(corpus).manifest().entries) == 2
+    assert hashed == ["a.txt", "b.txt"]
+
+
+def test_manifest_is_rebuilt_incrementally_when_the_corpus_changes(corpus, hashed):
+    catalog = catalog_for(corpus)
+    catalog.manifest()
+    hashed.clear()
+
+    (corpus / "a.txt").unlink()
+    (corpus / "c.txt").write_text("third")
+    # the directory mtime can have a coarse resolution, make sure it moves on
+    stat = corpus.stat()
+    os.utime(corpus, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert [e.name for e in catalog.manifest().entries] == ["b.txt", "c.txt"]
+    assert hashed == ["c.txt"]
+
+
+def test_refresh_rehashes_files_changed_in_place(corpus, hashed):
+    catalog = catalog_for(corpus)
+    catalog.manifest()
+    hashed.clear()
+
+    (corpus / "b.txt").write_text("changed in place")
+
+    assert catalog.refresh().entries[1].size == 16
+    assert hashed == ["b.txt"]
+
+
+def test_missing_corpus_has_an_empty_manifest(tmp_path):
+    assert catalog_for(tmp_path / "missing").manifest().entries == []
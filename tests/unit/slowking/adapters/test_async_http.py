@@ -0,0 +1,152 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from tenacity import RetryError, wait_none
+
+from slowking.adapters.async_http import AsyncEigenClient
+
+PROJECT = {
+    "guid": "abc",
+    "document_type_id": 42,
+    "name": "test",
+    "description": "latency",
+    "created_at": "2024-01-01T00:00:00Z",
+    "language": "en",
+    "use_numerical_confidence_predictions": True,
+}
+
+
+class FakeEigen:
+    def __init__(self, expire_tokens: int = 0):
+        self.expire_tokens = expire_tokens
+        self.logins = 0
+        self.requests: list[tuple[str, str]] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append((request.method, request.url.path))
+        if request.url.path == "/auth/v1/token/":
+            self.logins += 1
+            return httpx.Response(
+                200, headers={"set-cookie": f"token={self.logins}; Path=/"}
+            )
+        if request.headers.get("cookie") is None:
+            return httpx.Response(403)
+        if self.expire_tokens:
+            self.expire_tokens -= 1
+            return httpx.Response(401, json={"error": {"detail": "Token has expired."}})
+        if request.url.path == "/api/v2/api-csrf-token/":
+            return httpx.Response(200, json={"csrf_token": "csrf"})
+        if request.url.path == "/api/v1/document_uploader/":
+            return httpx.Response(503)
+        if request.url.path == "/api/project_management/v2/projects/":
+            assert json.loads(request.content)["name"] == "test"
+            return httpx.Response(201, json=PROJECT)
+        return httpx.Response(404)
+
+
+@pytest.fixture(autouse=True)
+def no_retry_wait(monkeypatch):
+    monkeypatch.setattr(AsyncEigenClient.request.retry, "wait", wait_none())  # type: ignore
+
+
+def test_create_project_authenticates_first():
+    eigen = FakeEigen()
+
+    async def run():
+        client = await AsyncEigenClient.create(
+            "localhost:8080", "user", "pw", transport=httpx.MockTransport(eigen)
+        )
+        return await client.create_project(name="test", description="latency")
+
+    project = asyncio.run(run())
+
+    assert project.document_type_id == 42
+    assert eigen.requests[0] == ("POST", "/auth/v1/token/")
+
+
+def test_expired_token_is_refreshed_and_request_retried():
+    eigen = FakeEigen(expire_tokens=1)
+
+    async def run():
+        client = await AsyncEigenClient.create(
+            "localhost:8080", "user", "pw", transport=httpx.MockTransport(eigen)
+        )
+        return await client.csrf_token()
+
+    assert asyncio.run(run()) == "csrf"
+    assert eigen.logins == 2
+
+
+def test_error_status_is_raised():
+    eigen = FakeEigen()
+
+    async def run():
+        client = await AsyncEigenClient.create(
+            "localhost:8080", "user", "pw", transport=httpx.MockTransport(eigen)
+        )
+        await client.request("GET", "localhost:8080/missing/")
+
+    with pytest.raises(RetryError) as exc_info:
+        asyncio.run(run())
+    error = exc_info.value.last_attempt.exception()
+    assert isinstance(error, httpx.HTTPStatusError)
+    assert "404 Client Error" in str(error)
+
+
+def test_target_scheme_is_kept():
+    eigen = FakeEigen()
+    urls: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        urls.append(str(request.url))
+        return eigen(request)
+
+    async def run():
+        client = await AsyncEigenClient.create(
+            "https://localhost:8443",
+            "user",
+            "pw",
+            transport=httpx.MockTransport(handler),
+        )
+        return await client.csrf_token()
+
+    assert asyncio.run(run()) == "csrf"
+    assert urls[0] == "https://localhost:8443/auth/v1/token/"
+    assert urls[1] == "https://localhost:8443/api/v2/api-csrf-token/"
+
+
+def test_upload_makes_a_single_attempt(tmp_path):
+    # the upload scheduler retries failed batches, so retries do not multiply
+    eigen = FakeEigen()
+    document = tmp_path / "doc.txt"
+    document.write_bytes(b"x")
+
+    async def run():
+        client = await AsyncEigenClient.create(
+            "localhost:8080", "user", "pw", transport=httpx.MockTransport(eigen)
+        )
+        await client.upload_files(project_id=42, files=[document])
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(run())
+    assert eigen.requests.count(("POST", "/api/v1/document_uploader/")) == 1
+
+
+def test_transport_is_pooled_per_target():
+    async def run():
+        try:
+            a = AsyncEigenClient.transport_for("target-a/", verify=False)
+            assert AsyncEigenClient.transport_for("target-a/", verify=False) is a
+            assert AsyncEigenClient.transport_for("target-b/", verify=False) is not a
+            assert AsyncEigenClient.transport_for("target-a/", verify=True) is not a
+            assert (
+                AsyncEigenClient.transport_for("https://target-a/", verify=False)
+                is not a
+            )
+        finally:
+            await AsyncEigenClient.close_transports()
+
+    asyncio.run(run())
+    assert AsyncEigenClient._transports == {}
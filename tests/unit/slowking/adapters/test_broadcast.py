@@ -0,0 +1,74 @@
+import asyncio
+import threading
+
+from slowking.adapters.broadcast import EventBroadcaster
+from slowking.domain import events
+
+
+def test_publish_fans_out_to_the_benchmark_subscribers():
+    async def run():
+        broadcaster = EventBroadcaster()
+        first = broadcaster.subscribe(1)
+        second = broadcaster.subscribe(1)
+        other = broadcaster.subscribe(2)
+
+        broadcaster.publish(events.DocumentUpdated(benchmark_id=1))
+
+        assert await first.get(timeout=1) == [events.DocumentUpdated(benchmark_id=1)]
+        assert await second.get(timeout=1) == [events.DocumentUpdated(benchmark_id=1)]
+        assert await other.get(timeout=0.01) == []
+
+    asyncio.run(run())
+
+
+def test_publish_from_another_thread():
+    async def run():
+        broadcaster = EventBroadcaster()
+        subscription = broadcaster.subscribe(1)
+
+        thread = threading.Thread(
+            target=broadcaster.publish, args=(events.DocumentUpdated(benchmark_id=1),)
+        )
+        thread.start()
+        thread.join()
+
+        assert await subscription.get(timeout=1) == [
+            events.DocumentUpdated(benchmark_id=1)
+        ]
+
+    asyncio.run(run())
+
+
+def test_slow_subscriber_drops_the_oldest_events():
+    async def run():
+        broadcaster = EventBroadcaster(buffer_size=2)
+        subscription = broadcaster.subscribe(1)
+
+        for i in range(5):
+            broadcaster.publish(
+                events.DocumentUpdated(benchmark_id=1, upload_times={f"doc {i}": i})
+            )
+
+        received = await subscription.get(timeout=1)
+        assert [event.upload_times for event in received] == [  # type: ignore
+            {"doc 3": 3},
+            {"doc 4": 4},
+        ]
+        assert subscription.take_dropped() == 3
+        assert subscription.take_dropped() == 0
+
+    asyncio.run(run())
+
+
+def test_unsubscribe():
+    async def run():
+        broadcaster = EventBroadcaster()
+        subscription = broadcaster.subscribe(1)
+        broadcaster.unsubscribe(subscription)
+
+        broadcaster.publish(events.DocumentUpdated(benchmark_id=1))
+
+        assert await subscription.get(timeout=0.01) == []
+        assert broadcaster._subscriptions == {}
+
+    asyncio.run(run())
@@ -0,0 +1,42 @@
+from slowking.adapters.cache import LRUCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_cache_hit_and_miss():
+    cache: LRUCache[int] = LRUCache(maxsize=2, ttl=60)
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache: LRUCache[int] = LRUCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+    assert len(cache) == 2
+
+
+def test_lru_cache_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache: LRUCache[int] = LRUCache(maxsize=2, ttl=10, clock=clock)
+    cache.set("a", 1)
+    clock.now = 9
+    assert cache.get("a") == 1
+    clock.now = 10
+    assert cache.get("a") is None
+    assert len(cache) == 0
@@ -0,0 +1,82 @@
+import os
+import subprocess
+import sys
+import textwrap
+import time
+
+from prometheus_client import REGISTRY
+from tenacity import Retrying, stop_after_attempt, wait_none
+
+from slowking.adapters import metrics
+
+
+def sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_count_retries_counts_each_retry():
+    before = sample("slowking_retries_total", operation="test_operation")
+    attempts = Retrying(
+        stop=stop_after_attempt(3),
+        wait=wait_none(),
+        before_sleep=metrics.count_retries("test_operation"),
+        reraise=True,
+    )
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ConnectionError
+
+    attempts(flaky)
+
+    assert sample("slowking_retries_total", operation="test_operation") - before == 2
+
+
+def test_observe_message_counts_channel_and_stream_lag():
+    before = sample("slowking_messages_received_total", channel="test_channel")
+    message_id = f"{int(time.time() * 1000) - 2000}-0"
+
+    metrics.observe_message("test_channel", message_id)
+    metrics.observe_message("test_channel")
+
+    received = sample("slowking_messages_received_total", channel="test_channel")
+    assert received - before == 2
+    assert sample("slowking_message_lag_seconds_count", channel="test_channel") == 1
+    assert sample("slowking_message_lag_seconds_sum", channel="test_channel") >= 2
+
+
+def test_exposition_aggregates_the_processes_in_multiprocess_mode(tmp_path):
+    # the metric value class is chosen on import, so a fresh interpreter
+    script = textwrap.dedent(
+        """
+        from slowking.adapters import metrics
+        from slowking.adapters.redis_event_publisher import RedisEventPublisher
+        from slowking.domain import events
+
+        class FakeRedis:
+            def publish(self, channel, message):
+                pass
+
+        publisher = RedisEventPublisher(client=FakeRedis(), transport="pubsub")
+        publisher.publish(events.ProjectCreated(benchmark_id=1))
+        metrics.observe_message("project_created")
+        print(metrics.exposition()[0].decode())
+        """
+    )
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        env=env,
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+
+    assert "slowking_events_published_total 1.0" in result.stdout
+    assert "slowking_event_publish_duration_seconds_count 1.0" in result.stdout
+    assert 'slowking_messages_received_total{channel="project_created"} 1.0' in (
+        result.stdout
+    )
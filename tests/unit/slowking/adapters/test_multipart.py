@@ -0,0 +1,119 @@
+import asyncio
+import email.parser
+import email.policy
+import threading
+
+import httpx
+import requests
+
+from slowking.adapters.multipart import MultipartEncoder
+
+
+def parse(content_type: str, body: bytes) -> list[tuple]:
+    message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode() + body
+    )
+    return [
+        (
+            part.get_param("name", header="content-disposition"),
+            part.get_filename(),
+            part.get_payload(decode=True),
+        )
+        for part in message.iter_parts()
+    ]
+
+
+def encoder_for(tmp_path, chunk_size=4):
+    (tmp_path / "a.txt").write_bytes(b"first document")
+    (tmp_path / "b.txt").write_bytes(b"x" * 1000)
+    return MultipartEncoder(
+        fields={"document_type_id": "42"},
+        files=[("files", tmp_path / "a.txt"), ("files", tmp_path / "b.txt")],
+        chunk_size=chunk_size,
+    )
+
+
+def test_body_is_multipart_form_data_of_the_declared_length(tmp_path):
+    encoder = encoder_for(tmp_path)
+
+    body = encoder.read()
+
+    assert len(body) == len(encoder)
+    assert parse(encoder.content_type, body) == [
+        ("document_type_id", None, b"42"),
+        ("files", "a.txt", b"first document"),
+        ("files", "b.txt", b"x" * 1000),
+    ]
+
+
+def test_files_are_read_in_chunks_and_body_can_be_rewound(tmp_path):
+    encoder = encoder_for(tmp_path, chunk_size=16)
+    body = encoder.read()
+    encoder.seek(0)
+
+    reads = list(iter(lambda: encoder.read(7), b""))
+
+    assert b"".join(reads) == body
+    assert max(len(r) for r in reads) == 7
+    assert encoder.tell() == len(encoder)
+    file_chunks = [c for c in encoder._iter_chunks() if set(c) == {ord("x")}]
+    assert {len(c) for c in file_chunks} == {16, 1000 % 16}
+
+
+def test_requests_streams_the_body_with_a_content_length(tmp_path):
+    encoder = encoder_for(tmp_path)
+
+    request = requests.Request(
+        "POST",
+        "http://target/upload/",
+        data=encoder,
+        headers={"Content-Type": encoder.content_type},
+    ).prepare()
+
+    assert request.headers["Content-Length"] == str(len(encoder))
+    assert request.body is encoder
+
+
+def test_httpx_streams_the_body_asynchronously(tmp_path):
+    encoder = encoder_for(tmp_path)
+    received: list[bytes] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        received.append(await request.aread())
+        return httpx.Response(200)
+
+    async def send():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            await client.post(
+                "http://target/upload/",
+                content=encoder,
+                headers={
+                    "Content-Type": encoder.content_type,
+                    "Content-Length": str(len(encoder)),
+                },
+            )
+
+    asyncio.run(send())
+
+    assert received == [encoder.read()]
+
+
+def test_async_iteration_reads_the_files_off_the_event_loop(tmp_path, monkeypatch):
+    encoder = encoder_for(tmp_path)
+    iter_chunks = encoder._iter_chunks
+    threads: set[int] = set()
+
+    def tracked_chunks():
+        for chunk in iter_chunks():
+            threads.add(threading.get_ident())
+            yield chunk
+
+    monkeypatch.setattr(encoder, "_iter_chunks", tracked_chunks)
+
+    async def collect() -> tuple[bytes, int]:
+        return b"".join([c async for c in encoder]), threading.get_ident()
+
+    body, loop_thread = asyncio.run(collect())
+
+    assert body == encoder.read()
+    assert threads and loop_thread not in threads
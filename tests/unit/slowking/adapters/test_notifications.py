@@ -0,0 +1,128 @@
+import threading
+import time
+
+from slowking.adapters.notifications import EmailNotifications
+from slowking.domain import model
+
+
+class FakeSMTP:
+    instances: list["FakeSMTP"] = []
+    # when set, sendmail waits on it, e.g. for concurrent sends
+    barrier: threading.Barrier | None = None
+
+    def __init__(self, host, port, timeout):
+        self.healthy = True
+        self.closed = False
+        self.sent: list[str] = []
+        FakeSMTP.instances.append(self)
+
+    def noop(self):
+        return (250 if self.healthy else 421, b"")
+
+    def sendmail(self, from_addr, to_addrs, msg):
+        if FakeSMTP.barrier is not None:
+            FakeSMTP.barrier.wait()
+        self.sent.append(msg)
+
+    def quit(self):
+        self.closed = True
+
+    def close(self):
+        self.closed = True
+
+
+def make_benchmark(name: str) -> model.Benchmark:
+    return model.Benchmark(
+        name=name,
+        benchmark_type="latency",
+        eigen_platform_version="v1.0.0",
+        target_infra="k8s",
+        target_url="localhost",
+        username="user",
+        password="pw",
+        project=model.Project(name=name, document=[]),
+    )
+
+
+def make_notifications(
+    digest_window: float = 0, pool_size: int = 1, close_timeout: float = 1
+) -> EmailNotifications:
+    FakeSMTP.instances = []
+    FakeSMTP.barrier = None
+    return EmailNotifications(
+        smtp_host="localhost",
+        port=1025,
+        pool_size=pool_size,
+        digest_window=digest_window,
+        smtp_factory=FakeSMTP,  # type: ignore
+        close_timeout=close_timeout,
+    )
+
+
+def test_email_notifications_does_not_connect_on_construction():
+    make_notifications()
+    assert FakeSMTP.instances == []
+
+
+def test_email_notifications_sends_and_reuses_connection():
+    notifications = make_notifications()
+    notifications.send(make_benchmark("bm 1"), "report_1.csv")
+    notifications.flush()
+    notifications.send(make_benchmark("bm 2"), "report_2.csv")
+    notifications.flush()
+
+    assert len(FakeSMTP.instances) == 1
+    assert FakeSMTP.instances[0].sent == [
+        "Subject: Benchmark Report: bm 1\nReport generated: report_1.csv",
+        "Subject: Benchmark Report: bm 2\nReport generated: report_2.csv",
+    ]
+
+
+def test_email_notifications_replaces_unhealthy_connection():
+    notifications = make_notifications()
+    notifications.send(make_benchmark("bm 1"), "report_1.csv")
+    notifications.flush()
+    FakeSMTP.instances[0].healthy = False
+
+    notifications.send(make_benchmark("bm 2"), "report_2.csv")
+    notifications.flush()
+
+    assert len(FakeSMTP.instances) == 2
+    assert FakeSMTP.instances[0].closed
+    assert len(FakeSMTP.instances[1].sent) == 1
+
+
+def test_email_notifications_sends_digest():
+    notifications = make_notifications(digest_window=0.2)
+    for i in range(3):
+        notifications.send(make_benchmark(f"bm {i}"), f"report_{i}.csv")
+    notifications.flush()
+
+    [msg] = FakeSMTP.instances[0].sent
+    assert msg.startswith("Subject: Benchmark Reports: 3 benchmarks completed")
+    assert "bm 2 - Report generated: report_2.csv" in msg
+
+
+def test_email_notifications_sends_on_every_pool_connection():
+    notifications = make_notifications(pool_size=2)
+    # both sends must be in flight at once to pass the barrier
+    FakeSMTP.barrier = threading.Barrier(2, timeout=1)
+    notifications.send(make_benchmark("bm 1"), "report_1.csv")
+    notifications.send(make_benchmark("bm 2"), "report_2.csv")
+    notifications.flush()
+
+    assert len(FakeSMTP.instances) == 2
+    assert [len(server.sent) for server in FakeSMTP.instances] == [1, 1]
+
+
+def test_email_notifications_close_is_bounded():
+    notifications = make_notifications(close_timeout=0.05)
+    # a send which never completes, like a connect to an unresponsive server
+    FakeSMTP.barrier = threading.Barrier(2)
+    notifications.send(make_benchmark("bm 1"), "report_1.csv")
+
+    start = time.monotonic()
+    notifications.close()
+
+    assert time.monotonic() - start < 1
+    FakeSMTP.barrier.abort()
@@ -0,0 +1,102 @@
+import pytest
+import redis
+from prometheus_client import REGISTRY
+
+from slowking.adapters.redis_event_publisher import RedisEventPublisher
+from slowking.domain import events
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def publish(self, channel, message):
+        self.commands.append((channel, message))
+
+    def execute(self):
+        self.client.round_trips += 1
+        self.client.published.extend(self.commands)
+
+
+class FakeRedis:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.round_trips = 0
+        self.published: list[tuple[str, str]] = []
+
+    def publish(self, channel, message):
+        if self.fail:
+            raise redis.ConnectionError("broker down")
+        self.round_trips += 1
+        self.published.append((channel, message))
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+def sample(name: str) -> float:
+    return REGISTRY.get_sample_value(name) or 0.0
+
+
+def test_publish():
+    client = FakeRedis()
+    publisher = RedisEventPublisher(client=client)  # type: ignore
+    before = sample("slowking_events_published_total")
+    publisher.publish(events.ProjectCreated(benchmark_id=1))
+
+    assert client.published == [
+        ("project_created", '{"benchmark_id": 1, "channel": "project_created"}')
+    ]
+    assert sample("slowking_events_published_total") - before == 1
+
+
+def test_publish_many_pipelines_in_one_round_trip():
+    client = FakeRedis()
+    publisher = RedisEventPublisher(client=client)  # type: ignore
+    before = sample("slowking_events_published_total")
+    publisher.publish_many(
+        [
+            events.DocumentUpdated(benchmark_id=1),
+            events.DocumentUpdated(benchmark_id=2),
+            events.BenchmarkCompleted(benchmark_id=3, channel="not_subscribed"),
+        ]
+    )
+
+    assert client.round_trips == 1
+    assert [channel for channel, _ in client.published] == [
+        "document_updated",
+        "document_updated",
+    ]
+    assert sample("slowking_events_published_total") - before == 2
+
+
+def test_publish_records_errors():
+    publisher = RedisEventPublisher(client=FakeRedis(fail=True))  # type: ignore
+    published = sample("slowking_events_published_total")
+    errors = sample("slowking_event_publish_errors_total")
+    rounds = sample("slowking_event_publish_duration_seconds_count")
+    with pytest.raises(redis.ConnectionError):
+        publisher.publish(events.ProjectCreated(benchmark_id=1))
+
+    assert sample("slowking_event_publish_errors_total") - errors == 1
+    assert sample("slowking_events_published_total") == published
+    assert sample("slowking_event_publish_duration_seconds_count") - rounds == 1
+
+
+def test_publish_to_stream():
+    class FakeStreamRedis(FakeRedis):
+        def xadd(self, name, fields, maxlen, approximate):
+            self.round_trips += 1
+            self.published.append((name, fields["data"]))
+
+    client = FakeStreamRedis()
+    publisher = RedisEventPublisher(client=client, transport="streams")  # type: ignore
+    publisher.publish(events.ProjectCreated(benchmark_id=1))
+
+    assert client.published == [
+        (
+            "slowking:project_created",
+            '{"benchmark_id": 1, "channel": "project_created"}',
+        )
+    ]
@@ -0,0 +1,160 @@
+import redis
+
+from slowking.adapters.redis_event_subscriber import ReceivedMessage, StreamSubscriber
+
+
+class FakeStreamRedis:
+    def __init__(self, pending=None, reads=None, claimable=None):
+        self.groups: list[str] = []
+        self.acked: list[tuple[str, str]] = []
+        self.claimed: list[str] = []
+        self.kept_alive: list[tuple[str, str, str]] = []
+        self.pending = pending or []
+        self.reads = reads or []
+        self.claimable = claimable or []
+
+    def xgroup_create(self, stream, group, id, mkstream):
+        if stream in self.groups:
+            raise redis.ResponseError("BUSYGROUP Consumer Group name already exists")
+        self.groups.append(stream)
+
+    def xreadgroup(self, group, consumer, streams, count=None, block=None):
+        return self.reads.pop(0) if self.reads else []
+
+    def xpending_range(self, stream, group, min, max, count, idle):
+        return [p for p in self.claimable if p["stream"] == stream]
+
+    def xclaim(self, stream, group, consumer, min_idle_time, message_ids, justid=False):
+        if justid:
+            self.kept_alive.extend((stream, consumer, m) for m in message_ids)
+            return message_ids
+        self.claimed.extend(message_ids)
+        return [(message_id, {b"data": b"{}"}) for message_id in message_ids]
+
+    def xack(self, stream, group, message_id):
+        self.acked.append((stream, message_id))
+
+
+def test_create_groups_is_idempotent():
+    client = FakeStreamRedis()
+    subscriber = StreamSubscriber(client, ["document_updated"])  # type: ignore
+    subscriber.create_groups()
+    subscriber.create_groups()
+    assert client.groups == ["slowking:document_updated"]
+
+
+def test_recover_pending_pages_through_own_pending_messages():
+    client = FakeStreamRedis(
+        reads=[
+            [(b"slowking:document_updated", [(b"1-0", {b"data": b'{"a": 1}'})])],
+            [(b"slowking:document_updated", [(b"2-0", None)])],
+            [(b"slowking:document_updated", [])],
+        ]
+    )
+    subscriber = StreamSubscriber(client, ["document_updated"], count=1)  # type: ignore
+    messages = list(subscriber.recover_pending())
+
+    assert messages == [
+        ReceivedMessage(
+            channel="document_updated",
+            data='{"a": 1}',
+            message_id="1-0",
+            stream="slowking:document_updated",
+        )
+    ]
+    # the trimmed entry has no fields and is acked without being handled
+    assert client.acked == [("slowking:document_updated", b"2-0")]
+
+
+def test_claim_idle_claims_and_drops_after_max_deliveries():
+    client = FakeStreamRedis(
+        claimable=[
+            {
+                "stream": "slowking:project_created",
+                "message_id": "1-0",
+                "consumer": b"stalled-consumer",
+                "times_delivered": 1,
+            },
+            {
+                "stream": "slowking:project_created",
+                "message_id": "2-0",
+                "consumer": b"stalled-consumer",
+                "times_delivered": 5,
+            },
+        ]
+    )
+    subscriber = StreamSubscriber(
+        client,  # type: ignore
+        ["project_created"],
+        max_deliveries=5,
+    )
+    messages = list(subscriber.claim_idle())
+
+    assert [m.message_id for m in messages] == ["1-0"]
+    assert client.claimed == ["1-0"]
+    assert client.acked == [("slowking:project_created", "2-0")]
+
+
+def test_claim_idle_skips_own_messages_still_being_handled():
+    client = FakeStreamRedis(
+        reads=[[(b"slowking:project_created", [(b"1-0", {b"data": b"{}"})])]]
+    )
+    subscriber = StreamSubscriber(
+        client,  # type: ignore
+        ["project_created"],
+        consumer="consumer-1",
+        claim_idle_ms=0,
+    )
+    listening = subscriber.listen()
+    message = next(listening)
+
+    # the message is still being handled when it has been pending for longer
+    # than the idle time, as it would be behind a slow upload
+    client.claimable = [
+        {
+            "stream": "slowking:project_created",
+            "message_id": message.message_id,
+            "consumer": b"consumer-1",
+            "times_delivered": 1,
+        }
+    ]
+
+    assert list(subscriber.claim_idle()) == []
+    assert client.claimed == []
+    assert client.acked == []
+
+
+def test_ack():
+    client = FakeStreamRedis()
+    subscriber = StreamSubscriber(client, ["project_created"])  # type: ignore
+    subscriber.ack(
+        ReceivedMessage(
+            channel="project_created",
+            data="{}",
+            message_id="1-0",
+            stream="slowking:project_created",
+        )
+    )
+    assert client.acked == [("slowking:project_created", "1-0")]
+
+
+def test_keep_alive_resets_idle_time_without_a_delivery():
+    client = FakeStreamRedis()
+    subscriber = StreamSubscriber(
+        client,  # type: ignore
+        ["project_created"],
+        consumer="consumer-1",
+    )
+    subscriber.keep_alive(
+        [
+            ReceivedMessage(
+                channel="project_created",
+                data="{}",
+                message_id="1-0",
+                stream="slowking:project_created",
+            ),
+            ReceivedMessage(channel="project_created", data="{}"),
+        ]
+    )
+    assert client.kept_alive == [("slowking:project_created", "consumer-1", "1-0")]
+    assert client.claimed == []
@@ -0,0 +1,93 @@
+import json
+import threading
+
+from slowking.adapters.span_exporter import BatchSpanExporter, Span, SpanFileExporter
+
+
+def test_export_appends_otlp_json_lines(tmp_path):
+    exporter = SpanFileExporter(str(tmp_path / "traces" / "spans.jsonl"))
+    span = Span(
+        trace_id="0" * 31 + "1",
+        span_id="0" * 15 + "2",
+        parent_span_id="0" * 15 + "3",
+        name="ProjectCreated upload_documents",
+        start_time_ns=1_000,
+        end_time_ns=2_500,
+        attributes={
+            "slowking.benchmark_id": 1,
+            "slowking.outcome": "error",
+            "slowking.published": ["DocumentUpdated"],
+        },
+        error="ValueError()",
+    )
+
+    exporter.export([span])
+    exporter.export([span])
+    exporter.shutdown()
+
+    lines = (tmp_path / "traces" / "spans.jsonl").read_text().splitlines()
+    assert len(lines) == 2
+    resource_spans = json.loads(lines[0])["resourceSpans"][0]
+    assert resource_spans["resource"]["attributes"] == [
+        {"key": "service.name", "value": {"stringValue": "slowking"}}
+    ]
+    (otlp_span,) = resource_spans["scopeSpans"][0]["spans"]
+    assert otlp_span["traceId"] == span.trace_id
+    assert otlp_span["parentSpanId"] == span.parent_span_id
+    assert otlp_span["startTimeUnixNano"] == "1000"
+    assert otlp_span["endTimeUnixNano"] == "2500"
+    assert otlp_span["status"] == {"code": 2, "message": "ValueError()"}
+    assert otlp_span["attributes"] == [
+        {"key": "slowking.benchmark_id", "value": {"intValue": "1"}},
+        {"key": "slowking.outcome", "value": {"stringValue": "error"}},
+        {
+            "key": "slowking.published",
+            "value": {"arrayValue": {"values": [{"stringValue": "DocumentUpdated"}]}},
+        },
+    ]
+
+
+class BlockingExporter:
+    def __init__(self):
+        self.exporting = threading.Event()
+        self.release = threading.Event()
+        self.batches: list[list[str]] = []
+        self.threads: set[int] = set()
+        self.closed = False
+
+    def export(self, spans: list[Span]) -> None:
+        self.exporting.set()
+        self.release.wait(timeout=1)
+        self.threads.add(threading.get_ident())
+        self.batches.append([span.name for span in spans])
+
+    def shutdown(self) -> None:
+        self.closed = True
+
+
+def make_span(name: str) -> Span:
+    return Span(
+        trace_id="0" * 32,
+        span_id="0" * 16,
+        name=name,
+        start_time_ns=0,
+        end_time_ns=1,
+    )
+
+
+def test_batch_exporter_exports_buffered_spans_off_the_caller_thread():
+    exporter = BlockingExporter()
+    batch_exporter = BatchSpanExporter(exporter, max_queue_size=2)  # type: ignore
+
+    batch_exporter.export([make_span("a")])
+    assert exporter.exporting.wait(timeout=1)
+    # buffered while the background export is blocked, the last is dropped
+    batch_exporter.export([make_span("b"), make_span("c"), make_span("d")])
+    exporter.release.set()
+    assert batch_exporter.flush(timeout=1)
+    batch_exporter.shutdown()
+
+    assert exporter.batches == [["a"], ["b", "c"]]
+    assert batch_exporter.dropped == 1
+    assert threading.get_ident() not in exporter.threads
+    assert exporter.closed
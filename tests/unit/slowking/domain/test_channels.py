@@ -14,4 +14,9 @@ def test_get_event_channels():
 
 def test_get_command_channels():
     commands = CommandChannelEnum.get_command_channels()
-    assert commands == ["create_benchmark", "update_document"]
+    assert commands == [
+        "create_benchmark",
+        "update_document",
+        "update_documents_batch",
+        "compare_benchmarks",
+    ]
@@ -0,0 +1,140 @@
+import numpy as np
+import pytest
+
+from slowking.domain import statistics
+
+
+def test_summarise():
+    upload_times = np.arange(1, 101, dtype=np.float64)
+
+    summary = statistics.summarise(upload_times, buckets=[10.0, 50.0])
+
+    assert summary.count == 100
+    assert summary.min == 1.0
+    assert summary.max == 100.0
+    assert summary.mean == 50.5
+    assert summary.stddev == pytest.approx(28.866, abs=1e-3)
+    assert list(summary.percentiles) == ["p50", "p90", "p95", "p99", "p99.9"]
+    assert summary.percentiles["p50"] == 50.5
+    assert summary.percentiles["p99.9"] == pytest.approx(99.901)
+    assert summary.histogram == [
+        statistics.HistogramBucket(lower=0.0, upper=10.0, count=9),
+        statistics.HistogramBucket(lower=10.0, upper=50.0, count=40),
+        statistics.HistogramBucket(lower=50.0, upper=float("inf"), count=51),
+    ]
+    assert summary.headline() == (
+        "100 documents uploaded: p50 50.500s, p90 90.100s, p99 99.010s"
+    )
+
+
+def test_summarise_no_upload_times():
+    summary = statistics.summarise(np.array([]), buckets=[1.0])
+
+    assert summary.count == 0
+    assert summary.mean is None
+    assert summary.percentiles == {}
+    assert [bucket.count for bucket in summary.histogram] == [0, 0]
+    assert summary.headline() == "No documents uploaded"
+
+
+def test_latency_sketch_quantiles_are_within_relative_accuracy():
+    upload_times = np.random.default_rng(1).lognormal(size=10_000)
+    sketch = statistics.LatencySketch()
+    sketch.add(upload_times)
+
+    estimates = sketch.quantiles([0.5, 0.9, 0.99])
+
+    for estimate, exact in zip(estimates, np.quantile(upload_times, [0.5, 0.9, 0.99])):
+        assert estimate == pytest.approx(exact, rel=statistics.SKETCH_RELATIVE_ACCURACY)
+
+
+def test_latency_sketch_merge():
+    upload_times = np.arange(1, 1001, dtype=np.float64)
+    whole, first, second = (statistics.LatencySketch() for _ in range(3))
+    whole.add(upload_times)
+    first.add(upload_times[:300])
+    second.add(upload_times[300:])
+
+    first.merge(second)
+
+    assert first == whole
+    assert first.count == 1000
+    assert list(first.percentiles()) == ["p50", "p90", "p95", "p99", "p99.9"]
+
+
+def test_latency_sketch_counts_tiny_and_negative_times_in_the_lowest_bucket():
+    sketch = statistics.LatencySketch()
+    sketch.add([0.0, -1.0])
+
+    assert sketch.count == 2
+    assert len(sketch.counts) == 1
+    assert statistics.LatencySketch().quantiles([0.5]) == []
+
+
+def test_compare_flags_a_regression():
+    rng = np.random.default_rng(1)
+    baseline = rng.lognormal(size=5_000)
+    candidate = baseline * 1.3
+
+    comparison = statistics.compare(
+        baseline,
+        candidate,
+        threshold=0.1,
+        confidence=0.95,
+        significance=0.05,
+        resamples=1_000,
+        seed=1,
+    )
+
+    assert comparison.regression
+    assert comparison.p_value is not None and comparison.p_value < 0.05
+    assert comparison.probability_slower and comparison.probability_slower > 0.5
+    p50 = comparison.percentiles[0]
+    assert p50.label == "p50"
+    assert p50.relative_delta == pytest.approx(0.3)
+    assert p50.ci_low < 0.3 < p50.ci_high
+    assert p50.regressed
+
+
+def test_compare_same_upload_times_is_not_a_regression():
+    upload_times = np.random.default_rng(1).lognormal(size=5_000)
+
+    comparison = statistics.compare(
+        upload_times,
+        upload_times.copy(),
+        threshold=0.1,
+        confidence=0.95,
+        significance=0.05,
+        resamples=1_000,
+        seed=1,
+    )
+
+    assert not comparison.regression
+    assert comparison.probability_slower == 0.5
+    assert comparison.p_value == 1.0
+    assert not any(delta.regressed for delta in comparison.percentiles)
+
+
+def test_compare_without_upload_times():
+    comparison = statistics.compare(
+        np.array([1.0]),
+        np.array([]),
+        threshold=0.1,
+        confidence=0.95,
+        significance=0.05,
+        resamples=1_000,
+    )
+
+    assert comparison.candidate_count == 0
+    assert comparison.percentiles == []
+    assert not comparison.regression
+
+
+def test_mann_whitney_u_with_ties():
+    probability_slower, p_value = statistics.mann_whitney_u(
+        np.array([1.0, 2.0, 2.0, 3.0]), np.array([2.0, 3.0, 3.0, 4.0])
+    )
+
+    # U = 13 of 16 pairs, p-value as scipy.stats.mannwhitneyu
+    assert probability_slower == 13 / 16
+    assert p_value == pytest.approx(0.172, abs=1e-3)
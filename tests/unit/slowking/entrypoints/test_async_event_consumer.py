@@ -0,0 +1,136 @@
+import asyncio
+import json
+
+from slowking.adapters.redis_event_subscriber import (
+    AbstractAsyncSubscriber,
+    ReceivedMessage,
+)
+from slowking.domain import events
+from slowking.entrypoints.async_event_consumer import AsyncConsumer
+from slowking.service_layer.messagebus import AsyncMessageBus
+
+CHANNELS = ["project_created", "document_updated", "all_documents_uploaded"]
+
+
+class FakeAsyncSubscriber(AbstractAsyncSubscriber):
+    def __init__(self, messages: list[ReceivedMessage]):
+        self.messages = messages
+        self.acked: list[ReceivedMessage] = []
+        self.kept_alive: list[list[ReceivedMessage]] = []
+
+    async def listen(self):
+        for message in self.messages:
+            yield message
+
+    async def ack(self, message: ReceivedMessage) -> None:
+        self.acked.append(message)
+
+    async def keep_alive(self, messages: list[ReceivedMessage]) -> None:
+        self.kept_alive.append(messages)
+
+
+def test_consumer_orders_per_benchmark_and_runs_benchmarks_concurrently():
+    handled: dict[int, list[str]] = {}
+    running = 0
+    max_running = 0
+
+    async def handler(event):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        # earlier messages are slower, so only the lock keeps them in order
+        await asyncio.sleep(0.003 * (3 - CHANNELS.index(event.channel)))
+        handled.setdefault(event.benchmark_id, []).append(event.channel)
+        running -= 1
+
+    bus = AsyncMessageBus(
+        uow=None,  # type: ignore
+        command_handlers={},
+        event_handlers={
+            events.ProjectCreated: [handler],
+            events.DocumentUpdated: [handler],
+            events.AllDocumentsUploaded: [handler],
+        },
+    )
+    messages = [
+        ReceivedMessage(channel=channel, data=json.dumps({"benchmark_id": i}))
+        for channel in CHANNELS
+        for i in range(5)
+    ]
+    subscriber = FakeAsyncSubscriber(messages)
+
+    async def consume():
+        consumer = AsyncConsumer(bus, subscriber, max_in_flight=8)
+        await consumer.run()
+        await consumer.drain()
+        return consumer
+
+    consumer = asyncio.run(consume())
+
+    assert handled == {i: CHANNELS for i in range(5)}
+    assert max_running > 1
+    assert len(subscriber.acked) == len(messages)
+    assert consumer._locks == {}
+
+
+def test_consumer_does_not_ack_a_failed_message():
+    async def handler(event):
+        raise ValueError("boom")
+
+    bus = AsyncMessageBus(
+        uow=None,  # type: ignore
+        command_handlers={},
+        event_handlers={},
+    )
+    bus.handle = handler  # type: ignore
+    subscriber = FakeAsyncSubscriber(
+        [ReceivedMessage(channel="project_created", data='{"benchmark_id": 1}')]
+    )
+
+    async def consume():
+        consumer = AsyncConsumer(bus, subscriber)
+        await consumer.run()
+        await consumer.drain()
+
+    asyncio.run(consume())
+
+    assert subscriber.acked == []
+
+
+def test_consumer_keeps_messages_waiting_on_the_lock_alive():
+    release = asyncio.Event()
+
+    async def handler(event):
+        # a slow upload, the benchmark's next message waits on its lock
+        await release.wait()
+
+    bus = AsyncMessageBus(
+        uow=None,  # type: ignore
+        command_handlers={},
+        event_handlers={events.ProjectCreated: [handler]},
+    )
+    messages = [
+        ReceivedMessage(
+            channel="project_created",
+            data='{"benchmark_id": 1}',
+            message_id=f"{i}-0",
+            stream="slowking:project_created",
+        )
+        for i in range(2)
+    ]
+    subscriber = FakeAsyncSubscriber(messages)
+
+    async def consume():
+        consumer = AsyncConsumer(bus, subscriber, keep_alive_interval=0.01)
+        await consumer.run()
+        while not subscriber.kept_alive:
+            await asyncio.sleep(0.01)
+        release.set()
+        await consumer.drain()
+        return consumer
+
+    consumer = asyncio.run(asyncio.wait_for(consume(), timeout=5))
+
+    assert subscriber.kept_alive[0] == messages
+    assert consumer._accepted == {}
+    assert len(subscriber.acked) == 2
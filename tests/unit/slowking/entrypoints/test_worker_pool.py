@@ -0,0 +1,101 @@
+import json
+import threading
+import time
+
+from slowking.adapters.redis_event_subscriber import ReceivedMessage
+from slowking.entrypoints.worker_pool import PartitionedWorkerPool
+
+
+def message(benchmark_id: int, seq: int) -> ReceivedMessage:
+    return ReceivedMessage(
+        channel="document_updated",
+        data=json.dumps({"benchmark_id": benchmark_id, "seq": seq}),
+    )
+
+
+def test_partition_is_stable_per_benchmark():
+    pool = PartitionedWorkerPool(lambda: lambda m: None, workers=4, mode="threads")
+    assert pool.partition(message(7, 1)) == pool.partition(message(7, 2))
+    assert {pool.partition(message(i, 1)) for i in range(32)} == {0, 1, 2, 3}
+
+
+def test_pool_preserves_order_per_benchmark_and_drains_on_close():
+    handled: dict[int, list[int]] = {}
+    lock = threading.Lock()
+
+    def handler_factory():
+        def handle(m: ReceivedMessage):
+            payload = json.loads(m.data)
+            time.sleep(0.001)
+            with lock:
+                handled.setdefault(payload["benchmark_id"], []).append(payload["seq"])
+
+        return handle
+
+    with PartitionedWorkerPool(
+        handler_factory, workers=3, queue_size=2, mode="threads"
+    ) as pool:
+        for seq in range(20):
+            for benchmark_id in range(5):
+                pool.submit(message(benchmark_id, seq))
+
+    assert handled == {benchmark_id: list(range(20)) for benchmark_id in range(5)}
+
+
+def test_pool_worker_survives_handler_errors():
+    handled = []
+
+    def handler_factory():
+        def handle(m: ReceivedMessage):
+            if json.loads(m.data)["seq"] == 0:
+                raise ValueError("boom")
+            handled.append(m)
+
+        return handle
+
+    with PartitionedWorkerPool(handler_factory, workers=1, mode="threads") as pool:
+        pool.submit(message(1, 0))
+        pool.submit(message(1, 1))
+
+    assert len(handled) == 1
+
+
+def stream_message(benchmark_id: int, seq: int) -> ReceivedMessage:
+    return ReceivedMessage(
+        channel="document_updated",
+        data=json.dumps({"benchmark_id": benchmark_id, "seq": seq}),
+        message_id=f"{seq}-0",
+        stream="slowking:document_updated",
+    )
+
+
+def test_pool_keeps_queued_messages_alive_until_handled():
+    release = threading.Event()
+    kept_alive: list[list[str]] = []
+
+    def handler_factory():
+        def handle(m: ReceivedMessage):
+            # a slow upload, the benchmark's next message waits in the queue
+            release.wait()
+
+        return handle
+
+    def keep_alive(messages: list[ReceivedMessage]):
+        kept_alive.append(sorted(m.message_id or "" for m in messages))
+
+    with PartitionedWorkerPool(
+        handler_factory,
+        workers=1,
+        mode="threads",
+        keep_alive=keep_alive,
+        keep_alive_interval=0.01,
+    ) as pool:
+        pool.submit(stream_message(1, 1))
+        pool.submit(stream_message(1, 2))
+        deadline = time.monotonic() + 5
+        while not kept_alive and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert kept_alive[0] == ["1-0", "2-0"]
+        release.set()
+
+    assert pool.in_flight() == []
@@ -0,0 +1,189 @@
+import asyncio
+import functools
+import threading
+
+import pytest
+from prometheus_client import REGISTRY
+
+from slowking.domain import commands, events
+from slowking.service_layer.messagebus import (
+    AsyncMessageBus,
+    HandlerInvocation,
+    MessageBus,
+    handler_name,
+    track_published,
+)
+
+
+def test_async_bus_awaits_async_handlers_and_offloads_sync_handlers():
+    handled: list[tuple[str, str]] = []
+
+    async def async_handler(event):
+        await asyncio.sleep(0)
+        handled.append(("async", threading.current_thread().name))
+
+    def sync_handler(event):
+        handled.append(("sync", threading.current_thread().name))
+
+    def failing_handler(event):
+        raise ValueError("handlers fail independently")
+
+    bus = AsyncMessageBus(
+        uow=None,  # type: ignore
+        command_handlers={},
+        event_handlers={
+            events.ProjectCreated: [failing_handler, async_handler, sync_handler]
+        },
+    )
+    asyncio.run(bus.handle(events.ProjectCreated(benchmark_id=1)))
+
+    main_thread = threading.main_thread().name
+    assert handled[0] == ("async", main_thread)
+    assert handled[1][0] == "sync"
+    assert handled[1][1] != main_thread
+
+
+def sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_bus_times_handlers_and_counts_swallowed_event_errors():
+    def noted(event, notes):
+        notes.append(event)
+
+    def broken(event):
+        raise ValueError("handlers fail independently")
+
+    def rejected(command):
+        raise ValueError("commands fail noisily")
+
+    bus = MessageBus(
+        uow=None,  # type: ignore
+        command_handlers={commands.CompareBenchmarks: [rejected]},
+        event_handlers={
+            events.ProjectCreated: [functools.partial(noted, notes=[]), broken]
+        },
+    )
+    labels = {"message": "ProjectCreated", "outcome": "success", "handler": "noted"}
+    timed = sample("slowking_handler_duration_seconds_count", **labels)
+    errors = sample(
+        "slowking_event_handler_errors_total", event="ProjectCreated", handler="broken"
+    )
+
+    bus.handle(events.ProjectCreated(benchmark_id=1))
+    with pytest.raises(ValueError):
+        bus.handle(
+            commands.CompareBenchmarks(
+                channel=commands.CommandChannelEnum.COMPARE_BENCHMARKS,
+                benchmark_ids=[1, 2],
+            )
+        )
+
+    assert sample("slowking_handler_duration_seconds_count", **labels) == timed + 1
+    assert (
+        sample(
+            "slowking_event_handler_errors_total",
+            event="ProjectCreated",
+            handler="broken",
+        )
+        == errors + 1
+    )
+    assert (
+        sample(
+            "slowking_handler_duration_seconds_count",
+            message="CompareBenchmarks",
+            handler="rejected",
+            outcome="error",
+        )
+        >= 1
+    )
+
+
+def test_handler_name_unwraps_partials():
+    def create_report(event, uow):
+        pass
+
+    handler = functools.partial(functools.partial(create_report, uow=None))
+    assert handler_name(handler) == "create_report"
+
+
+def test_hooks_receive_each_invocation_with_the_events_it_published():
+    invocations: list[HandlerInvocation] = []
+    published: list[events.Event] = []
+    publish = track_published(published.append)
+
+    def create_project(event, publish):
+        publish(events.ProjectCreated(benchmark_id=event.benchmark_id))
+
+    def failing_hook(invocation):
+        raise RuntimeError("hooks never fail the handler")
+
+    def broken(event):
+        raise ValueError("handlers fail independently")
+
+    bus = MessageBus(
+        uow=None,  # type: ignore
+        command_handlers={},
+        event_handlers={
+            events.BenchmarkCreated: [
+                functools.partial(create_project, publish=publish),
+                broken,
+            ]
+        },
+        hooks=[failing_hook, invocations.append],
+    )
+    bus.handle(events.BenchmarkCreated(benchmark_id=7))
+
+    succeeded, failed = invocations
+    assert succeeded.handler_name == "create_project"
+    assert succeeded.outcome == "success"
+    assert succeeded.duration > 0
+    assert succeeded.published == [events.ProjectCreated(benchmark_id=7)]
+    assert published == [events.ProjectCreated(benchmark_id=7)]
+    assert failed.handler_name == "broken"
+    assert failed.outcome == "error"
+    assert isinstance(failed.error, ValueError)
+    assert failed.published == []
+
+
+def test_async_bus_tracks_events_published_from_worker_threads():
+    invocations: list[HandlerInvocation] = []
+    publish = track_published(lambda event: None)
+
+    def create_project(event):
+        publish(events.ProjectCreated(benchmark_id=event.benchmark_id))
+
+    bus = AsyncMessageBus(
+        uow=None,  # type: ignore
+        command_handlers={},
+        event_handlers={events.BenchmarkCreated: [create_project]},
+        hooks=[invocations.append],
+    )
+    asyncio.run(bus.handle(events.BenchmarkCreated(benchmark_id=7)))
+
+    assert invocations[0].published == [events.ProjectCreated(benchmark_id=7)]
+
+
+def test_async_bus_fails_commands_noisily_through_the_shared_dispatch():
+    invocations: list[HandlerInvocation] = []
+
+    async def rejected(command):
+        raise ValueError("commands fail noisily")
+
+    bus = AsyncMessageBus(
+        uow=None,  # type: ignore
+        command_handlers={commands.CompareBenchmarks: [rejected]},
+        event_handlers={},
+        hooks=[invocations.append],
+    )
+    with pytest.raises(ValueError):
+        asyncio.run(
+            bus.handle(
+                commands.CompareBenchmarks(
+                    channel=commands.CommandChannelEnum.COMPARE_BENCHMARKS,
+                    benchmark_ids=[1, 2],
+                )
+            )
+        )
+
+    assert [(i.handler_name, i.outcome) for i in invocations] == [("rejected", "error")]
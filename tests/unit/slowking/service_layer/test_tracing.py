@@ -0,0 +1,112 @@
+import functools
+
+from slowking.adapters.span_exporter import Span
+from slowking.domain import commands, events
+from slowking.service_layer import tracing
+from slowking.service_layer.messagebus import MessageBus, track_published
+
+
+class FakeExporter:
+    def __init__(self):
+        self.spans: list[Span] = []
+
+    def export(self, spans: list[Span]) -> None:
+        self.spans.extend(spans)
+
+
+def test_trace_ids_are_derived_from_the_benchmark():
+    assert tracing.trace_id(1) == tracing.trace_id(1)
+    assert tracing.trace_id(1) != tracing.trace_id(2)
+    assert len(tracing.trace_id(1)) == 32
+    assert len(tracing.root_span_id(1)) == 16
+
+
+def test_trace_ids_are_salted_with_the_deployment():
+    assert tracing.trace_id(1, "staging") != tracing.trace_id(1, "production")
+    assert tracing.root_span_id(1, "staging") != tracing.root_span_id(1, "production")
+
+
+def test_spans_of_a_benchmark_chain_share_one_trace():
+    exporter = FakeExporter()
+    outbox: list[events.Event] = []
+    publish = track_published(outbox.append)
+
+    def create_benchmark(cmd, publish):
+        publish(events.BenchmarkCreated(benchmark_id=1))
+
+    def create_project(event, publish):
+        publish(events.ProjectCreated(benchmark_id=event.benchmark_id))
+
+    def upload_documents(event, publish):
+        publish(events.AllDocumentsUploaded(benchmark_id=event.benchmark_id))
+
+    def create_report(event):
+        pass
+
+    def update_document(cmd):
+        pass
+
+    bus = MessageBus(
+        uow=None,  # type: ignore
+        command_handlers={
+            commands.CreateBenchmark: [
+                functools.partial(create_benchmark, publish=publish)
+            ],
+            commands.UpdateDocument: [update_document],
+        },
+        event_handlers={
+            events.BenchmarkCreated: [
+                functools.partial(create_project, publish=publish)
+            ],
+            events.ProjectCreated: [
+                functools.partial(upload_documents, publish=publish)
+            ],
+            events.AllDocumentsUploaded: [create_report],
+        },
+        hooks=[tracing.SpanRecorder(exporter)],  # type: ignore[arg-type]
+    )
+
+    bus.handle(
+        commands.CreateBenchmark(
+            channel=commands.CommandChannelEnum.CREATE_BENCHMARK,
+            name="test-benchmark",
+            benchmark_type="latency",
+            target_infra="k8s",
+            target_url="localhost",
+            target_eigen_platform_version="5.11.0-rc.1",
+            username="test user",
+            password="test pw",
+        )
+    )
+    # the event consumer handling the published events
+    while outbox:
+        bus.handle(outbox.pop(0))
+    bus.handle(
+        commands.UpdateDocument(
+            channel=commands.CommandChannelEnum.UPDATE_DOCUMENT,
+            document_name="unknown doc",
+            eigen_document_id="1",
+            eigen_project_id="20",
+            benchmark_host_name="http://localhost:8080",
+            start_time=100.0,
+            end_time=None,
+        )
+    )
+
+    root, *chain, unattributed = exporter.spans
+    assert root.name == "CreateBenchmark create_benchmark"
+    assert root.span_id == tracing.root_span_id(1)
+    assert root.parent_span_id is None
+    assert root.attributes["slowking.published"] == ["BenchmarkCreated"]
+    assert [span.name for span in chain] == [
+        "BenchmarkCreated create_project",
+        "ProjectCreated upload_documents",
+        "AllDocumentsUploaded create_report",
+    ]
+    for span in [root, *chain]:
+        assert span.trace_id == tracing.trace_id(1)
+        assert span.attributes["slowking.benchmark_id"] == 1
+        assert span.start_time_ns <= span.end_time_ns
+    assert all(span.parent_span_id == root.span_id for span in chain)
+    assert unattributed.trace_id != tracing.trace_id(1)
+    assert unattributed.parent_span_id is None
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+from pathlib import Path
+
+import pytest
+
+from slowking.config import settings
+from slowking.service_layer.upload_scheduler import (
+    split_batches,
+    upload_batches,
+    upload_batches_async,
+)
+
+
+@pytest.fixture(autouse=True)
+def no_retry_wait(monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_BATCH_RETRY_WAIT", 0)
+
+
+@pytest.fixture
+def files(tmp_path) -> list[Path]:
+    paths = [tmp_path / f"doc_{i}.txt" for i in range(7)]
+    for path in paths:
+        path.write_bytes(b"x" * 10)
+    return paths
+
+
+def test_split_batches(files):
+    assert [len(b) for b in split_batches(files, 3)] == [3, 3, 1]
+    assert split_batches(files, None) == [files]
+    assert split_batches(files, 100) == [files]
+    assert split_batches([], 3) == []
+
+
+def test_failed_batch_is_retried_on_its_own(files):
+    calls: list[str] = []
+    failures = {"doc_3.txt": 1, "doc_6.txt": 5}
+    lock = threading.Lock()
+
+    def upload(batch: list[Path]):
+        with lock:
+            calls.append(batch[0].name)
+            if failures.get(batch[0].name, 0):
+                failures[batch[0].name] -= 1
+                raise ConnectionError("reset by peer")
+
+    results = upload_batches(
+        lambda: upload, split_batches(files, 3), concurrency=2, max_attempts=3
+    )
+
+    assert [r.batch_number for r in results] == [1, 2, 3]
+    assert [r.attempts for r in results] == [1, 2, 3]
+    assert [r.succeeded for r in results] == [True, True, False]
+    assert "reset by peer" in results[2].error  # type: ignore
+    assert sorted(calls) == ["doc_0.txt"] + ["doc_3.txt"] * 2 + ["doc_6.txt"] * 3
+    assert [r.size_bytes for r in results] == [30, 30, 10]
+    assert all(r.upload_time_end >= r.upload_time_start for r in results)
+
+
+def test_file_removed_after_upload_does_not_fail_the_batch(files):
+    def upload(batch: list[Path]):
+        # e.g. rotated by the artifact catalog once uploaded
+        for path in batch:
+            path.unlink()
+
+    [result] = upload_batches(lambda: upload, [files[:2]])
+
+    assert result.succeeded
+    assert result.size_bytes == 20
+
+
+def test_each_upload_thread_builds_its_own_upload(files):
+    # a client per thread, as a requests Session is not thread-safe
+    uploads: dict[int, int] = {}
+    lock = threading.Lock()
+
+    def upload_factory():
+        with lock:
+            uploads[threading.get_ident()] = uploads.get(threading.get_ident(), 0) + 1
+        client = threading.get_ident()
+
+        def upload(batch: list[Path]):
+            assert threading.get_ident() == client
+
+        return upload
+
+    results = upload_batches(upload_factory, split_batches(files, 1), concurrency=3)
+
+    assert all(r.succeeded for r in results)
+    assert 1 <= len(uploads) <= 3
+    assert set(uploads.values()) == {1}
+
+
+def test_async_upload_bounds_batches_in_flight(files):
+    in_flight = 0
+    max_in_flight = 0
+
+    async def upload(batch: list[Path]):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.001)
+        in_flight -= 1
+
+    results = asyncio.run(
+        upload_batches_async(upload, split_batches(files, 1), concurrency=3)
+    )
+
+    assert max_in_flight == 3
+    assert [r.document_count for r in results] == [1] * 7
+    assert all(r.succeeded for r in results)